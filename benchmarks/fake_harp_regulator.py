@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Simulated HarpRegulator executable for benchmarks
+
+Implements the subset of the HarpRegulator command line used by CLIWrapper
+(list, inspect, upload, install-drivers) for a configurable number of fake
+devices. Behavior is controlled with environment variables:
+
+    HARP_FAKE_DEVICES         Number of simulated devices (default: 10)
+    HARP_FAKE_LIST_DELAY      Seconds per listed device, per connection with
+                              --allow-connect (default: 0.0005)
+    HARP_FAKE_INSPECT_DELAY   Seconds an inspect takes (default: 0.02)
+    HARP_FAKE_UPLOAD_DELAY    Seconds an upload takes (default: 0.2)
+    HARP_FAKE_FAILURE_RATE    Fraction of upload targets that fail (default: 0)
+    HARP_FAKE_SEED            Seed choosing which targets fail (default: 0)
+
+The script only uses the standard library, so it starts quickly and does not
+depend on the package under test. Use create_launcher() to get a single
+executable path that CLIWrapper(cli_path=...) can run on any platform.
+"""
+
+import hashlib
+import json
+import os
+import stat
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+ENV_PREFIX = "HARP_FAKE_"
+
+DEVICE_NAMES = [
+    ("Behavior", 1216, "Pico"),
+    ("EnvironmentSensor", 1405, "Pico"),
+    ("SoundCard", 1280, "Pico"),
+    ("LoadCells", 1232, "ATxmega"),
+    ("Olfactometer", 1140, "ATxmega"),
+    ("ClockSynchronizer", 1152, "ATxmega"),
+]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(ENV_PREFIX + name, default))
+    except ValueError:
+        return default
+
+
+def simulated_devices(count: int, allow_connect: bool = True) -> List[Dict]:
+    """
+    Build HarpRegulator list output for count devices
+
+    Every 25th device is a Pico in bootloader mode (no port or serial number)
+    and every 40th a low-confidence unknown serial port. Without
+    allow_connect, ATxmega devices report no metadata, as on real hardware.
+
+    Args:
+        count: Number of devices
+        allow_connect: Whether the list command may connect to devices
+
+    Returns:
+        List of device dictionaries in HarpRegulator's JSON format
+    """
+    devices = []
+    for index in range(count):
+        name, who_am_i, kind = DEVICE_NAMES[index % len(DEVICE_NAMES)]
+        port = f"COM{index + 3}"
+        source = f"USB\\VID_2E8A&PID_000A\\{index:08X}"
+
+        if index % 25 == 24:
+            devices.append(
+                {"Confidence": "High", "Kind": "Pico", "State": "Bootloader", "Source": source}
+            )
+            continue
+        if index % 40 == 39:
+            devices.append(
+                {"Confidence": "Low", "Kind": "Unknown", "State": "Online", "PortName": port}
+            )
+            continue
+
+        device = {
+            "Confidence": "High",
+            "Kind": kind,
+            "State": "Online",
+            "PortName": port,
+            "SerialNumber": 1000 + index,
+            "Source": source,
+        }
+        if allow_connect or kind == "Pico":
+            device.update(
+                {
+                    "WhoAmI": who_am_i,
+                    "DeviceDescription": name,
+                    "FirmwareVersion": f"1.{index % 4}.{index % 3}",
+                    "HardwareVersion": f"{1 + index % 2}.0",
+                }
+            )
+        devices.append(device)
+    return devices
+
+
+def fails(target: str, failure_rate: float, seed: int) -> bool:
+    """Decide deterministically whether an upload to target fails"""
+    if failure_rate <= 0:
+        return False
+    digest = hashlib.sha256(f"{seed}:{target}".encode()).digest()
+    return int.from_bytes(digest[:4], "big") / 2**32 < failure_rate
+
+
+def _option(args: List[str], name: str) -> Optional[str]:
+    if name in args and args.index(name) + 1 < len(args):
+        return args[args.index(name) + 1]
+    return None
+
+
+def cmd_list(args: List[str]) -> int:
+    count = int(_env_float("DEVICES", 10))
+    allow_connect = "--allow-connect" in args
+    devices = simulated_devices(count, allow_connect)
+    if "--all" not in args:
+        devices = [d for d in devices if d["Confidence"] != "Low"]
+
+    connections = len(devices) if allow_connect else 1
+    time.sleep(_env_float("LIST_DELAY", 0.0005) * connections)
+
+    if "--json" in args:
+        print(json.dumps(devices))
+    else:
+        for device in devices:
+            print(f"{device.get('PortName', '-')}\t{device.get('DeviceDescription', '?')}")
+    return 0
+
+
+def cmd_inspect(args: List[str]) -> int:
+    path = args[0] if args else ""
+    time.sleep(_env_float("INSPECT_DELAY", 0.02))
+    if not os.path.isfile(path):
+        print(f"Firmware file not found: {path}", file=sys.stderr)
+        return 1
+
+    name, who_am_i, _ = DEVICE_NAMES[0]
+    print(
+        json.dumps(
+            {
+                "WhoAmI": who_am_i,
+                "DeviceDescription": name,
+                "FirmwareVersion": "1.4.0",
+                "HardwareVersion": "1.0",
+            }
+        )
+    )
+    return 0
+
+
+def cmd_upload(args: List[str]) -> int:
+    target = _option(args, "--target") or ""
+    delay = _env_float("UPLOAD_DELAY", 0.2)
+    failure_rate = _env_float("FAILURE_RATE", 0)
+    seed = int(_env_float("SEED", 0))
+    show_progress = "--progress" in args
+
+    steps = 10
+    will_fail = fails(target, failure_rate, seed)
+    for step in range(1, steps + 1):
+        time.sleep(delay / steps)
+        if will_fail and step == steps // 2:
+            print(f"Upload to {target} failed: device stopped responding", file=sys.stderr)
+            return 1
+        if show_progress:
+            bar = "#" * step + " " * (steps - step)
+            sys.stdout.write(f"\rUploading [{bar}] {step * 100 // steps}%")
+            sys.stdout.flush()
+
+    if show_progress:
+        sys.stdout.write("\n")
+    print(f"Firmware uploaded to {target}")
+    return 0
+
+
+def cmd_install_drivers(args: List[str]) -> int:
+    print("Drivers already installed")
+    return 0
+
+
+COMMANDS = {
+    "list": cmd_list,
+    "inspect": cmd_inspect,
+    "upload": cmd_upload,
+    "install-drivers": cmd_install_drivers,
+}
+
+
+def create_launcher(directory: Path, **options) -> Path:
+    """
+    Write an executable that runs this script with the given settings
+
+    Args:
+        directory: Directory for the launcher
+        **options: Settings without prefix, e.g. devices=100, upload_delay=0.05
+
+    Returns:
+        Path to pass as cli_path
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    script = Path(__file__).resolve()
+    env = {ENV_PREFIX + key.upper(): str(value) for key, value in options.items()}
+
+    if os.name == "nt":
+        launcher = directory / "HarpRegulator.cmd"
+        lines = ["@echo off"] + [f"set {key}={value}" for key, value in env.items()]
+        lines.append(f'"{sys.executable}" "{script}" %*')
+        launcher.write_text("\r\n".join(lines) + "\r\n")
+    else:
+        launcher = directory / "HarpRegulator"
+        lines = ["#!/bin/sh"] + [f"export {key}='{value}'" for key, value in env.items()]
+        lines.append(f'exec "{sys.executable}" "{script}" "$@"')
+        launcher.write_text("\n".join(lines) + "\n")
+        launcher.chmod(launcher.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return launcher
+
+
+def main(argv: List[str]) -> int:
+    if not argv or argv[0] not in COMMANDS:
+        print(f"Usage: HarpRegulator {{{','.join(COMMANDS)}}} ...", file=sys.stderr)
+        return 2
+    return COMMANDS[argv[0]](argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for device refresh, filtering, table rows and batch deploy
+
+Runs against the simulated HarpRegulator in fake_harp_regulator.py, so no
+hardware is needed. Every benchmark is measured at each device count and
+reported as latency percentiles and throughput.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1 10 100 500 --repeat 5
+    python benchmarks/run_benchmarks.py --upload-delay 0.05 --failure-rate 0.1
+    python benchmarks/run_benchmarks.py --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARK_DIR))
+try:
+    import harp_updater_gui  # noqa: F401
+except ImportError:
+    # Allow running from a source checkout without installing the package
+    sys.path.insert(0, str(BENCHMARK_DIR.parent / "src"))
+
+from fake_harp_regulator import create_launcher  # noqa: E402
+from harp_updater_gui.components.device_table import DeviceTable  # noqa: E402
+from harp_updater_gui.services.deploy_scheduler import DeployScheduler  # noqa: E402
+from harp_updater_gui.services.device_manager import DeviceManager  # noqa: E402
+from harp_updater_gui.services.metadata_cache import DeviceMetadataCache  # noqa: E402
+from harp_updater_gui.utils.constants import DEFAULT_DEPLOY_CONCURRENCY  # noqa: E402
+from harp_updater_gui.utils.row_diff import diff_rows, rows_fingerprint  # noqa: E402
+
+
+DEFAULT_SIZES = (1, 10, 100, 500)
+
+# (search query, type or status filter) pairs exercised by the filter
+# benchmark; values match the table's filter options
+FILTER_CASES = [
+    ("", None),
+    ("", "Pico"),
+    ("behavior", None),
+    ("com1", None),
+    ("1.2", "ATxmega"),
+    ("sensor", "Healthy"),
+    ("", "Error"),
+    ("", "Needs update"),
+    ("no such device", None),
+]
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings of one benchmark at one device count"""
+
+    name: str
+    devices: int
+    latencies: List[float] = field(default_factory=list)
+    # Items processed per run (devices, queries, rows), for throughput
+    items_per_run: int = 0
+    elapsed: float = 0.0
+    notes: str = ""
+
+    @property
+    def runs(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def p50(self) -> float:
+        return statistics.median(self.latencies) if self.latencies else 0.0
+
+    @property
+    def p95(self) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+    @property
+    def throughput(self) -> float:
+        """Items per second over the whole benchmark"""
+        total = self.elapsed or sum(self.latencies)
+        return self.items_per_run * self.runs / total if total else 0.0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data.update(runs=self.runs, p50=self.p50, p95=self.p95, throughput=self.throughput)
+        return data
+
+
+def measure(
+    name: str, devices: int, repeat: int, items_per_run: int, run: Callable[[], None]
+) -> BenchmarkResult:
+    """Time run() repeat times"""
+    result = BenchmarkResult(name, devices, items_per_run=items_per_run)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run_start = time.perf_counter()
+        run()
+        result.latencies.append(time.perf_counter() - run_start)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def bench_refresh(manager: DeviceManager, size: int, repeat: int) -> List[BenchmarkResult]:
+    """Full refresh: CLI subprocess, JSON parsing, validation and indexing"""
+    results = []
+    for allow_connect in (False, True):
+        results.append(
+            measure(
+                f"refresh_devices(allow_connect={allow_connect})",
+                size,
+                repeat,
+                size,
+                lambda: manager.refresh_devices(all_devices=True, allow_connect=allow_connect),
+            )
+        )
+    return results
+
+
+def bench_filter(manager: DeviceManager, size: int, repeat: int) -> BenchmarkResult:
+    """filter_devices over a mix of searches and type filters"""
+
+    def run():
+        for query, device_type in FILTER_CASES:
+            manager.filter_devices(search_query=query, device_type=device_type)
+
+    # Re-publish so the first run includes building the search index
+    manager.apply_device_data(
+        [device.model_dump(by_alias=True, exclude_none=True) for device in manager.devices]
+    )
+    return measure("filter_devices", size, repeat, len(FILTER_CASES), run)
+
+
+def bench_table_rows(manager: DeviceManager, size: int, repeat: int) -> BenchmarkResult:
+    """Row building, fingerprinting and diffing done by DeviceTable.update_table"""
+    base = manager.inventory
+    updated = base.with_available_updates(
+        base.version + 1,
+        {snapshot.identity_key: "9.9.9" for snapshot in base.snapshots[::3]},
+    )
+    client_rows = {}
+    toggle = [base, updated]
+
+    def run():
+        inventory = toggle[0]
+        toggle.reverse()
+        snapshots = manager.filter_snapshots(search_query=None, inventory=inventory)
+        updates = inventory.available_updates
+        rows = [
+            DeviceTable._build_row(snapshot, updates.get(snapshot.identity_key))
+            for snapshot in snapshots
+        ]
+        rows_fingerprint(rows)
+        diff = diff_rows(client_rows, rows, "id")
+        for row in diff.added + diff.changed:
+            client_rows[row["id"]] = row
+
+    return measure("update_table rows", size, repeat, size, run)
+
+
+def bench_deploy(
+    manager: DeviceManager, size: int, firmware_path: str, concurrency: int
+) -> BenchmarkResult:
+    """End-to-end batch deploy through DeployScheduler and the async CLI"""
+    devices = [d for d in manager.devices if manager.get_upload_target(d)]
+    scheduler = DeployScheduler(
+        max_concurrency=concurrency, target_key=manager.get_upload_target
+    )
+
+    def upload(device):
+        return manager.upload_firmware_to_device_async(
+            device, firmware_path, on_progress=lambda update: None
+        )
+
+    report = asyncio.run(scheduler.run(devices, upload))
+    return BenchmarkResult(
+        f"batch deploy (concurrency={concurrency})",
+        size,
+        latencies=[r.duration for r in report.results],
+        items_per_run=1,
+        elapsed=report.elapsed,
+        notes=f"{report.fail_count}/{report.total} failed",
+    )
+
+
+def run_suite(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    repeat: int = 5,
+    upload_delay: float = 0.05,
+    failure_rate: float = 0.0,
+    concurrency: int = DEFAULT_DEPLOY_CONCURRENCY,
+    deploy: bool = True,
+    work_dir: Optional[Path] = None,
+) -> List[BenchmarkResult]:
+    """
+    Run every benchmark at every device count
+
+    Args:
+        sizes: Simulated device counts
+        repeat: Runs per benchmark (batch deploy runs once per size)
+        upload_delay: Seconds each simulated upload takes
+        failure_rate: Fraction of simulated uploads that fail
+        concurrency: Maximum parallel uploads in the deploy benchmark
+        deploy: Include the batch deploy benchmark
+        work_dir: Directory for launchers and caches (default: a temporary one)
+
+    Returns:
+        Results in the order they were run
+    """
+    if work_dir is None:
+        with tempfile.TemporaryDirectory(prefix="harp-bench-") as tmp:
+            return run_suite(
+                sizes, repeat, upload_delay, failure_rate, concurrency, deploy, Path(tmp)
+            )
+
+    firmware_path = work_dir / "firmware.uf2"
+    firmware_path.write_bytes(b"\0" * 512)
+
+    results = []
+    for size in sizes:
+        launcher = create_launcher(
+            work_dir / f"devices-{size}",
+            devices=size,
+            upload_delay=upload_delay,
+            failure_rate=failure_rate,
+        )
+        manager = DeviceManager(
+            cli_path=str(launcher),
+            metadata_cache=DeviceMetadataCache(work_dir / f"metadata-{size}.json"),
+        )
+
+        results.extend(bench_refresh(manager, size, repeat))
+        results.append(bench_filter(manager, size, repeat))
+        results.append(bench_table_rows(manager, size, repeat))
+        if deploy:
+            results.append(bench_deploy(manager, size, str(firmware_path), concurrency))
+    return results
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """Format results as a plain text table"""
+    header = (
+        f"{'benchmark':<42} {'devices':>7} {'runs':>5} "
+        f"{'p50 ms':>10} {'p95 ms':>10} {'items/s':>11}  notes"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.name:<42} {r.devices:>7} {r.runs:>5} "
+            f"{r.p50 * 1000:>10.2f} {r.p95 * 1000:>10.2f} {r.throughput:>11.1f}  {r.notes}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--upload-delay", type=float, default=0.05)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_DEPLOY_CONCURRENCY)
+    parser.add_argument("--no-deploy", action="store_true", help="Skip the batch deploy benchmark")
+    parser.add_argument("--json", type=Path, help="Also write the results to a JSON file")
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        sizes=args.sizes,
+        repeat=args.repeat,
+        upload_delay=args.upload_delay,
+        failure_rate=args.failure_rate,
+        concurrency=args.concurrency,
+        deploy=not args.no_deploy,
+    )
+    print(format_results(results))
+
+    if args.json:
+        args.json.write_text(json.dumps([r.to_dict() for r in results], indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
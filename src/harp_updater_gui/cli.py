@@ -0,0 +1,564 @@
+"""
+Headless command line for listing Harp devices and flashing firmware
+
+Examples:
+    harp-updater list --updates
+    harp-updater plan Behavior-1.4.0.uf2 --device Behavior
+    harp-updater deploy Behavior-1.4.0.uf2 --device COM5 --device COM7 --yes
+    harp-updater deploy firmware.uf2 --concurrency 8 --yes --json
+
+Uses DeviceManager, FirmwareService and DeployScheduler directly and never
+imports NiceGUI or pywebview. Only argparse is loaded at startup; each
+command imports the services it needs, so the command line is usable the
+moment the interpreter is.
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+from harp_updater_gui.utils.constants import DEFAULT_DEPLOY_CONCURRENCY
+
+if TYPE_CHECKING:
+    from harp_updater_gui.models.device import Device, DeviceSnapshot
+    from harp_updater_gui.models.inventory import DeviceInventory
+    from harp_updater_gui.services.compatibility import FirmwareTarget
+    from harp_updater_gui.services.device_manager import DeviceManager
+    from harp_updater_gui.services.firmware_service import FirmwareService
+
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+@dataclass
+class PlanEntry:
+    """What a deploy would do with one selected device"""
+
+    snapshot: "DeviceSnapshot"
+    flash: bool
+    target: Optional[str] = None
+    reason: str = ""
+
+    @property
+    def device(self) -> "Device":
+        return self.snapshot.device
+
+
+@dataclass
+class DeployPlan:
+    """Devices a firmware file would be flashed to, and the ones skipped"""
+
+    firmware_path: str
+    firmware: "FirmwareTarget"
+    entries: List[PlanEntry] = field(default_factory=list)
+    unmatched: List[str] = field(default_factory=list)
+
+    @property
+    def to_flash(self) -> List[PlanEntry]:
+        return [entry for entry in self.entries if entry.flash]
+
+    @property
+    def skipped(self) -> List[PlanEntry]:
+        return [entry for entry in self.entries if not entry.flash]
+
+
+def device_json(snapshot: "DeviceSnapshot", update: Optional[str] = None) -> Dict[str, Any]:
+    """Describe a device for JSON output"""
+    device = snapshot.device
+    return {
+        "key": snapshot.identity_key,
+        "name": snapshot.display_name,
+        "kind": device.kind,
+        "state": device.state,
+        "port": device.port_name,
+        "serial": device.serial_number,
+        "who_am_i": device.who_am_i,
+        "firmware": device.firmware_version,
+        "hardware": device.hardware_version,
+        "status": snapshot.health_status,
+        "update": update,
+    }
+
+
+def format_table(headers: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    """Format rows as left-aligned text columns"""
+    cells = [[("" if value is None else str(value)) for value in row] for row in rows]
+    widths = [
+        max([len(header)] + [len(row[i]) for row in cells])
+        for i, header in enumerate(headers)
+    ]
+    lines = [
+        "  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip()
+        for row in [list(headers)] + cells
+    ]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def select_devices(
+    inventory: "DeviceInventory", selectors: Sequence[str]
+) -> Tuple[List["DeviceSnapshot"], List[str]]:
+    """
+    Pick devices by identity key, port, serial number or device name
+
+    Args:
+        inventory: Current inventory
+        selectors: Selector strings; none selects every device
+
+    Returns:
+        Tuple of (selected snapshots in inventory order, selectors matching nothing)
+    """
+    if not selectors:
+        return list(inventory.snapshots), []
+
+    keys = set()
+    unmatched = []
+    for selector in selectors:
+        matches = [
+            device
+            for device in (
+                inventory.by_key.get(selector),
+                inventory.by_port.get(selector),
+                inventory.by_serial.get(selector),
+            )
+            if device is not None
+        ] + list(inventory.by_name.get(selector, ()))
+        if not matches:
+            unmatched.append(selector)
+        keys.update(device.identity_key for device in matches)
+
+    selected = [s for s in inventory.snapshots if s.identity_key in keys]
+    return selected, unmatched
+
+
+def build_plan(
+    device_manager: "DeviceManager",
+    firmware_service: "FirmwareService",
+    firmware_path: str,
+    selectors: Sequence[str] = (),
+    force: bool = False,
+) -> DeployPlan:
+    """
+    Decide which selected devices a firmware file can be flashed to
+
+    A device is skipped when it has no upload target, when the file is not
+    valid for its kind, or (unless forced) when the firmware was built for a
+    different device or hardware version.
+
+    Args:
+        device_manager: Manager holding the current inventory
+        firmware_service: Service used to describe and validate the firmware
+        firmware_path: Path to firmware file
+        selectors: Device selectors (see select_devices)
+        force: Flash devices the compatibility check rejects
+
+    Returns:
+        DeployPlan
+    """
+    selected, unmatched = select_devices(device_manager.inventory, selectors)
+    firmware = firmware_service.describe_firmware(firmware_path)
+    # describe_firmware() already rescanned the repository if the file is in it
+    index = firmware_service.get_compatibility_index(refresh_repository=False)
+    compatibility = index.check_devices([s.device for s in selected], firmware)
+    plan = DeployPlan(firmware_path, firmware, unmatched=unmatched)
+
+    # The file is parsed once per device kind
+    validation: Dict[str, Tuple[bool, str]] = {}
+    for snapshot, result in zip(selected, compatibility):
+        device = snapshot.device
+        target = device_manager.get_upload_target(device)
+        if device.kind not in validation:
+            validation[device.kind] = firmware_service.validate_firmware_file(
+                device.kind, firmware_path
+            )
+        valid, error = validation[device.kind]
+
+        if not target:
+            entry = PlanEntry(snapshot, False, reason="No upload target")
+        elif not valid:
+            entry = PlanEntry(snapshot, False, target, error)
+        elif not result.compatible and not force:
+            entry = PlanEntry(snapshot, False, target, result.reason)
+        elif not result.compatible:
+            entry = PlanEntry(snapshot, True, target, f"Forced: {result.reason}")
+        else:
+            entry = PlanEntry(snapshot, True, target)
+        plan.entries.append(entry)
+    return plan
+
+
+def _log(message: str):
+    """Progress messages go to stderr, keeping stdout for results"""
+    print(message, file=sys.stderr, flush=True)
+
+
+def _open_device_manager(args) -> "DeviceManager":
+    from harp_updater_gui.services.device_manager import DeviceManager
+    from harp_updater_gui.utils.paths import get_harp_regulator_path
+
+    args.regulator = args.regulator or get_harp_regulator_path()
+    device_manager = DeviceManager(args.regulator)
+    device_manager.refresh_devices(
+        all_devices=not args.harp_only, allow_connect=args.connect
+    )
+    return device_manager
+
+
+def _open_firmware_service(args) -> "FirmwareService":
+    from harp_updater_gui.services.firmware_service import FirmwareService
+
+    return FirmwareService(args.regulator)
+
+
+def cmd_list(args) -> int:
+    """List connected devices"""
+    device_manager = _open_device_manager(args)
+    inventory = device_manager.inventory
+
+    updates: Dict[str, str] = {}
+    if args.updates:
+        entries = _open_firmware_service(args).get_available_updates(list(inventory.devices))
+        updates = {key: entry.firmware_version for key, entry in entries.items()}
+
+    if args.json:
+        records = [device_json(s, updates.get(s.identity_key)) for s in inventory.snapshots]
+        print(json.dumps(records, indent=2))
+        return EXIT_OK
+
+    if not inventory.snapshots:
+        print("No devices found")
+        return EXIT_OK
+
+    headers = ["NAME", "PORT", "KIND", "SERIAL", "HARDWARE", "FIRMWARE", "STATUS"]
+    if args.updates:
+        headers.append("UPDATE")
+    rows = []
+    for snapshot in inventory.snapshots:
+        device = snapshot.device
+        row = [
+            snapshot.display_name,
+            device.port_name,
+            device.kind,
+            device.serial_number,
+            device.hardware_version,
+            device.firmware_version,
+            snapshot.health_status,
+        ]
+        if args.updates:
+            row.append(updates.get(snapshot.identity_key))
+        rows.append(row)
+    print(format_table(headers, rows))
+    return EXIT_OK
+
+
+def _prepare_plan(args) -> Tuple[Optional[DeployPlan], "DeviceManager", "FirmwareService"]:
+    """Refresh devices and build the plan shared by plan and deploy"""
+    from pathlib import Path
+
+    if not Path(args.firmware).is_file():
+        _log(f"Error: firmware file not found: {args.firmware}")
+        return None, None, None
+
+    device_manager = _open_device_manager(args)
+    firmware_service = _open_firmware_service(args)
+    plan = build_plan(
+        device_manager, firmware_service, args.firmware, args.device, args.force
+    )
+    for selector in plan.unmatched:
+        _log(f"Error: no device matches '{selector}'")
+    if plan.unmatched:
+        return None, device_manager, firmware_service
+    return plan, device_manager, firmware_service
+
+
+def _plan_json(plan: DeployPlan) -> Dict[str, Any]:
+    firmware = plan.firmware
+    return {
+        "firmware": {
+            "path": plan.firmware_path,
+            "type": firmware.file_type,
+            "who_am_i": firmware.who_am_i,
+            "device_name": firmware.device_name,
+            "hardware_version": firmware.hardware_version,
+            "firmware_version": firmware.firmware_version,
+        },
+        "flash": [
+            {**device_json(e.snapshot), "target": e.target, "reason": e.reason}
+            for e in plan.to_flash
+        ],
+        "skip": [{**device_json(e.snapshot), "reason": e.reason} for e in plan.skipped],
+    }
+
+
+def _print_plan(plan: DeployPlan):
+    firmware = plan.firmware
+    details = ", ".join(
+        text
+        for text in (
+            firmware.device_name,
+            f"WhoAmI {firmware.who_am_i}" if firmware.who_am_i is not None else None,
+            f"v{firmware.firmware_version}" if firmware.firmware_version else None,
+            f"hardware {firmware.hardware_version}" if firmware.hardware_version else None,
+        )
+        if text
+    )
+    print(f"Firmware: {plan.firmware_path}" + (f" ({details})" if details else ""))
+
+    if plan.entries:
+        rows = [
+            [
+                "flash" if entry.flash else "skip",
+                entry.snapshot.display_name,
+                entry.target or entry.device.port_name,
+                entry.device.kind,
+                entry.device.firmware_version,
+                entry.reason,
+            ]
+            for entry in plan.entries
+        ]
+        print(format_table(["ACTION", "NAME", "TARGET", "KIND", "FIRMWARE", "REASON"], rows))
+    print(f"{len(plan.to_flash)} device(s) to flash, {len(plan.skipped)} skipped")
+
+
+def cmd_plan(args) -> int:
+    """Show what a deploy would do without flashing anything"""
+    plan, _, _ = _prepare_plan(args)
+    if plan is None:
+        return EXIT_USAGE
+
+    if args.json:
+        print(json.dumps(_plan_json(plan), indent=2))
+    else:
+        _print_plan(plan)
+    return EXIT_OK
+
+
+def _confirm(count: int) -> bool:
+    if not sys.stdin.isatty():
+        _log("Error: refusing to flash without confirmation; pass --yes")
+        return False
+    answer = input(f"Flash firmware to {count} device(s)? [y/N] ")
+    return answer.strip().lower() in ("y", "yes")
+
+
+async def _run_deploy(args, plan: DeployPlan, device_manager, firmware_service) -> Dict[str, Any]:
+    """Flash the planned devices and wait for them to come back"""
+    import asyncio
+    from harp_updater_gui.services.activity_journal import get_activity_journal
+    from harp_updater_gui.services.cli_executor import get_cli_executor
+    from harp_updater_gui.services.deploy_scheduler import DeployScheduler, device_tag
+    from harp_updater_gui.services.readiness import DeviceReadiness
+
+    devices = [entry.device for entry in plan.to_flash]
+    executor = get_cli_executor()
+    readiness = DeviceReadiness(device_manager.cli)
+    journal = get_activity_journal()
+    context = {
+        "firmware_path": plan.firmware_path,
+        "firmware_sha256": await executor.run(
+            firmware_service.inspection_cache.digest, plan.firmware_path
+        ),
+        "source": "cli",
+    }
+    journal.record(
+        "info", f"Starting headless deploy to {len(devices)} device(s)", **context
+    )
+
+    if args.wait:
+        port_devices = [d for d in devices if d.port_name]
+        releases = await asyncio.gather(
+            *(
+                executor.run(readiness.wait_for_port_release, d.port_name, d.kind)
+                for d in port_devices
+            )
+        )
+        for device, (released, elapsed) in zip(port_devices, releases):
+            if not released:
+                _log(f"{device_tag(device)} Port still busy after {elapsed:.1f}s")
+
+    known_ports = device_manager.get_ports()
+    scheduler = DeployScheduler(
+        max_concurrency=args.concurrency, target_key=device_manager.get_upload_target
+    )
+
+    def on_start(device, position):
+        _log(f"{device_tag(device)} Uploading ({position}/{len(devices)})...")
+
+    def on_finish(result, completed):
+        tag = device_tag(result.device)
+        if result.success:
+            message, level = f"{tag} Uploaded in {result.duration:.1f}s", "success"
+        else:
+            first_line = (result.output or "").strip().splitlines()[:1]
+            message = f"{tag} Upload failed: {first_line[0] if first_line else 'unknown error'}"
+            level = "error"
+        _log(message)
+        journal.record(level, message, device=result.device, duration=result.duration, **context)
+
+    report = await scheduler.run(
+        devices,
+        lambda device: device_manager.upload_firmware_to_device_async(
+            device, plan.firmware_path, args.force
+        ),
+        on_start=on_start,
+        on_finish=on_finish,
+    )
+
+    ready: Dict[int, Optional[bool]] = {}
+    flashed = [r.device for r in report.results if r.success]
+    if args.wait and flashed:
+        _log(f"Waiting for {len(flashed)} device(s) to reboot...")
+        for result in await executor.run(readiness.wait_for_devices, flashed, known_ports):
+            ready[id(result.device)] = result.ready
+            if not result.ready:
+                _log(f"{device_tag(result.device)} Did not re-appear within {result.elapsed:.1f}s")
+
+    summary = (
+        f"Deployed to {report.success_count}/{report.total} device(s) in "
+        f"{report.elapsed:.1f}s (up to {scheduler.max_concurrency} in parallel)"
+    )
+    journal.record("success" if report.fail_count == 0 else "warning", summary, **context)
+
+    snapshots = {id(entry.device): entry.snapshot for entry in plan.to_flash}
+    return {
+        "summary": summary,
+        "firmware": plan.firmware_path,
+        "firmware_sha256": context["firmware_sha256"],
+        "elapsed": report.elapsed,
+        "succeeded": report.success_count,
+        "failed": report.fail_count,
+        "results": [
+            {
+                **device_json(snapshots[id(r.device)]),
+                "success": r.success,
+                "duration": r.duration,
+                "ready": ready.get(id(r.device)),
+                "output": r.output,
+            }
+            for r in report.results
+        ],
+        "skipped": [{**device_json(e.snapshot), "reason": e.reason} for e in plan.skipped],
+    }
+
+
+def cmd_deploy(args) -> int:
+    """Flash firmware to the selected devices"""
+    import asyncio
+
+    plan, device_manager, firmware_service = _prepare_plan(args)
+    if plan is None:
+        return EXIT_USAGE
+
+    if not args.json:
+        _print_plan(plan)
+    if not plan.to_flash:
+        _log("Nothing to deploy")
+        return EXIT_FAILED
+    if not args.yes and not _confirm(len(plan.to_flash)):
+        return EXIT_USAGE
+
+    result = asyncio.run(_run_deploy(args, plan, device_manager, firmware_service))
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(result["summary"])
+        for entry in result["results"]:
+            if not entry["success"]:
+                print(f"FAILED {entry['name']} @ {entry['port'] or entry['key']}: {entry['output'].strip()}")
+    return EXIT_OK if result["failed"] == 0 else EXIT_FAILED
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the harp-updater command"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--regulator",
+        metavar="PATH",
+        help="HarpRegulator executable (default: HARP_REGULATOR_PATH, PATH or the bundled copy)",
+    )
+    common.add_argument(
+        "--connect",
+        action="store_true",
+        help="Connect to devices while listing to read missing metadata",
+    )
+    common.add_argument(
+        "--harp-only",
+        action="store_true",
+        help="Leave out devices that are not definitively Harp devices",
+    )
+    common.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+
+    targets = argparse.ArgumentParser(add_help=False)
+    targets.add_argument("firmware", help="Firmware file (.uf2 or .hex)")
+    targets.add_argument(
+        "-d",
+        "--device",
+        action="append",
+        default=[],
+        metavar="SELECTOR",
+        help="Device key, port, serial number or name (repeatable; default: all devices)",
+    )
+    targets.add_argument(
+        "--force", action="store_true", help="Flash devices that fail the compatibility check"
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="harp-updater",
+        description="List Harp devices and flash firmware without the GUI.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", parents=[common], help="List connected devices")
+    list_parser.add_argument(
+        "--updates",
+        action="store_true",
+        help="Show newer firmware available in the local repository",
+    )
+    list_parser.set_defaults(handler=cmd_list)
+
+    plan_parser = commands.add_parser(
+        "plan", parents=[common, targets], help="Show what deploy would flash"
+    )
+    plan_parser.set_defaults(handler=cmd_plan)
+
+    deploy_parser = commands.add_parser(
+        "deploy", parents=[common, targets], help="Flash firmware to devices"
+    )
+    deploy_parser.add_argument(
+        "-j",
+        "--concurrency",
+        type=int,
+        default=DEFAULT_DEPLOY_CONCURRENCY,
+        help=f"Maximum uploads in parallel (default: {DEFAULT_DEPLOY_CONCURRENCY})",
+    )
+    deploy_parser.add_argument(
+        "-y", "--yes", action="store_true", help="Do not ask for confirmation"
+    )
+    deploy_parser.add_argument(
+        "--no-wait",
+        dest="wait",
+        action="store_false",
+        help="Do not wait for ports to be released or devices to reboot",
+    )
+    deploy_parser.set_defaults(handler=cmd_deploy)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point of the harp-updater command"""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except FileNotFoundError as e:
+        _log(f"Error: {e.strerror}: {e.filename}")
+        return EXIT_FAILED
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,23 @@
-from nicegui import ui, app, run
-from typing import Optional, Callable
+from nicegui import ui, app
+from typing import Dict, Optional, Callable
 from pathlib import Path
-from harp_updater_gui.models.device import Device
-from harp_updater_gui.services.device_manager import DeviceManager
-from harp_updater_gui.services.firmware_service import FirmwareService
+from harp_updater_gui.models.device import Device, DeviceSnapshot
+from harp_updater_gui.models.inventory import DeviceInventory
+from harp_updater_gui.services.device_watcher import HotplugEvent
+from harp_updater_gui.services.inventory_service import InventoryService
+from harp_updater_gui.utils.metrics import TABLE_UPDATE_DURATION
+from harp_updater_gui.utils.row_diff import diff_rows, rows_fingerprint
+
+
+def format_cached_value(value: str, age: Optional[float]) -> str:
+    """Append the age of a value restored from the metadata cache"""
+    if age is None:
+        return value
+    if age < 3600:
+        return f"{value} (cached {max(1, int(age // 60))}m)"
+    if age < 86400:
+        return f"{value} (cached {int(age // 3600)}h)"
+    return f"{value} (cached {int(age // 86400)}d)"
 
 
 class DeviceTable:
@@ -11,21 +25,26 @@ class DeviceTable:
 
     def __init__(
         self,
-        device_manager: DeviceManager,
-        firmware_service: FirmwareService,
+        inventory: InventoryService,
         on_deploy: Optional[Callable] = None,
+        server_side: bool = False,
+        rows_per_page: int = 10,
     ):
         """
         Initialize device table
 
         Args:
-            device_manager: DeviceManager instance
-            firmware_service: FirmwareService instance
+            inventory: Process-wide inventory service shared by all clients
             on_deploy: Callback when firmware deployment is initiated
+            server_side: Search, sort and page on the server and send only
+                the visible page to the browser
+            rows_per_page: Initial page size
         """
-        self.device_manager = device_manager
-        self.firmware_service = firmware_service
+        self.inventory = inventory
+        self.device_manager = inventory.device_manager
+        self.firmware_service = inventory.firmware_service
         self.on_deploy = on_deploy
+        self.server_side = server_side
 
         self.table = None
         self.selected_device: Optional[Device] = None
@@ -39,21 +58,61 @@ class DeviceTable:
         self.refresh_button = None
         self.refresh_dialog = None
         self.is_refreshing = False
+        self.is_deploying = False
+
+        # Subscription token for inventory changes
+        self._subscription: Optional[int] = None
+
+        # Rows currently on the client, indexed by device identity key
+        self._rows_by_key: Dict[str, dict] = {}
+        self._rows_fingerprint: Optional[int] = None
+        # (inventory version, filter) the rows were last built from
+        self._render_key: Optional[tuple] = None
 
         # Search and filter state
         self.filter_type = "All types"
+        self.search_query = ""
+        self.pagination = {
+            "page": 1,
+            "rowsPerPage": rows_per_page,
+            "sortBy": "name",
+            "descending": False,
+        }
+
+    async def _deploy_selected(self) -> bool:
+        """
+        Deploy the selected firmware to the selected device(s)
+
+        Returns:
+            True if the upload ran and the device list should be refreshed
+        """
+        if not self.on_deploy:
+            return False
+
+        if self.selected_device.kind == "Pico" or self.selected_device.kind == "PICO":
+            self.force_upload_checkbox.set_value(True)  # Force upload for Pico devices
+
+        force = self.force_upload_checkbox.value
+        batch_update = self.batch_update_checkbox.value
+
+        if batch_update:
+            # Find all devices with the same name
+            devices_to_update = self.device_manager.get_devices_by_name(
+                self.selected_device.display_name
+            )
+            return await self.on_deploy(devices_to_update, self.firmware_file_path, force)
+        # Single device update
+        return await self.on_deploy([self.selected_device], self.firmware_file_path, force)
 
     def _get_deploy_eligibility(self) -> tuple[bool, Optional[str]]:
         """Evaluate whether firmware deployment is currently allowed."""
-        devices = self.device_manager.get_devices()
-
-        if not devices:
+        if not self.device_manager.get_devices():
             return False, "No devices available for firmware deployment"
 
-        bootloader_devices = [d for d in devices if d.state == "Bootloader"]
-        error_devices = [
-            d for d in devices if d.state in ("DriverError", "DeviceError")
-        ]
+        bootloader_devices = self.device_manager.get_devices_by_state("Bootloader")
+        error_devices = self.device_manager.get_devices_by_state(
+            "DriverError", "DeviceError"
+        )
 
         # Never allow deployment when any device is in error state.
         if error_devices:
@@ -68,7 +127,7 @@ class DeviceTable:
                 return False, "Select the Bootloader device to deploy firmware"
 
             bootloader_device = bootloader_devices[0]
-            if self.selected_device.port_name != bootloader_device.port_name:
+            if self.selected_device.identity_key != bootloader_device.identity_key:
                 return False, "Deployment allowed only to the single Bootloader device"
 
             if self.batch_update_checkbox and self.batch_update_checkbox.value:
@@ -100,7 +159,14 @@ class DeviceTable:
 
                     # Filter dropdown
                     ui.select(
-                        options=["All types", "Pico", "ATxmega", "Healthy", "Error"],
+                        options=[
+                            "All types",
+                            "Pico",
+                            "ATxmega",
+                            "Healthy",
+                            "Needs update",
+                            "Error",
+                        ],
                         value="All types",
                     ).classes("w-36").bind_value(self, "filter_type").on_value_change(
                         self.update_table
@@ -177,18 +243,21 @@ class DeviceTable:
                         },
                     ],
                     rows=[],
-                    row_key="port",
+                    row_key="id",
                     selection="single",
-                    pagination={
-                        "rowsPerPage": 10,
-                        "sortBy": "name",
-                        "descending": False,
-                    },
+                    pagination=(
+                        {**self.pagination, "rowsNumber": 0}
+                        if self.server_side
+                        else dict(self.pagination)
+                    ),
                 )
                 .classes("w-full")
                 .props("flat bordered")
                 .on("selection", self.on_row_select)
             )
+            if self.server_side:
+                # Quasar emits "request" instead of filtering, sorting and paging itself
+                self.table.on("request", self.on_table_request)
 
             self.table.add_slot(
                 "body-cell-status",
@@ -201,6 +270,18 @@ class DeviceTable:
             """,
             )
 
+            self.table.add_slot(
+                "body-cell-firmware",
+                """
+                <q-td :props="props">
+                    {{ props.row.firmware }}
+                    <q-badge v-if="props.row.update" color="info" class="q-ml-sm">
+                        v{{ props.row.update }} available
+                    </q-badge>
+                </q-td>
+            """,
+            )
+
             # Bind search input to table filter after table is created
             search_input.bind_value(self.table, "filter")
 
@@ -238,9 +319,45 @@ class DeviceTable:
             # Initial load
             ui.timer(0.1, self._initial_refresh, once=True)
 
+            # Receive refreshes and hot-plug changes from every client
+            self._subscription = self.inventory.subscribe(self.on_inventory_change)
+
+            # Slow down hot-plug polling while the window is hidden
+            ui.on(
+                "visibilitychange",
+                lambda e: self.inventory.set_hidden(self._subscription, bool(e.args)),
+            )
+            ui.context.client.on_disconnect(
+                lambda: self.inventory.unsubscribe(self._subscription)
+            )
+
     async def _initial_refresh(self):
         """Run initial refresh after UI has mounted."""
-        await self.refresh_devices(show_notification=False)
+        # Another client may already have enumerated the devices
+        if self.device_manager.inventory.version == 0:
+            await self.refresh_devices(show_notification=False)
+        else:
+            self.update_table()
+
+        ui.run_javascript(
+            """
+            document.addEventListener('visibilitychange', () => {
+                emitEvent('visibilitychange', document.hidden);
+            });
+            """
+        )
+        self.inventory.start_watching()
+
+    def on_inventory_change(self, event: Optional[HotplugEvent]):
+        """Reflect a refresh or devices plugged in or removed since the last poll"""
+        with self.table:
+            self.update_table()
+            if event is None:
+                return
+            for device in event.added:
+                ui.notify(f"Device connected: {device.display_name}", type="info")
+            for device in event.removed:
+                ui.notify(f"Device disconnected: {device.display_name}", type="info")
 
     def _set_refreshing(self, refreshing: bool):
         """Update refresh UI state."""
@@ -265,10 +382,9 @@ class DeviceTable:
         if show_notification:
             ui.notify("Checking for devices...", type="info")
         try:
-            devices = await run.io_bound(
-                self.device_manager.refresh_devices,
-                True,
-                self.connect_all_on_refresh,
+            # Joins a refresh already started by another client
+            devices = await self.inventory.refresh(
+                True, self.connect_all_on_refresh, owner=self._subscription
             )
             self.update_table()
             if show_notification:
@@ -289,56 +405,141 @@ class DeviceTable:
         else:
             ui.notify("Connect on refresh disabled", type="info")
 
-    def update_table(self):
-        """Update the device table with filtered data"""
-        # Only filter by device type since search is handled by table's built-in filter
-        devices = self.device_manager.filter_devices(
-            search_query=None,  # Don't filter by search query - the table handles this
-            device_type=self.filter_type if self.filter_type != "All types" else None,
+    @staticmethod
+    def _build_row(snapshot: DeviceSnapshot, update_version: Optional[str] = None) -> dict:
+        """Build the table row for a device"""
+        device = snapshot.device
+        # Map health color to Quasar color
+        status_color = (
+            "positive"
+            if snapshot.health_color == "green"
+            else ("warning" if snapshot.health_color == "yellow" else "negative")
         )
 
-        rows = []
-        for device in devices:
-            # Map health color to Quasar color
-            status_color = (
-                "positive"
-                if device.health_color == "green"
-                else ("warning" if device.health_color == "yellow" else "negative")
-            )
-
-            rows.append(
-                {
-                    "name": device.display_name,
-                    "port": device.port_name,
-                    "kind": "PICO"
-                    if device.kind == "Pico"
-                    else (device.kind or "Unknown"),
-                    "hardware": f"v{device.hardware_version or '?'}",
-                    "firmware": f"v{device.firmware_version or '?'}",
-                    "status": device.health_status,
-                    "status_color": status_color,
-                }
-            )
+        return {
+            "id": snapshot.identity_key,
+            "name": snapshot.display_name,
+            "port": device.port_name,
+            "kind": "PICO" if device.kind == "Pico" else (device.kind or "Unknown"),
+            "hardware": format_cached_value(
+                f"v{device.hardware_version or '?'}",
+                device.cached_age("HardwareVersion"),
+            ),
+            "firmware": format_cached_value(
+                f"v{device.firmware_version or '?'}",
+                device.cached_age("FirmwareVersion"),
+            ),
+            "update": update_version or "",
+            "status": snapshot.health_status,
+            "status_color": status_color,
+        }
+
+    def on_table_request(self, e):
+        """Handle a server-side page, sort or search request from the table"""
+        pagination = e.args.get("pagination") or {}
+        self.pagination = {
+            key: pagination.get(key, value) for key, value in self.pagination.items()
+        }
+        self.search_query = e.args.get("filter") or ""
+        self.update_table()
 
-        self.table.rows = rows
-        self.table.update()
+    def update_table(self):
+        """Update the device table with filtered data, sending only real changes"""
+        # Nothing to do if neither the inventory nor the view changed
+        inventory = self.device_manager.inventory
+        render_key = (inventory.version, self.filter_type)
+        if self.server_side:
+            render_key += (self.search_query, tuple(self.pagination.values()))
+        rendered = render_key != self._render_key
+        with TABLE_UPDATE_DURATION.time(rendered=str(rendered).lower()):
+            if rendered:
+                self._render_inventory(inventory)
+                self._render_key = render_key
 
         # Enable deploy button if firmware is selected
         if self.firmware_file_path and self.selected_device:
             self.deploy_button.set_enabled(True)
+        elif not self.selected_device:
+            self.deploy_button.set_enabled(False)
+
+    def _render_inventory(self, inventory: DeviceInventory):
+        """Rebuild the rows from an inventory version"""
+        device_type = self.filter_type if self.filter_type != "All types" else None
+        if self.server_side:
+            snapshots, total = self.device_manager.query_snapshots(
+                search_query=self.search_query,
+                device_type=device_type,
+                sort_by=self.pagination["sortBy"],
+                descending=bool(self.pagination["descending"]),
+                page=self.pagination["page"],
+                rows_per_page=self.pagination["rowsPerPage"],
+                inventory=inventory,
+            )
+            rows_per_page = self.pagination["rowsPerPage"]
+            if rows_per_page:
+                last_page = max(1, -(-total // rows_per_page))
+                self.pagination["page"] = min(self.pagination["page"], last_page)
+            self.table.pagination = {**self.pagination, "rowsNumber": total}
+        else:
+            # Only filter by device type since search is handled by table's built-in filter
+            snapshots = self.device_manager.filter_snapshots(
+                search_query=None,  # Don't filter by search query - the table handles this
+                device_type=device_type,
+                inventory=inventory,
+            )
+
+        # Keep the selection pointing at the latest Device object
+        if self.selected_device:
+            self.selected_device = inventory.by_key.get(self.selected_device.identity_key)
+
+        updates = inventory.available_updates
+        rows = [
+            self._build_row(snapshot, updates.get(snapshot.identity_key))
+            for snapshot in snapshots
+        ]
+        fingerprint = rows_fingerprint(rows)
+
+        if fingerprint != self._rows_fingerprint:
+            self._apply_rows(rows)
+            self._rows_fingerprint = fingerprint
+
+    def _apply_rows(self, rows: list):
+        """
+        Patch the table rows in place with the difference to the new rows
+
+        Unchanged rows keep their dict objects, changed rows are updated in
+        place, so the selection survives refreshes and the table is updated once.
+        """
+        diff = diff_rows(self._rows_by_key, rows, "id")
+
+        for row in diff.changed:
+            self._rows_by_key[row["id"]].update(row)
+        for row in diff.removed:
+            del self._rows_by_key[row["id"]]
+        for row in diff.added:
+            self._rows_by_key[row["id"]] = row
+
+        self.table.rows[:] = [self._rows_by_key[row["id"]] for row in rows]
+
+        if diff.removed:
+            removed_keys = {row["id"] for row in diff.removed}
+            self.table.selected[:] = [
+                row for row in self.table.selected if row["id"] not in removed_keys
+            ]
+            if not self.table.selected:
+                self.selected_device = None
+
+        self.table.update()
 
     def on_row_select(self, e):
         """Handle row selection"""
         # Access the table's selected rows directly
         if self.table.selected and len(self.table.selected) > 0:
             selected_row = self.table.selected[0]
-            port_name = selected_row["port"]
+            key = selected_row["id"]
 
-            # Find the device by port name
-            devices = self.device_manager.get_devices()
-            self.selected_device = next(
-                (d for d in devices if d.port_name == port_name), None
-            )
+            # Find the device by identity key
+            self.selected_device = self.device_manager.get_device_by_key(key)
 
             # Enable deploy button if firmware is selected
             if self.firmware_file_path and self.selected_device:
@@ -422,37 +623,18 @@ class DeviceTable:
 
         # Disable button during deployment
         self.deploy_button.set_enabled(False)
+        self.is_deploying = True
 
         try:
-            if self.on_deploy:
-                if (
-                    self.selected_device.kind == "Pico"
-                    or self.selected_device.kind == "PICO"
-                ):
-                    self.force_upload_checkbox.set_value(
-                        True
-                    )  # Force upload for Pico devices
-
-                force = self.force_upload_checkbox.value
-                batch_update = self.batch_update_checkbox.value
-
-                if batch_update:
-                    # Find all devices with the same name
-                    all_devices = self.device_manager.get_devices()
-                    devices_to_update = [
-                        d
-                        for d in all_devices
-                        if d.display_name == self.selected_device.display_name
-                    ]
-                    await self.on_deploy(
-                        devices_to_update, self.firmware_file_path, force
-                    )
-                else:
-                    # Single device update
-                    await self.on_deploy(
-                        [self.selected_device], self.firmware_file_path, force
-                    )
+            # Pause hot-plug polling and other clients' connecting refreshes
+            with self.inventory.hold(owner=self._subscription):
+                deployed = await self._deploy_selected()
+            # Refresh once the hold is released, so this refresh may connect
+            if deployed:
+                await self.refresh_devices()
         finally:
+            self.is_deploying = False
+
             # Re-enable button after deployment
             if self.selected_device and self.firmware_file_path:
                 self.deploy_button.set_enabled(True)
@@ -0,0 +1,111 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from nicegui import run, ui
+from harp_updater_gui.services.activity_journal import ActivityJournal, JournalCursor
+
+
+class JournalViewer:
+    """Searchable history of the activity journal, loaded one page at a time"""
+
+    # Entries read from disk per page
+    PAGE_SIZE = 100
+
+    LEVEL_CLASSES = {
+        "info": "log-info",
+        "success": "log-success",
+        "warning": "log-warning",
+        "error": "log-error",
+        "debug": "log-debug",
+    }
+
+    def __init__(self, journal: ActivityJournal):
+        """
+        Initialize journal viewer
+
+        Args:
+            journal: Journal to browse
+        """
+        self.journal = journal
+        self.query = ""
+        # Position of the oldest entry shown
+        self._cursor: Optional[JournalCursor] = None
+
+        self.dialog = None
+        self.entries_column = None
+        self.load_more_button = None
+        self.status_label = None
+
+    def render(self):
+        """Render the history button and its dialog"""
+        with ui.dialog() as self.dialog, ui.card().classes("w-[48rem] max-w-full"):
+            with ui.row().classes("w-full items-center justify-between"):
+                ui.label("Activity History").classes("text-lg font-semibold")
+                ui.button(icon="close", on_click=self.dialog.close).props("flat round dense")
+
+            ui.input(placeholder="Search messages and devices").classes("w-full").props(
+                "clearable dense debounce=400"
+            ).bind_value(self, "query").on_value_change(self.reload)
+
+            with ui.scroll_area().classes("w-full h-96 activity-log"):
+                self.entries_column = ui.column().classes("w-full gap-0")
+
+            with ui.row().classes("w-full items-center justify-between"):
+                self.status_label = ui.label("").classes("text-xs text-secondary")
+                self.load_more_button = ui.button(
+                    "Load older", on_click=self.load_older
+                ).classes("btn btn-secondary")
+
+        ui.button("History", on_click=self.open).props("flat dense")
+
+    async def open(self):
+        """Open the dialog showing the newest entries"""
+        self.dialog.open()
+        await self.reload()
+
+    async def reload(self):
+        """Start again from the newest matching entry"""
+        self._cursor = None
+        self.entries_column.clear()
+        await self.load_older()
+
+    async def load_older(self):
+        """Append the next page of older entries"""
+        # Journal I/O must not queue behind CLI calls on the CLI executor
+        entries, self._cursor = await run.io_bound(
+            self._read_page, self._cursor, self.query or ""
+        )
+
+        with self.entries_column:
+            for entry in entries:
+                ui.label(self.format_entry(entry)).classes(
+                    self.LEVEL_CLASSES.get(entry.get("level"), "log-info")
+                )
+
+        shown = len(self.entries_column.default_slot.children)
+        has_more = len(entries) == self.PAGE_SIZE
+        self.load_more_button.set_enabled(has_more)
+        self.status_label.set_text(
+            f"{shown} entries shown" + ("" if has_more else " (end of history)")
+        )
+
+    def _read_page(self, cursor: Optional[JournalCursor], query: str):
+        """Read a page once pending entries are written (runs on a worker thread)"""
+        self.journal.flush()
+        return self.journal.page(cursor, self.PAGE_SIZE, query)
+
+    @staticmethod
+    def format_entry(entry: Dict[str, Any]) -> str:
+        """Format a journal entry as a single log line"""
+        timestamp = datetime.fromtimestamp(entry.get("ts", 0)).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+        # Device messages already carry their [name @ port] tag
+        parts = [
+            f"[{timestamp}]",
+            entry.get("level", "info").upper(),
+            entry.get("message", ""),
+        ]
+
+        if entry.get("firmware_sha256"):
+            parts.append(f"sha256:{entry['firmware_sha256'][:12]}")
+        return " ".join(parts)
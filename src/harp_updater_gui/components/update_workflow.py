@@ -1,6 +1,19 @@
 from nicegui import ui
 from datetime import datetime
 from enum import Enum
+from itertools import groupby
+from typing import Any, Dict, Optional
+from harp_updater_gui.components.journal_viewer import JournalViewer
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.services.activity_journal import ActivityJournal
+from harp_updater_gui.utils.constants import (
+    ACTIVITY_LOG_BUFFER_SIZE,
+    ACTIVITY_LOG_FLUSH_INTERVAL,
+    ACTIVITY_LOG_MAX_ENTRIES_PER_FLUSH,
+    ACTIVITY_LOG_MAX_LINES,
+    LOGGING_LEVEL,
+)
+from harp_updater_gui.utils.log_buffer import LazyMessage, LogBuffer, LogEntry, fold_text
 
 
 class LogLevel(Enum):
@@ -34,10 +47,29 @@ class UpdateWorkflow:
         LogLevel.DEBUG: "🔍",
     }
 
-    def __init__(self):
-        """Initialize update workflow component"""
+    def __init__(
+        self,
+        show_debug: bool = LOGGING_LEVEL == "DEBUG",
+        journal: Optional[ActivityJournal] = None,
+    ):
+        """
+        Initialize update workflow component
+
+        Args:
+            show_debug: Record DEBUG messages; when False they are dropped
+                before their text is built
+            journal: Persistent journal every recorded message is also written to
+        """
         self.has_error = False
         self.error_message = ""
+        self.show_debug = show_debug
+        self.journal = journal
+
+        # Fields added to every journal entry (e.g. the firmware being deployed)
+        self.journal_context: Dict[str, Any] = {}
+
+        # Entries waiting for the next timer flush to the client
+        self._buffer = LogBuffer(ACTIVITY_LOG_BUFFER_SIZE)
 
         # UI elements
         self.log = None
@@ -47,12 +79,22 @@ class UpdateWorkflow:
         """Render the update workflow panel"""
         with ui.column().classes("workflow-container w-full"):
             # Workflow title
-            ui.label("Activity Log").classes("workflow-title")
+            with ui.row().classes("w-full items-center justify-between"):
+                ui.label("Activity Log").classes("workflow-title")
+                with ui.row().classes("items-center gap-2"):
+                    ui.checkbox("Debug").bind_value(self, "show_debug").props("dense")
+                    if self.journal:
+                        JournalViewer(self.journal).render()
 
             # Log section
-            self.log = ui.log(max_lines=999).classes("activity-log w-full")
+            self.log = ui.log(max_lines=ACTIVITY_LOG_MAX_LINES).classes(
+                "activity-log w-full"
+            )
             self.push_log("Ready to start firmware updates.", LogLevel.INFO)
 
+            # Send buffered entries in batches instead of one message per line
+            ui.timer(ACTIVITY_LOG_FLUSH_INTERVAL, self.flush_log)
+
             # Alert container (initially hidden)
             self.alert_container = ui.column().classes("hidden")
 
@@ -88,22 +130,65 @@ class UpdateWorkflow:
         )
         self.push_log(f"Target firmware version: {firmware_version}", LogLevel.INFO)
 
-    def push_log(self, message: str, level: LogLevel = LogLevel.INFO):
+    def is_enabled(self, level: LogLevel) -> bool:
+        """Check whether messages of a level are recorded"""
+        return level != LogLevel.DEBUG or self.show_debug
+
+    def push_log(
+        self,
+        message: LazyMessage,
+        level: LogLevel = LogLevel.INFO,
+        device: Optional[Device] = None,
+        **fields,
+    ):
         """
         Push a log message with a specific level and color
 
+        The message is buffered and sent with the next flush; it is only
+        formatted then, so filtered DEBUG messages cost nothing.
+
         Args:
-            message: Log message text
+            message: Log message text, or a callable returning it (for
+                messages that are expensive to build)
             level: Log level (INFO, SUCCESS, WARNING, ERROR, DEBUG)
+            device: Device the message is about (recorded in the journal)
+            **fields: Extra journal fields, e.g. duration
         """
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        prefix = self.LOG_PREFIXES.get(level, "")
-        color_class = self.LOG_COLORS.get(level, "log-info")
-        log_entry = f"[{timestamp}] {prefix} {message}"
+        if not self.is_enabled(level):
+            return
+        self._buffer.append(level, message)
+        if self.journal:
+            self.journal.record(
+                level.value, message, device=device, **self.journal_context, **fields
+            )
+
+    def _format_entry(self, entry: LogEntry) -> str:
+        """Format a log entry for display, folding oversized output"""
+        timestamp = datetime.fromtimestamp(entry.timestamp).strftime("%H:%M:%S")
+        prefix = self.LOG_PREFIXES.get(entry.level, "")
+        return f"[{timestamp}] {prefix} {fold_text(entry.text)}"
+
+    def flush_log(self):
+        """Send buffered entries to the client, one element per run of same-level entries"""
+        if not self.log or not len(self._buffer):
+            return
+
+        entries, dropped = self._buffer.drain(ACTIVITY_LOG_MAX_ENTRIES_PER_FLUSH)
+        if dropped:
+            self._append_block(
+                f"… {dropped} log entries dropped (too many messages)", LogLevel.WARNING
+            )
+
+        for level, run in groupby(entries, key=lambda entry: entry.level):
+            self._append_block("\n".join(self._format_entry(e) for e in run), level)
 
-        # Update UI with colored log entry
-        if self.log:
-            self.log.push(log_entry, classes=color_class)
+    def _append_block(self, text: str, level: LogLevel):
+        """Add multi-line text as a single log element (ui.log.push adds one per line)"""
+        with self.log:
+            ui.label(text).classes(replace=self.LOG_COLORS.get(level, "log-info"))
+        children = self.log.default_slot.children
+        while len(children) > ACTIVITY_LOG_MAX_LINES:
+            self.log.remove(children[0])
 
     def show_error(self, error_message: str):
         """
@@ -114,6 +199,7 @@ class UpdateWorkflow:
         """
         self.has_error = True
         self.error_message = error_message
+        self.flush_log()
 
         with ui.dialog() as dialog, ui.card().classes("w-96"):
             ui.label("Firmware Update Error").classes("text-h6 text-negative")
@@ -133,6 +219,7 @@ class UpdateWorkflow:
         """
         self.has_error = True
         self.error_message = error_message
+        self.flush_log()
 
         with ui.dialog() as dialog, ui.card().classes("w-96"):
             ui.label("Firmware Update Failed").classes("text-h6 text-negative")
@@ -0,0 +1,124 @@
+import threading
+import time
+from typing import Dict, List, Optional
+from nicegui import ui
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.services.cli_wrapper import UploadProgress
+from harp_updater_gui.services.deploy_scheduler import device_tag
+
+
+class UploadProgressPanel:
+    """Per-device upload progress bars for the deploy dialog"""
+
+    # Seconds without a progress update before an upload is flagged as stalled
+    STALL_SECONDS = 15.0
+
+    # Refresh period of the progress bars (seconds)
+    REFRESH_INTERVAL = 0.25
+
+    def __init__(self, devices: List[Device]):
+        """
+        Initialize upload progress panel
+
+        Args:
+            devices: Devices being flashed, in deploy order
+        """
+        self.devices = devices
+        self._lock = threading.Lock()
+        self._latest: Dict[int, UploadProgress] = {}
+        self._started_at: Dict[int, float] = {}
+        self._updated_at: Dict[int, float] = {}
+        self._finished: Dict[int, bool] = {}
+
+        self.bars: Dict[int, ui.linear_progress] = {}
+        self.status_labels: Dict[int, ui.label] = {}
+        self.timer: Optional[ui.timer] = None
+
+    def render(self):
+        """Render one progress row per device"""
+        with ui.scroll_area().classes("w-96 max-h-80"):
+            for idx, device in enumerate(self.devices):
+                with ui.column().classes("w-full gap-1 mb-2"):
+                    ui.label(device_tag(device)).classes("text-sm font-medium")
+                    self.bars[idx] = ui.linear_progress(
+                        value=0, show_value=False
+                    ).props("rounded")
+                    self.status_labels[idx] = ui.label("Queued").classes(
+                        "text-xs text-secondary"
+                    )
+
+        self.timer = ui.timer(self.REFRESH_INTERVAL, self.refresh)
+
+    def start(self, idx: int):
+        """Mark an upload as started"""
+        now = time.monotonic()
+        with self._lock:
+            self._started_at[idx] = now
+            self._updated_at[idx] = now
+
+    def report(self, idx: int, update: UploadProgress):
+        """
+        Record a progress update; safe to call from worker threads
+
+        Args:
+            idx: Position of the device in the deploy list
+            update: Parsed progress update
+        """
+        with self._lock:
+            previous = self._latest.get(idx)
+            if update.percent is None and previous is not None:
+                # Keep the last known percentage when only the phase changes
+                update = UploadProgress(previous.percent, update.phase, update.line)
+            self._latest[idx] = update
+            self._updated_at[idx] = time.monotonic()
+
+    def finish(self, idx: int, success: bool):
+        """Mark an upload as finished"""
+        with self._lock:
+            self._finished[idx] = success
+
+    def refresh(self):
+        """Push the latest progress of every device to the UI"""
+        now = time.monotonic()
+        with self._lock:
+            latest = dict(self._latest)
+            started_at = dict(self._started_at)
+            updated_at = dict(self._updated_at)
+            finished = dict(self._finished)
+
+        for idx in self.bars:
+            if idx in finished:
+                success = finished[idx]
+                if success:
+                    self.bars[idx].set_value(1.0)
+                self.bars[idx].props(f"color={'positive' if success else 'negative'}")
+                self.status_labels[idx].set_text("Done" if success else "Failed")
+                continue
+
+            if idx not in started_at:
+                continue
+
+            update = latest.get(idx)
+            parts = []
+            if update and update.percent is not None:
+                self.bars[idx].set_value(update.percent / 100.0)
+                parts.append(f"{update.percent:.0f}%")
+                elapsed = now - started_at[idx]
+                if elapsed > 0:
+                    parts.append(f"{update.percent / elapsed:.1f}%/s")
+            if update and update.phase:
+                parts.append(update.phase)
+
+            if now - updated_at[idx] > self.STALL_SECONDS:
+                parts.append(f"stalled {now - updated_at[idx]:.0f}s")
+                self.bars[idx].props("color=warning")
+            else:
+                self.bars[idx].props("color=primary")
+
+            self.status_labels[idx].set_text(" · ".join(parts) or "Starting...")
+
+    def stop(self):
+        """Stop refreshing the progress bars"""
+        if self.timer:
+            self.timer.deactivate()
+        self.refresh()
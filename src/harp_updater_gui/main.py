@@ -7,17 +7,29 @@ Built with NiceGUI and integrating with the HarpRegulator CLI tool.
 """
 
 from multiprocessing import freeze_support
+import asyncio
 import sys
 import logging
-import shutil
 from pathlib import Path
-from nicegui import ui, app, run
+from fastapi.responses import Response
+from nicegui import ui, app
 from nicegui import core as nicegui_core
 from harp_updater_gui.components.header import Header
 from harp_updater_gui.components.device_table import DeviceTable
 from harp_updater_gui.components.update_workflow import UpdateWorkflow, LogLevel
-from harp_updater_gui.services.device_manager import DeviceManager
-from harp_updater_gui.services.firmware_service import FirmwareService
+from harp_updater_gui.components.upload_progress import UploadProgressPanel
+from harp_updater_gui.services.activity_journal import get_activity_journal
+from harp_updater_gui.services.inventory_service import get_inventory_service
+from harp_updater_gui.services.deploy_scheduler import (
+    DeployScheduler,
+    DeviceDeployResult,
+    device_tag,
+)
+from harp_updater_gui.services.readiness import DeviceReadiness
+from harp_updater_gui.services.cli_executor import get_cli_executor
+from harp_updater_gui.utils.constants import DEFAULT_DEPLOY_CONCURRENCY
+from harp_updater_gui.utils.paths import get_harp_regulator_path
+from harp_updater_gui.utils import metrics
 from harp_updater_gui.models.device import Device
 from typing import List, Optional
 
@@ -60,24 +72,26 @@ _SHARED_CSS_INJECTED = False
 class HarpFirmwareUpdaterApp:
     """Main application class"""
 
-    def __init__(self):
-        """Initialize the application"""
+    def __init__(self, deploy_concurrency: int = DEFAULT_DEPLOY_CONCURRENCY):
+        """
+        Initialize the application
 
-        # Resolve paths to external tools per os depending on source vs frozen execution
-        self.regulator_path = shutil.which("HarpRegulator.exe")
-        if self.regulator_path is None:
-            if getattr(sys, "frozen", False):
-                exe_dir = Path(sys.executable).resolve().parent
-                self.regulator_path = str(exe_dir / "_internal" / "harp_regulator" / "win-x64" /"HarpRegulator.exe")
-            else:
-                self.regulator_path = str(Path(__file__).resolve().parent.parent.parent / "deps" / "harp_regulator" / "win-x64" / "HarpRegulator.exe")
-        
+        Args:
+            deploy_concurrency: Maximum number of devices flashed in parallel
+        """
+
+        # Resolve paths to external tools depending on source vs frozen execution
+        self.regulator_path = get_harp_regulator_path()
         print(f"Resolved HarpRegulator path: {self.regulator_path}")
 
 
-        # Initialize services
-        self.device_manager = DeviceManager(self.regulator_path)
-        self.firmware_service = FirmwareService(self.regulator_path)
+        # Initialize services; the device inventory is shared by every client
+        self.inventory = get_inventory_service(self.regulator_path)
+        self.device_manager = self.inventory.device_manager
+        self.firmware_service = self.inventory.firmware_service
+        self.readiness = DeviceReadiness(self.device_manager.cli)
+        self.cli_executor = get_cli_executor()
+        self.deploy_concurrency = deploy_concurrency
 
         # Initialize components (will be set in render)
         self.header = None
@@ -95,6 +109,9 @@ class HarpFirmwareUpdaterApp:
             devices: List of target devices (supports batch updates for devices with same name)
             firmware_path: Path to firmware file or version string
             force: Force upload even if checks fail
+
+        Returns:
+            True if the upload ran, so the caller should refresh the device list
         """
         # Handle single device passed as non-list for backwards compatibility
         if isinstance(devices, Device):
@@ -115,6 +132,8 @@ class HarpFirmwareUpdaterApp:
             ui.label("Please wait, do not disconnect the device(s)").classes(
                 "text-sm text-secondary mt-2"
             )
+            progress_panel = UploadProgressPanel(devices)
+            progress_panel.render()
 
         loading_dialog.open()
 
@@ -154,97 +173,217 @@ class HarpFirmwareUpdaterApp:
                 )
                 self.update_workflow.show_error(f"Invalid firmware file: {error_msg}")
                 ui.notify("Invalid firmware file", type="negative")
-                return
-
+                return False
+
+            # Identify the firmware by content in every journal entry of this deploy
+            self.update_workflow.journal_context = {
+                "firmware_path": firmware_path,
+                "firmware_sha256": await self.cli_executor.run(
+                    self.firmware_service.inspection_cache.digest, firmware_path
+                ),
+            }
             self.update_workflow.push_log("Firmware file validated", LogLevel.SUCCESS)
 
+            # Step 1.25: Reject boards the firmware was not built for, up front
+            positions = {id(device): idx for idx, device in enumerate(devices)}
+            compatibility = await self.cli_executor.run(
+                self.firmware_service.check_devices_compatibility,
+                devices,
+                firmware_path,
+            )
+            rejected = [r for r in compatibility if not r.compatible]
+            for result in rejected:
+                self.update_workflow.push_log(
+                    f"{device_tag(result.device)} Incompatible firmware: {result.reason}",
+                    LogLevel.WARNING if force else LogLevel.ERROR,
+                    device=result.device,
+                )
+
+            if rejected and not force:
+                if not is_batch:
+                    self.update_workflow.show_error_with_force(
+                        f"Incompatible firmware: {rejected[0].reason}"
+                    )
+                    ui.notify("Incompatible firmware", type="negative")
+                    return False
+
+                for result in rejected:
+                    progress_panel.finish(positions[id(result.device)], False)
+                devices = [r.device for r in compatibility if r.compatible]
+                if not devices:
+                    self.update_workflow.show_error(
+                        "Firmware is not compatible with any selected device"
+                    )
+                    ui.notify("Incompatible firmware", type="negative")
+                    return False
+            else:
+                rejected = []
+
             # Step 1.5: Close any device connections by refreshing without connecting
             self.update_workflow.push_log(
                 "Closing device connections...", LogLevel.INFO
             )
-            await run.cpu_bound(
-                self.device_manager.refresh_devices, allow_connect=False
+            await self.inventory.refresh(allow_connect=False)
+
+            # Wait until the OS has released the port handles
+            port_devices = [d for d in devices if d.port_name]
+            release_results = await asyncio.gather(
+                *(
+                    self.cli_executor.run(
+                        self.readiness.wait_for_port_release, d.port_name, d.kind
+                    )
+                    for d in port_devices
+                )
             )
+            for device, (released, elapsed) in zip(port_devices, release_results):
+                if released:
+                    self.update_workflow.push_log(
+                        lambda device=device, elapsed=elapsed: (
+                            f"{device_tag(device)} Port released after {elapsed:.1f}s"
+                        ),
+                        LogLevel.DEBUG,
+                        device=device,
+                        duration=elapsed,
+                    )
+                else:
+                    self.update_workflow.push_log(
+                        f"{device_tag(device)} Port still busy after {elapsed:.1f}s, "
+                        "attempting upload anyway",
+                        LogLevel.WARNING,
+                        device=device,
+                        duration=elapsed,
+                    )
 
-            # Wait for OS to release port handles
-            await run.io_bound(lambda: __import__("time").sleep(3))
-
-            # Track results for batch updates
-            success_count = 0
-            fail_count = 0
+            # Step 2: Flash firmware to the devices, several at a time
+            scheduler = DeployScheduler(
+                max_concurrency=self.deploy_concurrency,
+                target_key=self.device_manager.get_upload_target,
+                target_locks=self.inventory.target_locks,
+            )
 
-            # Step 2: Flash firmware to each device
-            for idx, device in enumerate(devices, 1):
+            def on_upload_start(device: Device, position: int):
+                progress_panel.start(positions[id(device)])
+                tag = device_tag(device)
                 if is_batch:
-                    upload_label.set_text(
-                        f"Uploading firmware ({idx}/{total_devices})..."
-                    )
                     self.update_workflow.push_log(
-                        f"--- Device {idx}/{total_devices}: {device.display_name} ({device.port_name}) ---",
+                        f"{tag} Device {position}/{len(devices)}",
                         LogLevel.INFO,
+                        device=device,
                     )
 
                 if force:
                     self.update_workflow.push_log(
-                        f"Starting FORCED firmware upload to {device.display_name}...",
+                        f"{tag} Starting FORCED firmware upload...",
                         LogLevel.WARNING,
+                        device=device,
                     )
                 else:
                     self.update_workflow.push_log(
-                        f"Starting firmware upload to {device.display_name} ({device.port_name})...",
-                        LogLevel.INFO,
+                        f"{tag} Starting firmware upload...", LogLevel.INFO, device=device
+                    )
+
+            def on_upload_finish(result: DeviceDeployResult, completed: int):
+                progress_panel.finish(positions[id(result.device)], result.success)
+                tag = device_tag(result.device)
+                if is_batch:
+                    upload_label.set_text(
+                        f"Uploading firmware ({completed}/{len(devices)} done)..."
+                    )
+
+                if result.success:
+                    self.update_workflow.push_log(
+                        f"{tag} Firmware uploaded successfully "
+                        f"in {result.duration:.1f}s",
+                        LogLevel.SUCCESS,
+                        device=result.device,
+                        duration=result.duration,
+                    )
+                else:
+                    self.update_workflow.push_log(
+                        f"{tag} Upload failed: {result.output}",
+                        LogLevel.ERROR,
+                        device=result.device,
+                        duration=result.duration,
                     )
 
-                # Upload firmware using device manager (run in thread to avoid blocking UI)
-                success, output = await run.cpu_bound(
-                    self.device_manager.upload_firmware_to_device,
+            def upload(device: Device):
+                idx = positions[id(device)]
+                return self.device_manager.upload_firmware_to_device_async(
                     device,
                     firmware_path,
                     force,
+                    lambda update: progress_panel.report(idx, update),
                 )
 
-                if success:
-                    success_count += 1
-                    self.update_workflow.push_log(
-                        f"Firmware uploaded successfully to {device.display_name}",
-                        LogLevel.SUCCESS,
+            # Upload firmware as asyncio subprocesses (no worker thread per device)
+            report = await scheduler.run(
+                devices,
+                upload,
+                on_start=on_upload_start,
+                on_finish=on_upload_finish,
+            )
+            success_count = report.success_count
+            fail_count = report.fail_count + len(rejected)
+            failed_devices = [r.device for r in rejected] + [
+                r.device for r in report.failed
+            ]
+
+            # For single device, show error dialog
+            if not is_batch and fail_count > 0:
+                output = report.results[0].output
+                if not force:
+                    error_msg = f"Firmware upload failed: {output}"
+                    self.update_workflow.show_error_with_force(error_msg)
+                else:
+                    self.update_workflow.show_error(
+                        f"Forced firmware upload failed: {output}"
                     )
+                ui.notify("Firmware upload failed", type="negative")
+                return False
 
-                    # Wait between devices for batch updates
-                    if is_batch and idx < total_devices:
+            # Step 3: Wait for the flashed devices to reboot and re-enumerate
+            flashed = [r.device for r in report.results if r.success]
+            if flashed:
+                upload_label.set_text("Waiting for device(s) to reboot...")
+                self.update_workflow.push_log(
+                    f"Waiting for {len(flashed)} device(s) to reboot...", LogLevel.INFO
+                )
+                known_ports = self.device_manager.get_ports()
+                readiness_results = await self.cli_executor.run(
+                    self.readiness.wait_for_devices, flashed, known_ports
+                )
+                for result in readiness_results:
+                    if result.ready:
                         self.update_workflow.push_log(
-                            "Waiting before next device...", LogLevel.INFO
+                            f"{device_tag(result.device)} Device ready after "
+                            f"{result.elapsed:.1f}s",
+                            LogLevel.INFO,
+                            device=result.device,
+                            duration=result.elapsed,
+                        )
+                    else:
+                        self.update_workflow.push_log(
+                            f"{device_tag(result.device)} Device did not re-appear "
+                            f"within {result.elapsed:.1f}s",
+                            LogLevel.WARNING,
+                            device=result.device,
+                            duration=result.elapsed,
                         )
-                        await run.io_bound(lambda: __import__("time").sleep(2))
-                else:
-                    fail_count += 1
-                    self.update_workflow.push_log(
-                        f"Upload failed for {device.display_name}: {output}",
-                        LogLevel.ERROR,
-                    )
 
-                    # For single device, show error dialog
-                    if not is_batch:
-                        if not force:
-                            error_msg = f"Firmware upload failed: {output}"
-                            self.update_workflow.show_error_with_force(error_msg)
-                        else:
-                            self.update_workflow.show_error(
-                                f"Forced firmware upload failed: {output}"
-                            )
-                        ui.notify("Firmware upload failed", type="negative")
-                        return
-
-            # Step 3: Verify and complete
+            # Step 4: Verify and complete
             if is_batch:
                 self.update_workflow.push_log(
-                    f"Batch update complete: {success_count}/{total_devices} successful",
+                    f"Batch update complete: {success_count}/{total_devices} successful "
+                    f"in {report.elapsed:.1f}s "
+                    f"(up to {scheduler.max_concurrency} devices in parallel)",
                     LogLevel.SUCCESS if fail_count == 0 else LogLevel.WARNING,
                 )
 
                 if fail_count > 0:
                     self.update_workflow.push_log(
-                        f"{fail_count} device(s) failed to update", LogLevel.ERROR
+                        f"{fail_count} device(s) failed to update: "
+                        + ", ".join(device_tag(d) for d in failed_devices),
+                        LogLevel.ERROR,
                     )
                     ui.notify(
                         f"Batch update: {success_count} succeeded, {fail_count} failed",
@@ -262,18 +401,25 @@ class HarpFirmwareUpdaterApp:
                 self.update_workflow.push_log(
                     "Verifying firmware installation...", LogLevel.INFO
                 )
+                if readiness_results[0].ready:
+                    self.update_workflow.push_log("Firmware verified", LogLevel.SUCCESS)
+                else:
+                    self.update_workflow.push_log(
+                        "Could not verify firmware: device has not re-appeared yet",
+                        LogLevel.WARNING,
+                    )
+                self.update_workflow.complete_update(True)
 
-                # Give device time to reboot and reconnect (3 seconds)
+            if self.update_workflow.is_enabled(LogLevel.DEBUG):
+                executor_stats = self.cli_executor.stats()
                 self.update_workflow.push_log(
-                    "Waiting for device to reboot...", LogLevel.INFO
+                    "CLI executor dispatch overhead: "
+                    f"{executor_stats['mean_ms']:.2f} ms mean, "
+                    f"{executor_stats['max_ms']:.2f} ms max",
+                    LogLevel.DEBUG,
                 )
-                await run.io_bound(lambda: __import__("time").sleep(3))
-
-                self.update_workflow.push_log("Firmware verified", LogLevel.SUCCESS)
-                self.update_workflow.complete_update(True)
 
-            # Refresh device table to get updated info
-            await self.device_table.refresh_devices()
+            return True
 
         except Exception as e:
             self.update_workflow.push_log(
@@ -282,7 +428,9 @@ class HarpFirmwareUpdaterApp:
             self.update_workflow.show_error(f"Error during firmware upload: {str(e)}")
             ui.notify(f"Upload error: {str(e)}", type="negative")
         finally:
+            self.update_workflow.journal_context = {}
             # Close loading dialog
+            progress_panel.stop()
             loading_dialog.close()
 
     def render(self):
@@ -311,15 +459,15 @@ class HarpFirmwareUpdaterApp:
                 with splitter.before:
                     # Device table with integrated firmware upload
                     self.device_table = DeviceTable(
-                        device_manager=self.device_manager,
-                        firmware_service=self.firmware_service,
+                        inventory=self.inventory,
                         on_deploy=self.on_firmware_deploy,
+                        server_side=True,
                     )
                     self.device_table.render()
 
                 with splitter.after:
                     # Activity log
-                    self.update_workflow = UpdateWorkflow()
+                    self.update_workflow = UpdateWorkflow(journal=get_activity_journal())
                     self.update_workflow.render()
 
                 with splitter.separator:
@@ -384,9 +532,16 @@ if STATIC_DIR:
 else:
     logging.warning("Static assets directory not found; continuing without /static.")
 
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint() -> Response:
+    """Serve CLI, refresh, table and upload metrics in the Prometheus text format"""
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # Start the app when executed directly.
 # Do not start on "__mp_main__" because Windows multiprocessing workers
-# (used by run.cpu_bound) import this module under that name.
+# (NiceGUI's process pool) import this module under that name.
 if __name__ == "__main__":
     freeze_support()  # For PyInstaller compatibility
     start_app()
@@ -1,5 +1,19 @@
-from typing import Optional
-from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    TypeAdapter,
+    ValidationError,
+    field_validator,
+    model_validator,
+)
+from harp_updater_gui.utils.search_index import FIELD_SEPARATOR
+from harp_updater_gui.utils.versions import VersionKey, parse_version
 
 
 class Device(BaseModel):
@@ -50,9 +64,19 @@ class Device(BaseModel):
     source: Optional[str] = Field(
         None, alias="Source", description="Device source identifier"
     )
+    cached_fields: Dict[str, float] = Field(
+        default_factory=dict,
+        exclude=True,
+        description="Fields restored from the metadata cache, with the time "
+        "(seconds since the epoch) they were last observed",
+    )
 
     model_config = ConfigDict(populate_by_name=True)
 
+    # Distinguishes devices with the same base identity, e.g. several
+    # bootloader devices without port or serial number
+    _key_ordinal: int = PrivateAttr(default=0)
+
     @field_validator("serial_number", mode="before")
     def serialize_serial_number(cls, value):
         """Convert serial numbers coming in as ints to strings."""
@@ -80,6 +104,59 @@ class Device(BaseModel):
             return f"Device on {self.port_name}"
         return "Unknown Device"
 
+    @cached_property
+    def firmware_version_key(self) -> Optional[VersionKey]:
+        """Parsed firmware version, computed once per device object"""
+        return parse_version(self.firmware_version)
+
+    def cached_age(self, field_alias: str) -> Optional[float]:
+        """
+        Get the age of a field restored from the metadata cache
+
+        Args:
+            field_alias: HarpRegulator field name (e.g. "FirmwareVersion")
+
+        Returns:
+            Age in seconds, or None if the value is live
+        """
+        updated = self.cached_fields.get(field_alias)
+        if updated is None:
+            return None
+        return max(0.0, time.time() - updated)
+
+    @property
+    def identity_key(self) -> str:
+        """Get a key identifying the physical device across refreshes"""
+        key = self.base_identity_key
+        return f"{key}#{self._key_ordinal}" if self._key_ordinal else key
+
+    def with_key_ordinal(self, ordinal: int) -> "Device":
+        """
+        Disambiguate identity_key from other devices with the same base identity
+
+        Args:
+            ordinal: Position among devices sharing base_identity_key (0 for the first)
+
+        Returns:
+            This device if its ordinal already matches, otherwise a copy
+        """
+        if self._key_ordinal == ordinal:
+            return self
+        device = self.model_copy()
+        device._key_ordinal = ordinal
+        return device
+
+    @property
+    def base_identity_key(self) -> str:
+        """Get the identity key derived from the device's own fields"""
+        if self.serial_number:
+            return f"sn:{self.serial_number}"
+        if self.port_name:
+            return f"port:{self.port_name}"
+        if self.source:
+            return f"src:{self.source}"
+        return f"{self.kind}:{self.state}"
+
     @property
     def health_status(self) -> str:
         """Get health status based on device state and confidence"""
@@ -122,3 +199,85 @@ class Device(BaseModel):
 
     def __repr__(self):
         return f"<Device(name={self.display_name}, port={self.port_name}, kind={self.kind}, state={self.state})>"
+
+
+class DeviceSnapshot(NamedTuple):
+    """Immutable view of a device with its derived fields computed once"""
+
+    device: Device
+    identity_key: str
+    display_name: str
+    health_status: str
+    health_color: str
+    metadata_line: str
+    search_text: str
+
+    @classmethod
+    def from_device(cls, device: Device) -> "DeviceSnapshot":
+        """Compute the derived fields of a device"""
+        display_name = device.display_name
+        parts = (
+            display_name,
+            device.port_name,
+            device.serial_number,
+            device.device_description,
+            device.firmware_version,
+        )
+        search_text = FIELD_SEPARATOR.join(
+            dict.fromkeys(part.lower() for part in parts if part)
+        )
+        return cls(
+            device=device,
+            identity_key=device.identity_key,
+            display_name=display_name,
+            health_status=device.health_status,
+            health_color=device.health_color,
+            metadata_line=device.metadata_line,
+            search_text=search_text,
+        )
+
+
+@dataclass
+class DeviceParseError:
+    """A row of HarpRegulator list output that failed validation"""
+
+    index: int
+    data: Any
+    errors: List[str] = field(default_factory=list)
+
+    def __str__(self):
+        return f"Device #{self.index}: " + "; ".join(self.errors)
+
+
+_DEVICE_LIST_ADAPTER = TypeAdapter(List[Device])
+
+
+def parse_device_list(
+    device_data: List[dict],
+) -> Tuple[List[Device], List[DeviceParseError]]:
+    """
+    Validate a whole HarpRegulator list payload in one pass
+
+    Malformed rows are reported and skipped; the rest are still returned.
+
+    Args:
+        device_data: Device dictionaries from HarpRegulator list --json
+
+    Returns:
+        Tuple of (devices, errors), devices in payload order
+    """
+    try:
+        return _DEVICE_LIST_ADAPTER.validate_python(device_data), []
+    except ValidationError as e:
+        failures: Dict[int, List[str]] = {}
+        for error in e.errors(include_url=False):
+            index, *loc = error["loc"]
+            location = ".".join(str(part) for part in loc) or "device"
+            failures.setdefault(index, []).append(f"{location}: {error['msg']}")
+
+    valid_rows = [row for i, row in enumerate(device_data) if i not in failures]
+    errors = [
+        DeviceParseError(index, device_data[index], messages)
+        for index, messages in sorted(failures.items())
+    ]
+    return _DEVICE_LIST_ADAPTER.validate_python(valid_rows), errors
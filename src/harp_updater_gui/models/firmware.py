@@ -1,5 +1,6 @@
+from functools import cached_property
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import FrozenSet, List, Optional
 
 
 class Firmware(BaseModel):
@@ -7,5 +8,9 @@ class Firmware(BaseModel):
     compatible_hardware: List[str]
     release_notes: Optional[str] = None
 
+    @cached_property
+    def compatible_hardware_set(self) -> FrozenSet[str]:
+        return frozenset(self.compatible_hardware)
+
     def is_compatible(self, hardware_version: str) -> bool:
-        return hardware_version in self.compatible_hardware
+        return hardware_version in self.compatible_hardware_set
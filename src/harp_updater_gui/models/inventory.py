@@ -0,0 +1,167 @@
+import re
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from harp_updater_gui.models.device import Device, DeviceSnapshot
+from harp_updater_gui.utils.search_index import SubstringIndex
+
+
+_EMPTY: Mapping = MappingProxyType({})
+
+_DIGITS = re.compile(r"(\d+)")
+
+
+def natural_key(text: Optional[str]) -> Tuple:
+    """Sort key ordering embedded numbers numerically ("COM5" before "COM10"); None last"""
+    if not text:
+        return (1,)
+    parts = _DIGITS.split(text.lower())
+    return (0,) + tuple((0, int(part)) if part.isdigit() else (1, part) for part in parts)
+
+
+def _firmware_key(snapshot: DeviceSnapshot) -> Tuple:
+    version = snapshot.device.firmware_version_key
+    if version is None:
+        return (1, natural_key(snapshot.device.firmware_version))
+    return (0, version)
+
+
+# Sort key per device table column
+SORT_KEYS: Dict[str, Callable[[DeviceSnapshot], Any]] = {
+    "name": lambda s: s.display_name.lower(),
+    "port": lambda s: natural_key(s.device.port_name),
+    "kind": lambda s: s.device.kind or "",
+    "hardware": lambda s: natural_key(s.device.hardware_version),
+    "firmware": _firmware_key,
+    "status": lambda s: s.health_status,
+}
+
+
+@dataclass(frozen=True)
+class DeviceInventory:
+    """Immutable, versioned view of the connected devices and their indexes
+
+    A new inventory is built and swapped in as a whole whenever the device
+    list changes, so a reader holding one always sees a consistent list and
+    matching indexes without locking. Readers can skip work when the
+    version has not changed since they last looked.
+    """
+
+    version: int = 0
+    devices: Tuple[Device, ...] = ()
+    snapshots: Tuple[DeviceSnapshot, ...] = ()
+    # Newest available firmware version per device identity key
+    available_updates: Mapping[str, str] = _EMPTY
+    by_key: Mapping[str, Device] = _EMPTY
+    by_port: Mapping[str, Device] = _EMPTY
+    by_serial: Mapping[str, Device] = _EMPTY
+    by_source: Mapping[str, Tuple[Device, ...]] = _EMPTY
+    by_name: Mapping[str, Tuple[Device, ...]] = _EMPTY
+    by_state: Mapping[str, Tuple[Device, ...]] = _EMPTY
+    snapshot_by_key: Mapping[str, DeviceSnapshot] = field(default=_EMPTY, repr=False)
+
+    @classmethod
+    def build(
+        cls,
+        version: int,
+        devices: Iterable[Device],
+        available_updates: Optional[Mapping[str, str]] = None,
+    ) -> "DeviceInventory":
+        """
+        Build an inventory, assigning unique identity keys and indexes
+
+        Devices sharing a base identity get an ordinal suffix. A device whose
+        ordinal changes is copied rather than modified, since older
+        inventories may still hold it.
+
+        Args:
+            version: Version number of the new inventory
+            devices: Devices in display order
+            available_updates: Newest firmware version per identity key
+
+        Returns:
+            DeviceInventory
+        """
+        ordinals: Dict[str, int] = {}
+        device_list: List[Device] = []
+        snapshots: List[DeviceSnapshot] = []
+        by_key: Dict[str, Device] = {}
+        by_port: Dict[str, Device] = {}
+        by_serial: Dict[str, Device] = {}
+        by_source: Dict[str, List[Device]] = {}
+        by_name: Dict[str, List[Device]] = {}
+        by_state: Dict[str, List[Device]] = {}
+
+        for device in devices:
+            base_key = device.base_identity_key
+            ordinal = ordinals.get(base_key, 0)
+            ordinals[base_key] = ordinal + 1
+            device = device.with_key_ordinal(ordinal)
+            snapshot = DeviceSnapshot.from_device(device)
+            device_list.append(device)
+            snapshots.append(snapshot)
+
+            by_key[snapshot.identity_key] = device
+            if device.port_name:
+                by_port.setdefault(device.port_name, device)
+            if device.serial_number:
+                by_serial.setdefault(device.serial_number, device)
+            if device.source:
+                by_source.setdefault(device.source, []).append(device)
+            by_name.setdefault(snapshot.display_name, []).append(device)
+            by_state.setdefault(device.state, []).append(device)
+
+        return cls(
+            version=version,
+            devices=tuple(device_list),
+            snapshots=tuple(snapshots),
+            available_updates=MappingProxyType(dict(available_updates or {})),
+            by_key=MappingProxyType(by_key),
+            by_port=MappingProxyType(by_port),
+            by_serial=MappingProxyType(by_serial),
+            by_source=_freeze_groups(by_source),
+            by_name=_freeze_groups(by_name),
+            by_state=_freeze_groups(by_state),
+            snapshot_by_key=MappingProxyType({s.identity_key: s for s in snapshots}),
+        )
+
+    @cached_property
+    def search_index(self) -> SubstringIndex:
+        """Substring index over name, port, serial number, description and firmware version"""
+        return SubstringIndex([snapshot.search_text for snapshot in self.snapshots])
+
+    @cached_property
+    def _sort_orders(self) -> Dict[str, Tuple[DeviceSnapshot, ...]]:
+        return {}
+
+    def sorted_snapshots(self, column: str) -> Tuple[DeviceSnapshot, ...]:
+        """
+        Get the snapshots sorted by a table column, computed once per column
+
+        Args:
+            column: Key of SORT_KEYS; unknown columns keep inventory order
+
+        Returns:
+            Snapshots in ascending order; ties keep inventory order
+        """
+        order = self._sort_orders.get(column)
+        if order is None:
+            key = SORT_KEYS.get(column)
+            order = tuple(sorted(self.snapshots, key=key)) if key else self.snapshots
+            self._sort_orders[column] = order
+        return order
+
+    def with_available_updates(
+        self, version: int, available_updates: Mapping[str, str]
+    ) -> "DeviceInventory":
+        """Get a new version with different available updates and the same devices"""
+        return replace(
+            self,
+            version=version,
+            available_updates=MappingProxyType(dict(available_updates)),
+        )
+
+
+def _freeze_groups(groups: Dict[str, List[Device]]) -> Mapping[str, Tuple[Device, ...]]:
+    return MappingProxyType({key: tuple(value) for key, value in groups.items()})
@@ -0,0 +1,330 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.utils.log_buffer import LazyMessage
+from harp_updater_gui.utils.paths import get_data_dir
+
+
+_STOP = object()
+
+
+def device_info(device: Device) -> Dict[str, Any]:
+    """Identify a device in a journal entry"""
+    info = {
+        "key": device.identity_key,
+        "name": device.display_name,
+        "kind": device.kind,
+        "port": device.port_name,
+        "serial": device.serial_number,
+        "who_am_i": device.who_am_i,
+        "firmware_version": device.firmware_version,
+        "hardware_version": device.hardware_version,
+    }
+    return {key: value for key, value in info.items() if value is not None}
+
+
+class JournalCursor(NamedTuple):
+    """Position of the oldest entry returned by ActivityJournal.page()"""
+
+    # Name of the journal file the entry was read from
+    file_name: str
+    # Byte offset of the entry's line in that file
+    offset: int
+    seq: int
+
+
+class ActivityJournal:
+    """Persistent, rotating JSON Lines record of activity log events
+
+    Events are queued by record() and written by a background thread, so
+    logging never waits for the disk. Each line holds a sequence number,
+    timestamp, level, message and optional device identity and extra fields
+    (firmware hash, timings). The current file is rotated once it exceeds
+    max_bytes, keeping backup_count older files (activity.1.jsonl is the
+    most recent of them).
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        max_bytes: int = 1 << 20,
+        backup_count: int = 9,
+        file_name: str = "activity.jsonl",
+    ):
+        """
+        Initialize activity journal
+
+        Args:
+            directory: Journal directory (default: "journal" in the app data directory)
+            max_bytes: Size at which the current file is rotated
+            backup_count: Number of rotated files kept
+            file_name: Name of the current journal file
+        """
+        self.directory = Path(directory) if directory else get_data_dir() / "journal"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / file_name
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._file_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._seq = self._last_seq()
+
+    def files(self) -> List[Path]:
+        """Journal files from newest to oldest"""
+        stem, suffix = self.path.stem, self.path.suffix
+        backups = [
+            self.directory / f"{stem}.{i}{suffix}" for i in range(1, self.backup_count + 1)
+        ]
+        return [path for path in [self.path] + backups if path.exists()]
+
+    def _last_seq(self) -> int:
+        """Find the sequence number of the newest entry on disk"""
+        for path in self.files():
+            try:
+                f = open(path, "rb")
+            except OSError:
+                continue
+            with f:
+                for _, line in self._reverse_lines(f):
+                    try:
+                        return int(json.loads(line)["seq"])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        return 0
+
+    def record(
+        self,
+        level: str,
+        message: LazyMessage,
+        device: Optional[Device] = None,
+        timestamp: Optional[float] = None,
+        **fields,
+    ):
+        """
+        Queue an event for writing
+
+        Args:
+            level: Log level name (e.g. "info")
+            message: Message text, or a callable returning it; callables are
+                evaluated on the writer thread
+            device: Device the event is about
+            timestamp: Time of the event (default: now)
+            **fields: Extra JSON-serializable fields (e.g. firmware_sha256, duration)
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        self._queue.put((timestamp, level, message, device, fields))
+        self._ensure_writer()
+
+    def _ensure_writer(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="activity-journal", daemon=True
+                )
+                self._thread.start()
+
+    def flush(self):
+        """Wait until every queued event is on disk"""
+        self._queue.join()
+
+    def close(self):
+        """Write the queued events and stop the writer thread"""
+        with self._thread_lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _run(self):
+        """Writer loop: write whatever is queued in one append per batch"""
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            events = [item for item in batch if item is not _STOP]
+            try:
+                if events:
+                    self._write(events)
+            except OSError as e:
+                print(f"Error writing activity journal: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if len(events) != len(batch):
+                return
+
+    def _write(self, events: List[tuple]):
+        lines = []
+        for timestamp, level, message, device, fields in events:
+            self._seq += 1
+            entry = {"seq": self._seq, "ts": timestamp, "level": level}
+            entry["message"] = self._message_text(message)
+            if device is not None:
+                entry["device"] = device_info(device)
+            entry.update(fields)
+            lines.append(json.dumps(entry, default=str, ensure_ascii=False) + "\n")
+
+        with self._file_lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+                size = f.tell()
+            if size >= self.max_bytes:
+                self._rotate()
+
+    @staticmethod
+    def _message_text(message: LazyMessage) -> str:
+        if not callable(message):
+            return str(message)
+        try:
+            return message()
+        except Exception as e:
+            return f"<message could not be built: {e}>"
+
+    def _rotate(self):
+        """Shift the backups by one and start a new current file"""
+        stem, suffix = self.path.stem, self.path.suffix
+        for i in range(self.backup_count, 0, -1):
+            source = self.directory / f"{stem}.{i - 1}{suffix}" if i > 1 else self.path
+            if source.exists():
+                os.replace(source, self.directory / f"{stem}.{i}{suffix}")
+        if self.path.exists():
+            # backup_count == 0: nothing is kept
+            self.path.unlink()
+
+    def page(
+        self, cursor: Optional[JournalCursor] = None, limit: int = 100, query: str = ""
+    ) -> Tuple[List[Dict[str, Any]], Optional[JournalCursor]]:
+        """
+        Read entries from newest to oldest, for lazy loading
+
+        Files are read backwards from the cursor, so a page only parses the
+        lines it skips or returns, however deep in the history it starts.
+        The writer is blocked only while the files are opened.
+
+        Args:
+            cursor: Cursor returned with the previous page; None starts at
+                the newest entry
+            limit: Maximum number of entries
+            query: Case-insensitive text to find in the message or device fields
+
+        Returns:
+            Tuple of (entries newest first, cursor for the next page)
+        """
+        query = query.strip().lower()
+        # Cheap pre-check on the raw line, unless JSON escaping could hide a match
+        raw_query = query if '"' not in query and "\\" not in query else ""
+        entries: List[Dict[str, Any]] = []
+        next_cursor = cursor
+
+        files = self._open_files()
+        try:
+            start = self._locate(cursor, files) if cursor is not None else 0
+            if start is None:
+                # The entry was rotated out of the kept files
+                return entries, cursor
+
+            for index in range(start, len(files)):
+                name, f = files[index]
+                end = cursor.offset if cursor is not None and index == start else None
+                for offset, line in self._reverse_lines(f, end):
+                    if raw_query and raw_query not in line.lower():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if query and not self._matches(entry, query):
+                        continue
+                    entries.append(entry)
+                    next_cursor = JournalCursor(name, offset, entry.get("seq", 0))
+                    if len(entries) >= limit:
+                        return entries, next_cursor
+        finally:
+            for _, f in files:
+                f.close()
+        return entries, next_cursor
+
+    def _open_files(self) -> List[Tuple[str, BinaryIO]]:
+        """Open every journal file, newest first, as one consistent set"""
+        # Open files keep their contents if a rotation renames them later
+        files = []
+        with self._file_lock:
+            for path in self.files():
+                try:
+                    files.append((path.name, open(path, "rb")))
+                except OSError:
+                    continue
+        return files
+
+    @staticmethod
+    def _locate(cursor: JournalCursor, files: List[Tuple[str, BinaryIO]]) -> Optional[int]:
+        """Find the file holding the cursor's entry; rotations rename files"""
+        order = sorted(range(len(files)), key=lambda i: files[i][0] != cursor.file_name)
+        for index in order:
+            f = files[index][1]
+            f.seek(cursor.offset)
+            try:
+                if json.loads(f.readline())["seq"] == cursor.seq:
+                    return index
+            except (ValueError, KeyError, TypeError):
+                continue
+        return None
+
+    @staticmethod
+    def _matches(entry: Dict[str, Any], query: str) -> bool:
+        """Match the message and device fields, not keys or numbers"""
+        texts = [entry.get("message", "")] + [
+            str(value) for value in entry.get("device", {}).values()
+        ]
+        return any(query in text.lower() for text in texts)
+
+    @staticmethod
+    def _reverse_lines(
+        f: BinaryIO, end: Optional[int] = None, block_size: int = 1 << 16
+    ) -> Iterator[Tuple[int, str]]:
+        """Yield (byte offset, line) for the lines of a file before end, last first"""
+        position = f.seek(0, os.SEEK_END) if end is None else end
+        remainder = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + remainder
+            lines = data.split(b"\n")
+            remainder = lines.pop(0)
+            line_end = position + len(data)
+            for line in reversed(lines):
+                line_end -= len(line) + 1
+                if line.strip():
+                    yield line_end + 1, line.decode("utf-8", errors="replace")
+        if remainder.strip():
+            yield 0, remainder.decode("utf-8", errors="replace")
+
+_shared_journals: Dict[Path, ActivityJournal] = {}
+_shared_journals_lock = threading.Lock()
+
+
+def get_activity_journal() -> ActivityJournal:
+    """Get the process-wide activity journal, written out at interpreter exit"""
+    directory = get_data_dir() / "journal"
+    with _shared_journals_lock:
+        if directory not in _shared_journals:
+            journal = ActivityJournal(directory)
+            atexit.register(journal.close)
+            _shared_journals[directory] = journal
+        return _shared_journals[directory]
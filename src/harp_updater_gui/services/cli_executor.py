@@ -0,0 +1,126 @@
+import asyncio
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+from harp_updater_gui.utils.constants import DEFAULT_CLI_WORKERS
+
+
+class CLIExecutor:
+    """Dedicated, pre-warmed thread pool for blocking HarpRegulator calls
+
+    Blocking CLI work (readiness polling, synchronous CLIWrapper calls) runs on
+    these threads instead of NiceGUI's shared run.io_bound/run.cpu_bound pools.
+    Nothing is pickled: callables run in this process, so services can be used
+    directly and their results applied back on the event loop.
+    """
+
+    # Number of recent dispatches kept for overhead statistics
+    STATS_WINDOW = 200
+
+    def __init__(self, max_workers: int = DEFAULT_CLI_WORKERS, warm: bool = True):
+        """
+        Initialize CLI executor
+
+        Args:
+            max_workers: Number of worker threads
+            warm: Start all worker threads immediately instead of on first use
+        """
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="harp-cli"
+        )
+        self._lock = threading.Lock()
+        self._dispatch_overheads: Deque[float] = deque(maxlen=self.STATS_WINDOW)
+        self._dispatch_count = 0
+
+        if warm:
+            self.warm_up()
+
+    def warm_up(self):
+        """Start every worker thread now so the first real call pays no spawn cost"""
+        barrier = threading.Barrier(self.max_workers)
+        futures = [self._pool.submit(barrier.wait) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Submit a blocking call to the pool
+
+        Args:
+            fn: Callable to run on a worker thread
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            concurrent.futures.Future with the call's result
+        """
+        submitted_at = time.perf_counter()
+
+        def dispatch():
+            self._record_dispatch(time.perf_counter() - submitted_at)
+            return fn(*args, **kwargs)
+
+        return self._pool.submit(dispatch)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking call on the pool and await its result
+
+        Args:
+            fn: Callable to run on a worker thread
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Return value of fn
+        """
+        return await asyncio.wrap_future(
+            self.submit(functools.partial(fn, *args, **kwargs))
+        )
+
+    def _record_dispatch(self, overhead: float):
+        """Record the delay between submitting a call and a worker starting it"""
+        with self._lock:
+            self._dispatch_overheads.append(overhead)
+            self._dispatch_count += 1
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get dispatch overhead statistics over the recent window
+
+        Returns:
+            Dictionary with dispatch count and mean/max overhead in milliseconds
+        """
+        with self._lock:
+            overheads = list(self._dispatch_overheads)
+            count = self._dispatch_count
+
+        if not overheads:
+            return {"dispatches": count, "mean_ms": 0.0, "max_ms": 0.0}
+
+        return {
+            "dispatches": count,
+            "mean_ms": 1000.0 * sum(overheads) / len(overheads),
+            "max_ms": 1000.0 * max(overheads),
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the worker threads"""
+        self._pool.shutdown(wait=wait)
+
+
+_shared_executor: Optional[CLIExecutor] = None
+_shared_executor_lock = threading.Lock()
+
+
+def get_cli_executor() -> CLIExecutor:
+    """Get the process-wide CLI executor, creating (and warming) it on first use"""
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = CLIExecutor()
+        return _shared_executor
@@ -1,6 +1,67 @@
+import asyncio
 import json
+import re
 import subprocess
-from typing import List, Dict, Any, Optional
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Dict, Any, Optional
+from harp_updater_gui.services.cli_executor import get_cli_executor
+from harp_updater_gui.utils.metrics import CLI_OUTPUT_ERRORS, track_cli_command
+
+
+# Matches "<phase> ... 42%" / "<phase> [#####     ] 42.5 %"
+_PERCENT_PATTERN = re.compile(r"(?P<percent>\d{1,3}(?:\.\d+)?)\s*%")
+# Matches "<phase> ... 1024/4096" byte or block counters
+_COUNTER_PATTERN = re.compile(r"(?P<done>\d+)\s*/\s*(?P<total>\d+)")
+# Characters used to draw progress bars, stripped from phase names
+_BAR_CHARS = "[]#=>-|*.:━─█▏▎▍▌▋▊▉ \t"
+
+
+@dataclass
+class UploadProgress:
+    """A progress update parsed from HarpRegulator upload output"""
+
+    percent: Optional[float]
+    phase: Optional[str]
+    line: str
+
+
+def parse_progress_line(line: str) -> Optional[UploadProgress]:
+    """
+    Parse a line of HarpRegulator upload output into a progress update
+
+    Args:
+        line: Single line (or carriage-return separated segment) of output
+
+    Returns:
+        UploadProgress, or None for blank lines
+    """
+    text = line.strip()
+    if not text:
+        return None
+
+    percent = None
+    phase_end = len(text)
+
+    match = _PERCENT_PATTERN.search(text)
+    if match:
+        percent = float(match.group("percent"))
+        phase_end = match.start()
+    else:
+        match = _COUNTER_PATTERN.search(text)
+        if match and int(match.group("total")) > 0:
+            percent = 100.0 * int(match.group("done")) / int(match.group("total"))
+            phase_end = match.start()
+
+    phase = text[:phase_end]
+    if "[" in phase:
+        phase = phase[: phase.index("[")]
+    phase = phase.strip(_BAR_CHARS) or None
+
+    if percent is not None:
+        percent = min(100.0, max(0.0, percent))
+
+    return UploadProgress(percent=percent, phase=phase, line=text)
 
 
 class CLIWrapper:
@@ -28,34 +89,24 @@ class CLIWrapper:
         Returns:
             List of device dictionaries with device information
         """
-        cmd = [self.cli_path, "list", "--json"]
-
-        if all_devices:
-            cmd.append("--all")
+        cmd = self._list_command(all_devices, allow_connect)
 
-        if allow_connect:
-            cmd.append("--allow-connect")
-
-        try:
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=True,
-            )
+        with track_cli_command("list") as call:
+            try:
+                result = subprocess.run(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    check=True,
+                )
 
-            if result.stdout.strip():
-                devices = json.loads(result.stdout)
-                return devices if isinstance(devices, list) else []
-            return []
+                return self._parse_device_list(result.stdout)
 
-        except subprocess.CalledProcessError as e:
-            print(f"Error listing devices: {e.stderr}")
-            return []
-        except json.JSONDecodeError as e:
-            print(f"Error parsing device list: {e}")
-            return []
+            except subprocess.CalledProcessError as e:
+                call.outcome = "failure"
+                print(f"Error listing devices: {e.stderr}")
+                return []
 
     def inspect_firmware(self, firmware_path: str) -> Optional[Dict[str, Any]]:
         """
@@ -67,27 +118,24 @@ class CLIWrapper:
         Returns:
             Dictionary with firmware information or None on error
         """
-        cmd = [self.cli_path, "inspect", firmware_path, "--json"]
+        cmd = self._inspect_command(firmware_path)
 
-        try:
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=True,
-            )
+        with track_cli_command("inspect") as call:
+            try:
+                result = subprocess.run(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    check=True,
+                )
 
-            if result.stdout.strip():
-                return json.loads(result.stdout)
-            return None
+                return self._parse_firmware_info(result.stdout)
 
-        except subprocess.CalledProcessError as e:
-            print(f"Error inspecting firmware: {e.stderr}")
-            return None
-        except json.JSONDecodeError as e:
-            print(f"Error parsing firmware info: {e}")
-            return None
+            except subprocess.CalledProcessError as e:
+                call.outcome = "failure"
+                print(f"Error inspecting firmware: {e.stderr}")
+                return None
 
     def upload_firmware(
         self,
@@ -98,6 +146,7 @@ class CLIWrapper:
         progress: bool = True,
         no_reboot: bool = False,
         verbose: bool = False,
+        on_progress: Optional[Callable[[UploadProgress], None]] = None,
     ) -> tuple[bool, str]:
         """
         Upload firmware to a Harp device
@@ -110,9 +159,305 @@ class CLIWrapper:
             progress: Show progress bars
             no_reboot: Don't reboot after upload
             verbose: Show verbose output
+            on_progress: Called from the calling thread for every progress update
+                while the CLI runs; implies streaming the output as it arrives
         Returns:
             Tuple of (success: bool, output: str)
         """
+        cmd = self._upload_command(
+            firmware_path, target, force, no_interactive, progress, no_reboot, verbose
+        )
+
+        with track_cli_command("upload") as call:
+            if on_progress:
+                success, output = self._run_streaming(cmd, on_progress)
+                if not success:
+                    call.outcome = "failure"
+                return success, output
+
+            try:
+                result = subprocess.run(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    check=True,
+                )
+                return True, result.stdout
+
+            except subprocess.CalledProcessError as e:
+                call.outcome = "failure"
+                return False, e.stderr
+
+    def install_drivers(self) -> tuple[bool, str]:
+        """
+        Install required USB drivers (Windows only)
+
+        Returns:
+            Tuple of (success: bool, output: str)
+        """
+        cmd = self._install_drivers_command()
+
+        with track_cli_command("install-drivers") as call:
+            try:
+                result = subprocess.run(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    check=True,
+                )
+                return True, result.stdout
+
+            except subprocess.CalledProcessError as e:
+                call.outcome = "failure"
+                return False, e.stderr
+
+    # Async API
+    #
+    # The coroutines below run HarpRegulator with asyncio.create_subprocess_exec
+    # so that many invocations can share the event loop instead of occupying a
+    # worker thread each. Cancelling the awaiting task kills the process.
+    # Every run is timed by subcommand and outcome in _run_async.
+
+    async def list_devices_async(
+        self, all_devices: bool = True, allow_connect: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        List all connected Harp devices without blocking the event loop
+
+        Args:
+            all_devices: Include all devices, even ones that are not definitively Harp devices
+            allow_connect: Allow connecting to devices to enumerate missing metadata
+
+        Returns:
+            List of device dictionaries with device information
+        """
+        returncode, stdout, stderr = await self._run_async(
+            self._list_command(all_devices, allow_connect)
+        )
+
+        if returncode != 0:
+            print(f"Error listing devices: {stderr}")
+            return []
+
+        return self._parse_device_list(stdout)
+
+    async def inspect_firmware_async(
+        self, firmware_path: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Inspect a firmware file without blocking the event loop
+
+        Args:
+            firmware_path: Path to firmware file (.uf2 or .hex)
+
+        Returns:
+            Dictionary with firmware information or None on error
+        """
+        returncode, stdout, stderr = await self._run_async(
+            self._inspect_command(firmware_path)
+        )
+
+        if returncode != 0:
+            print(f"Error inspecting firmware: {stderr}")
+            return None
+
+        return self._parse_firmware_info(stdout)
+
+    async def upload_firmware_async(
+        self,
+        firmware_path: str,
+        target: str,
+        force: bool = False,
+        no_interactive: bool = True,
+        progress: bool = True,
+        no_reboot: bool = False,
+        verbose: bool = False,
+        on_progress: Optional[Callable[[UploadProgress], None]] = None,
+        on_output: Optional[Callable[[str, str], None]] = None,
+    ) -> tuple[bool, str]:
+        """
+        Upload firmware to a Harp device without blocking the event loop
+
+        Args:
+            firmware_path: Path to firmware file
+            target: Target device (COM port, serial number, or "PICOBOOT")
+            force: Force upload even if checks fail
+            no_interactive: Run without user prompts
+            progress: Show progress bars
+            no_reboot: Don't reboot after upload
+            verbose: Show verbose output
+            on_progress: Called for every progress update parsed from stdout
+            on_output: Called with (stream, text) for every stdout/stderr line
+        Returns:
+            Tuple of (success: bool, output: str)
+        """
+        cmd = self._upload_command(
+            firmware_path, target, force, no_interactive, progress, no_reboot, verbose
+        )
+
+        def handle_output(stream: str, text: str):
+            if on_output:
+                on_output(stream, text)
+            if on_progress and stream == "stdout":
+                update = parse_progress_line(text)
+                if update:
+                    on_progress(update)
+
+        returncode, stdout, stderr = await self._run_async(cmd, handle_output)
+
+        if returncode != 0:
+            return False, stderr
+        return True, stdout
+
+    async def install_drivers_async(self) -> tuple[bool, str]:
+        """
+        Install required USB drivers (Windows only) without blocking the event loop
+
+        Returns:
+            Tuple of (success: bool, output: str)
+        """
+        returncode, stdout, stderr = await self._run_async(
+            self._install_drivers_command()
+        )
+
+        if returncode != 0:
+            return False, stderr
+        return True, stdout
+
+    async def _run_async(
+        self,
+        cmd: List[str],
+        on_output: Optional[Callable[[str, str], None]] = None,
+    ) -> tuple[int, str, str]:
+        """
+        Run a CLI command as an asyncio subprocess
+
+        Args:
+            cmd: Command line to run
+            on_output: Called with (stream, text) for every non-blank stdout or
+                stderr segment as it arrives
+
+        Returns:
+            Tuple of (returncode, stdout, stderr)
+        """
+        with track_cli_command(cmd[1]) as call:
+            returncode, stdout, stderr = await self._run_process(cmd, on_output)
+            if returncode != 0:
+                call.outcome = "failure"
+        return returncode, stdout, stderr
+
+    async def _run_process(
+        self,
+        cmd: List[str],
+        on_output: Optional[Callable[[str, str], None]] = None,
+    ) -> tuple[int, str, str]:
+        """Run a command as an asyncio subprocess (see _run_async)"""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except NotImplementedError:
+            # Event loops without subprocess support (e.g. a SelectorEventLoop
+            # on Windows) fall back to a blocking run on the CLI executor
+            return await get_cli_executor().run(self._run_blocking, cmd, on_output)
+
+        stdout_chunks: List[bytes] = []
+        stderr_chunks: List[bytes] = []
+        try:
+            await asyncio.gather(
+                self._pump_stream(process.stdout, "stdout", stdout_chunks, on_output),
+                self._pump_stream(process.stderr, "stderr", stderr_chunks, on_output),
+            )
+            returncode = await process.wait()
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+
+        return (
+            returncode,
+            b"".join(stdout_chunks).decode(errors="replace"),
+            b"".join(stderr_chunks).decode(errors="replace"),
+        )
+
+    @staticmethod
+    async def _pump_stream(
+        stream: asyncio.StreamReader,
+        name: str,
+        chunks: List[bytes],
+        on_output: Optional[Callable[[str, str], None]],
+    ):
+        """Read a subprocess stream to the end, reporting segments as they arrive"""
+        pending = b""
+        while True:
+            chunk = await stream.read(4096)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if on_output:
+                pending += chunk
+                *segments, pending = re.split(rb"[\r\n]", pending)
+                for segment in segments:
+                    text = segment.decode(errors="replace")
+                    if text.strip():
+                        on_output(name, text)
+
+        text = pending.decode(errors="replace")
+        if on_output and text.strip():
+            on_output(name, text)
+
+    @staticmethod
+    def _run_blocking(
+        cmd: List[str], on_output: Optional[Callable[[str, str], None]] = None
+    ) -> tuple[int, str, str]:
+        """Blocking equivalent of _run_async; output is reported after exit"""
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+
+        if on_output:
+            for name, output in (("stdout", result.stdout), ("stderr", result.stderr)):
+                for text in re.split(r"[\r\n]", output):
+                    if text.strip():
+                        on_output(name, text)
+
+        return result.returncode, result.stdout, result.stderr
+
+    def _list_command(self, all_devices: bool, allow_connect: bool) -> List[str]:
+        """Build the command line for listing devices"""
+        cmd = [self.cli_path, "list", "--json"]
+
+        if all_devices:
+            cmd.append("--all")
+
+        if allow_connect:
+            cmd.append("--allow-connect")
+
+        return cmd
+
+    def _inspect_command(self, firmware_path: str) -> List[str]:
+        """Build the command line for inspecting a firmware file"""
+        return [self.cli_path, "inspect", firmware_path, "--json"]
+
+    def _upload_command(
+        self,
+        firmware_path: str,
+        target: str,
+        force: bool,
+        no_interactive: bool,
+        progress: bool,
+        no_reboot: bool,
+        verbose: bool,
+    ) -> List[str]:
+        """Build the command line for uploading firmware"""
         cmd = [self.cli_path, "upload", firmware_path, "--target", target]
 
         if force:
@@ -132,37 +477,102 @@ class CLIWrapper:
         if verbose:
             cmd.append("--verbose")
 
+        return cmd
+
+    def _install_drivers_command(self) -> List[str]:
+        """Build the command line for installing drivers"""
+        return [self.cli_path, "install-drivers"]
+
+    @staticmethod
+    def _parse_device_list(stdout: str) -> List[Dict[str, Any]]:
+        """Parse the JSON output of the list command"""
+        if not stdout.strip():
+            return []
+
         try:
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=True,
-            )
-            return True, result.stdout
+            devices = json.loads(stdout)
+        except json.JSONDecodeError as e:
+            CLI_OUTPUT_ERRORS.inc(command="list")
+            print(f"Error parsing device list: {e}")
+            return []
 
-        except subprocess.CalledProcessError as e:
-            return False, e.stderr
+        return devices if isinstance(devices, list) else []
 
-    def install_drivers(self) -> tuple[bool, str]:
+    @staticmethod
+    def _parse_firmware_info(stdout: str) -> Optional[Dict[str, Any]]:
+        """Parse the JSON output of the inspect command"""
+        if not stdout.strip():
+            return None
+
+        try:
+            return json.loads(stdout)
+        except json.JSONDecodeError as e:
+            CLI_OUTPUT_ERRORS.inc(command="inspect")
+            print(f"Error parsing firmware info: {e}")
+            return None
+
+    def _run_streaming(
+        self, cmd: List[str], on_progress: Callable[[UploadProgress], None]
+    ) -> tuple[bool, str]:
         """
-        Install required USB drivers (Windows only)
+        Run a CLI command, parsing stdout into progress updates as it arrives
+
+        Progress bars redraw with carriage returns, so output is split on both
+        carriage returns and newlines rather than read line by line.
+
+        Args:
+            cmd: Command line to run
+            on_progress: Progress callback
 
         Returns:
-            Tuple of (success: bool, output: str)
+            Tuple of (success: bool, output: str) like the buffered commands
         """
-        cmd = [self.cli_path, "install-drivers"]
-
         try:
-            result = subprocess.run(
+            process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
-                check=True,
             )
-            return True, result.stdout
+        except OSError as e:
+            return False, str(e)
+
+        # Drain stderr concurrently so a chatty CLI cannot block on a full pipe
+        stderr_chunks: List[bytes] = []
+        stderr_thread = threading.Thread(
+            target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True
+        )
+        stderr_thread.start()
+
+        stdout_segments: List[str] = []
+        pending = b""
+        while True:
+            chunk = process.stdout.read1(4096)
+            if not chunk:
+                break
+            pending += chunk
+            *segments, pending = re.split(rb"[\r\n]", pending)
+            for segment in segments:
+                self._emit_progress(segment, stdout_segments, on_progress)
+        self._emit_progress(pending, stdout_segments, on_progress)
+
+        returncode = process.wait()
+        stderr_thread.join()
+        stderr = b"".join(stderr_chunks).decode(errors="replace")
+
+        if returncode != 0:
+            return False, stderr
+        return True, "\n".join(stdout_segments)
+
+    @staticmethod
+    def _emit_progress(
+        segment: bytes,
+        stdout_segments: List[str],
+        on_progress: Callable[[UploadProgress], None],
+    ):
+        """Decode an output segment, record it and report parsed progress"""
+        update = parse_progress_line(segment.decode(errors="replace"))
+        if update is None:
+            return
 
-        except subprocess.CalledProcessError as e:
-            return False, e.stderr
+        stdout_segments.append(update.line)
+        on_progress(update)
@@ -0,0 +1,250 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.services.firmware_repository import FirmwareEntry, device_keys
+from harp_updater_gui.utils.versions import parse_version
+
+
+# Device kind expected for each firmware file type
+FILE_TYPE_KINDS = {".uf2": "Pico", ".hex": "ATxmega"}
+
+HardwareKey = Union[Tuple[int, int], str]
+
+
+def hardware_key(hardware_version: Optional[str]) -> Optional[HardwareKey]:
+    """
+    Normalize a hardware version for comparisons
+
+    Args:
+        hardware_version: Hardware version string (e.g. "1.1", "v1.1.0")
+
+    Returns:
+        (major, minor) for version-like strings, the lowercased text otherwise,
+        or None if unknown
+    """
+    if hardware_version in (None, ""):
+        return None
+    parsed = parse_version(str(hardware_version))
+    if parsed is not None:
+        return parsed[0], parsed[1]
+    return str(hardware_version).strip().lower()
+
+
+@dataclass
+class FirmwareTarget:
+    """What a firmware file was built for"""
+
+    file_type: Optional[str] = None
+    who_am_i: Optional[int] = None
+    device_name: Optional[str] = None
+    hardware_version: Optional[str] = None
+    firmware_version: Optional[str] = None
+
+
+@dataclass
+class CompatibilityResult:
+    """Outcome of checking one device against a firmware file"""
+
+    device: Device
+    compatible: bool
+    reason: str = ""
+
+
+class CompatibilityIndex:
+    """Precomputed (device, hardware version) -> compatible firmware versions
+
+    Built once from the firmware repository; membership checks are set
+    lookups. Firmware built without a hardware version is compatible with
+    every hardware version of its device.
+    """
+
+    def __init__(self, entries: Iterable[FirmwareEntry] = ()):
+        """
+        Initialize compatibility index
+
+        Args:
+            entries: Firmware repository entries to index
+        """
+        self._lock = threading.Lock()
+        self._versions: Dict[Tuple[str, Optional[HardwareKey]], Set[str]] = {}
+        self._all_versions: Dict[str, Set[str]] = {}
+        self.build(entries)
+
+    def build(self, entries: Iterable[FirmwareEntry]):
+        """
+        Rebuild the index
+
+        Args:
+            entries: Firmware repository entries to index
+        """
+        versions: Dict[Tuple[str, Optional[HardwareKey]], Set[str]] = {}
+        all_versions: Dict[str, Set[str]] = {}
+
+        for entry in entries:
+            if not entry.firmware_version:
+                continue
+            version = self._version_key(entry.firmware_version)
+            hardware = hardware_key(entry.hardware_version)
+            for key in device_keys(entry.device_name, entry.who_am_i):
+                versions.setdefault((key, hardware), set()).add(version)
+                all_versions.setdefault(key, set()).add(version)
+
+        with self._lock:
+            self._versions = versions
+            self._all_versions = all_versions
+
+    @staticmethod
+    def _version_key(version: str) -> str:
+        """Normalize a firmware version so "v1.2" and "1.2.0" are the same entry"""
+        parsed = parse_version(version)
+        if parsed is None:
+            return version.strip().lower()
+        major, minor, patch, _, prerelease = parsed
+        text = f"{major}.{minor}.{patch}"
+        if prerelease:
+            text += "-" + ".".join(str(part) for _, part in prerelease)
+        return text
+
+    def compatible_versions(
+        self,
+        device_name: Optional[str] = None,
+        who_am_i: Optional[int] = None,
+        hardware_version: Optional[str] = None,
+    ) -> Set[str]:
+        """
+        Get the firmware versions known to be compatible with a device
+
+        Args:
+            device_name: Device name
+            who_am_i: Device WhoAmI; preferred over the name when both are indexed
+            hardware_version: Device hardware version (default: any)
+
+        Returns:
+            Normalized version strings
+        """
+        hardware = hardware_key(hardware_version)
+        with self._lock:
+            for key in device_keys(device_name, who_am_i):
+                if key not in self._all_versions:
+                    continue
+                if hardware is None:
+                    return set(self._all_versions[key])
+                return self._versions.get((key, hardware), set()) | self._versions.get(
+                    (key, None), set()
+                )
+        return set()
+
+    def is_compatible(
+        self,
+        firmware_version: str,
+        device_name: Optional[str] = None,
+        who_am_i: Optional[int] = None,
+        hardware_version: Optional[str] = None,
+    ) -> bool:
+        """
+        Check whether a firmware version is known to be compatible with a device
+
+        Args:
+            firmware_version: Firmware version
+            device_name: Device name
+            who_am_i: Device WhoAmI
+            hardware_version: Device hardware version (default: any)
+
+        Returns:
+            True if the repository has that version for the device and hardware
+        """
+        return self._version_key(firmware_version) in self.compatible_versions(
+            device_name, who_am_i, hardware_version
+        )
+
+    def check_devices(
+        self, devices: List[Device], target: FirmwareTarget
+    ) -> List[CompatibilityResult]:
+        """
+        Check several devices against one firmware file
+
+        Devices sharing kind, WhoAmI and hardware version are checked once.
+        When the file does not declare a hardware version, the index decides
+        from the hardware versions its firmware version was released for.
+        Unknown information on either side is not treated as a mismatch;
+        HarpRegulator still verifies the device before flashing.
+
+        Args:
+            devices: Devices to check
+            target: What the firmware was built for
+
+        Returns:
+            One result per device, in order
+        """
+        expected_kind = FILE_TYPE_KINDS.get(target.file_type or "")
+        target_who_am_i = _as_int(target.who_am_i)
+        target_hardware = hardware_key(target.hardware_version)
+        # The firmware version is in the repository for the target device
+        indexed = (
+            target_hardware is None
+            and bool(target.firmware_version)
+            and target_who_am_i is not None
+            and self.is_compatible(target.firmware_version, who_am_i=target_who_am_i)
+        )
+
+        reasons: Dict[Tuple, str] = {}
+        results = []
+        for device in devices:
+            group = (device.kind, device.who_am_i, device.hardware_version)
+            reason = reasons.get(group)
+            if reason is None:
+                reason = reasons[group] = self._mismatch(
+                    device, target, expected_kind, target_who_am_i, target_hardware, indexed
+                )
+            results.append(CompatibilityResult(device, not reason, reason))
+
+        return results
+
+    def _mismatch(
+        self,
+        device: Device,
+        target: FirmwareTarget,
+        expected_kind: Optional[str],
+        target_who_am_i: Optional[int],
+        target_hardware: Optional[HardwareKey],
+        indexed: bool,
+    ) -> str:
+        """Get why a device cannot run the firmware, or "" if it can"""
+        if expected_kind and device.kind in FILE_TYPE_KINDS.values():
+            if device.kind != expected_kind:
+                return f"{device.kind} device cannot run {target.file_type} firmware"
+
+        if (
+            target_who_am_i is not None
+            and device.who_am_i is not None
+            and target_who_am_i != device.who_am_i
+        ):
+            return f"firmware is for WhoAmI {target_who_am_i}, device is {device.who_am_i}"
+
+        if not device.hardware_version:
+            return ""
+        if target_hardware is not None:
+            if hardware_key(device.hardware_version) != target_hardware:
+                return (
+                    f"firmware is for hardware v{target.hardware_version}, "
+                    f"device is v{device.hardware_version}"
+                )
+        elif indexed and not self.is_compatible(
+            target.firmware_version,
+            who_am_i=device.who_am_i if device.who_am_i is not None else target_who_am_i,
+            hardware_version=device.hardware_version,
+        ):
+            return (
+                f"firmware v{target.firmware_version} is not released for "
+                f"hardware v{device.hardware_version}"
+            )
+        return ""
+
+
+def _as_int(value) -> Optional[int]:
+    """Convert a WhoAmI from inspect output; None when missing or not numeric"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
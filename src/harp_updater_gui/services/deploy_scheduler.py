@@ -0,0 +1,158 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.utils.constants import DEFAULT_DEPLOY_CONCURRENCY
+from harp_updater_gui.utils.metrics import (
+    DEVICE_LAST_UPLOAD_DURATION,
+    DEVICE_LAST_UPLOAD_SUCCESS,
+    DEVICE_UPLOAD_DURATION,
+)
+
+
+UploadCallable = Callable[[Device], Awaitable[Tuple[bool, str]]]
+
+
+def device_tag(device: Device) -> str:
+    """Get a short tag identifying a device in log lines"""
+    location = device.port_name or device.serial_number or device.state
+    return f"[{device.display_name} @ {location}]"
+
+
+def record_upload_metrics(result: "DeviceDeployResult"):
+    """Record the duration and outcome of one upload in the metrics registry"""
+    device = result.device
+    outcome = "success" if result.success else "failure"
+    DEVICE_UPLOAD_DURATION.observe(
+        result.duration, kind=device.kind or "unknown", outcome=outcome
+    )
+    # Devices without a serial number (e.g. in bootloader) have no stable series
+    serial = device.serial_number
+    if serial:
+        DEVICE_LAST_UPLOAD_DURATION.set(result.duration, serial=serial)
+        DEVICE_LAST_UPLOAD_SUCCESS.set(1 if result.success else 0, serial=serial)
+
+
+@dataclass
+class DeviceDeployResult:
+    """Outcome of a firmware upload to a single device"""
+
+    device: Device
+    success: bool
+    output: str
+    duration: float
+
+
+@dataclass
+class BatchDeployReport:
+    """Aggregated outcome of a batch firmware deployment"""
+
+    results: List[DeviceDeployResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return len(self.results)
+
+    @property
+    def success_count(self) -> int:
+        return sum(1 for r in self.results if r.success)
+
+    @property
+    def fail_count(self) -> int:
+        return sum(1 for r in self.results if not r.success)
+
+    @property
+    def failed(self) -> List[DeviceDeployResult]:
+        return [r for r in self.results if not r.success]
+
+
+class DeployScheduler:
+    """Runs firmware uploads for several devices with bounded concurrency"""
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_DEPLOY_CONCURRENCY,
+        target_key: Optional[Callable[[Device], Optional[str]]] = None,
+        target_locks: Optional[Dict[str, asyncio.Lock]] = None,
+    ):
+        """
+        Initialize deploy scheduler
+
+        Args:
+            max_concurrency: Maximum number of uploads running at the same time
+            target_key: Returns the upload target of a device; uploads sharing
+                a target (e.g. "PICOBOOT") are never run concurrently
+            target_locks: Locks per upload target shared with other schedulers
+                (e.g. InventoryService.target_locks), so deploys started from
+                different windows never upload to the same target at once
+        """
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.target_key = target_key or (lambda device: device.port_name)
+        self.target_locks = target_locks
+
+    async def run(
+        self,
+        devices: List[Device],
+        upload: UploadCallable,
+        on_start: Optional[Callable[[Device, int], None]] = None,
+        on_finish: Optional[Callable[[DeviceDeployResult, int], None]] = None,
+    ) -> BatchDeployReport:
+        """
+        Upload firmware to all devices, at most max_concurrency at a time
+
+        Args:
+            devices: Target devices
+            upload: Coroutine function performing the upload for one device
+            on_start: Called with (device, position) when an upload starts
+            on_finish: Called with (result, completed count) when an upload ends
+
+        Returns:
+            BatchDeployReport with per-device results in input order
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        target_locks = self.target_locks if self.target_locks is not None else {}
+        results: List[Optional[DeviceDeployResult]] = [None] * len(devices)
+        completed = 0
+        batch_start = time.perf_counter()
+
+        async def deploy_one(position: int, device: Device):
+            nonlocal completed
+            key = self.target_key(device)
+            target_lock = asyncio.Lock()
+            if key:
+                # Devices sharing an upload target wait here without taking a slot
+                target_lock = target_locks.setdefault(key, target_lock)
+
+            async with target_lock, semaphore:
+                if on_start:
+                    on_start(device, position)
+
+                start = time.perf_counter()
+                try:
+                    success, output = await upload(device)
+                except Exception as e:
+                    success, output = False, str(e)
+
+                result = DeviceDeployResult(
+                    device=device,
+                    success=success,
+                    output=output,
+                    duration=time.perf_counter() - start,
+                )
+                results[position - 1] = result
+                completed += 1
+                record_upload_metrics(result)
+
+                if on_finish:
+                    on_finish(result, completed)
+
+        await asyncio.gather(
+            *(deploy_one(idx, device) for idx, device in enumerate(devices, 1))
+        )
+
+        return BatchDeployReport(
+            results=[r for r in results if r is not None],
+            elapsed=time.perf_counter() - batch_start,
+        )
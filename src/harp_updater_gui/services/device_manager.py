@@ -1,22 +1,41 @@
-from typing import List, Optional
-from harp_updater_gui.services.cli_wrapper import CLIWrapper
-from harp_updater_gui.models.device import Device
+import threading
+from typing import Callable, Dict, List, Mapping, Optional, Set, Tuple
+from harp_updater_gui.services.cli_wrapper import CLIWrapper, UploadProgress
+from harp_updater_gui.models.device import (
+    Device,
+    DeviceParseError,
+    DeviceSnapshot,
+    parse_device_list,
+)
+from harp_updater_gui.models.inventory import DeviceInventory
+from harp_updater_gui.services.metadata_cache import DeviceMetadataCache
 
 
 class DeviceManager:
     """Manager for Harp device operations"""
 
-    def __init__(self, cli_path: str = "HarpRegulator"):
+    def __init__(
+        self,
+        cli_path: str = "HarpRegulator",
+        metadata_cache: Optional[DeviceMetadataCache] = None,
+    ):
         """
         Initialize device manager
 
         Args:
             cli_path: Path to HarpRegulator executable
+            metadata_cache: Cache of last known device metadata (default: persisted
+                in the app data directory)
         """
         self.cli = CLIWrapper(cli_path)
-        self.devices: List[Device] = []
+        self.metadata_cache = metadata_cache or DeviceMetadataCache()
+        self.parse_errors: List[DeviceParseError] = []
         self.selected_device: Optional[Device] = None
 
+        # Current inventory; replaced as a whole, never modified in place
+        self._inventory = DeviceInventory()
+        self._publish_lock = threading.Lock()
+
     def refresh_devices(
         self, all_devices: bool = True, allow_connect: bool = True
     ) -> List[Device]:
@@ -34,17 +53,203 @@ class DeviceManager:
             all_devices=all_devices, allow_connect=allow_connect
         )
 
-        self.devices = []
-        for data in device_data:
-            try:
-                device = Device(**data)
-                self.devices.append(device)
-            except Exception as e:
-                print(f"Error parsing device data: {e}")
-                print(f"Raw data: {data}")
-                continue
+        return self.apply_device_data(device_data)
 
-        return self.devices
+    async def refresh_devices_async(
+        self, all_devices: bool = True, allow_connect: bool = True
+    ) -> List[Device]:
+        """
+        Refresh the list of connected devices without blocking the event loop
+
+        The CLI runs as an asyncio subprocess and the result is applied to this
+        manager on the calling (event loop) thread.
+
+        Args:
+            all_devices: Include all devices, even low-confidence ones
+            allow_connect: Allow connecting to devices for more information
+
+        Returns:
+            List of Device objects
+        """
+        device_data = await self.cli.list_devices_async(
+            all_devices=all_devices, allow_connect=allow_connect
+        )
+
+        return self.apply_device_data(device_data)
+
+    def apply_device_data(self, device_data: List[dict]) -> List[Device]:
+        """
+        Replace the device list with parsed HarpRegulator list output
+
+        Metadata present in the output is remembered in the metadata cache, and
+        metadata missing from it (typically after a no-connect refresh) is
+        restored from the cache.
+
+        Args:
+            device_data: Device dictionaries from the list command
+
+        Returns:
+            List of Device objects
+        """
+        self.metadata_cache.remember(device_data)
+        devices = self._parse_devices(self.metadata_cache.merge(device_data))
+        return list(self._publish(devices).devices)
+
+    @property
+    def inventory(self) -> DeviceInventory:
+        """Current device inventory; hold on to it for a consistent view"""
+        return self._inventory
+
+    @property
+    def devices(self) -> List[Device]:
+        """Devices of the current inventory"""
+        return list(self._inventory.devices)
+
+    @property
+    def snapshots(self) -> List[DeviceSnapshot]:
+        """Device snapshots of the current inventory"""
+        return list(self._inventory.snapshots)
+
+    @property
+    def available_updates(self) -> Mapping[str, str]:
+        """Newest available firmware version per device identity key"""
+        return self._inventory.available_updates
+
+    def _publish(
+        self,
+        devices: Optional[List[Device]] = None,
+        available_updates: Optional[Mapping[str, str]] = None,
+    ) -> DeviceInventory:
+        """
+        Build the next inventory version and swap it in
+
+        Args:
+            devices: New device list (default: keep the current devices)
+            available_updates: New available updates (default: keep the current ones)
+
+        Returns:
+            The published inventory
+        """
+        with self._publish_lock:
+            current = self._inventory
+            if devices is None:
+                inventory = current.with_available_updates(
+                    current.version + 1, available_updates
+                )
+            else:
+                inventory = DeviceInventory.build(
+                    current.version + 1,
+                    devices,
+                    current.available_updates
+                    if available_updates is None
+                    else available_updates,
+                )
+            self._inventory = inventory
+        return inventory
+
+    def get_device_by_key(self, key: str) -> Optional[Device]:
+        """Get a device by identity key (table row key)"""
+        return self._inventory.by_key.get(key)
+
+    def get_device_by_port(self, port_name: str) -> Optional[Device]:
+        """Get the device on a serial port"""
+        return self._inventory.by_port.get(port_name)
+
+    def get_ports(self) -> Set[str]:
+        """Get the serial ports currently in use by known devices"""
+        return set(self._inventory.by_port)
+
+    def get_device_by_serial(self, serial_number: str) -> Optional[Device]:
+        """Get a device by serial number"""
+        return self._inventory.by_serial.get(serial_number)
+
+    def get_devices_by_source(self, source: str) -> List[Device]:
+        """Get the devices reported with a USB source (not always unique)"""
+        return list(self._inventory.by_source.get(source, ()))
+
+    def get_devices_by_name(self, display_name: str) -> List[Device]:
+        """Get the devices with a display name, e.g. for batch updates"""
+        return list(self._inventory.by_name.get(display_name, ()))
+
+    def get_devices_by_state(self, *states: str) -> List[Device]:
+        """Get the devices in any of the given states"""
+        by_state = self._inventory.by_state
+        return [device for state in states for device in by_state.get(state, ())]
+
+    def group_devices_by_name(self) -> Dict[str, List[Device]]:
+        """Group devices by display name"""
+        return {name: list(devices) for name, devices in self._inventory.by_name.items()}
+
+    def group_devices_by_state(self) -> Dict[str, List[Device]]:
+        """Group devices by state"""
+        return {state: list(devices) for state, devices in self._inventory.by_state.items()}
+
+    def apply_hotplug_data(
+        self, device_data: List[dict]
+    ) -> Tuple[List[Device], List[Device], List[Device]]:
+        """
+        Merge a no-connect enumeration into the current device list
+
+        Devices that are still present in the same state keep their existing
+        Device object, so metadata gathered by a connecting refresh survives.
+        Devices are matched on serial number, then port, then source, because
+        no-connect results often lack the serial number.
+
+        Args:
+            device_data: Device dictionaries from the list command
+
+        Returns:
+            Tuple of (added, removed, changed) devices
+        """
+        inventory = self._inventory
+        devices: List[Device] = []
+        added: List[Device] = []
+        changed: List[Device] = []
+        matched_ids = set()
+
+        for device in self._parse_devices(self.metadata_cache.merge(device_data)):
+            known = (
+                (device.serial_number and inventory.by_serial.get(device.serial_number))
+                or (device.port_name and inventory.by_port.get(device.port_name))
+                or (device.source and next(iter(inventory.by_source.get(device.source, ())), None))
+                or None
+            )
+            if known is not None and id(known) in matched_ids:
+                known = None
+
+            if known is None:
+                added.append(device)
+                devices.append(device)
+            elif known.state != device.state:
+                matched_ids.add(id(known))
+                changed.append(device)
+                devices.append(device)
+            else:
+                matched_ids.add(id(known))
+                devices.append(known)
+
+        removed = [d for d in inventory.devices if id(d) not in matched_ids]
+
+        if added or removed or changed:
+            self._publish(devices)
+
+        return added, removed, changed
+
+    def _parse_devices(self, device_data: List[dict]) -> List[Device]:
+        """Parse device dictionaries, skipping malformed entries"""
+        devices, self.parse_errors = parse_device_list(device_data)
+        for error in self.parse_errors:
+            print(f"Error parsing device data: {error}")
+        return devices
+
+    def set_available_updates(self, updates: Dict[str, str]):
+        """
+        Record which devices have newer firmware available
+
+        Args:
+            updates: Newest firmware version per device identity key
+        """
+        self._publish(available_updates=updates)
 
     def get_devices(self) -> List[Device]:
         """Get the current list of devices"""
@@ -75,37 +280,51 @@ class DeviceManager:
         Returns:
             Filtered list of devices
         """
-        filtered = self.devices
+        return [
+            snapshot.device
+            for snapshot in self.filter_snapshots(search_query, device_type, health_status)
+        ]
+
+    def filter_snapshots(
+        self,
+        search_query: str = "",
+        device_type: Optional[str] = None,
+        health_status: Optional[str] = None,
+        inventory: Optional[DeviceInventory] = None,
+    ) -> List[DeviceSnapshot]:
+        """
+        Filter device snapshots based on criteria (see filter_devices)
+
+        Args:
+            inventory: Inventory version to filter (default: the current one)
 
-        # Apply search query
+        Returns:
+            Filtered list of snapshots, with derived fields precomputed
+        """
+        inventory = inventory or self._inventory
+        filtered = list(inventory.snapshots)
+
+        # Apply search query through the inventory's substring index
         if search_query:
-            query_lower = search_query.lower()
-            filtered = [
-                d
-                for d in filtered
-                if query_lower in d.display_name.lower()
-                or query_lower in d.port_name.lower()
-                or (
-                    d.device_description and query_lower in d.device_description.lower()
-                )
-            ]
+            snapshots = inventory.snapshots
+            filtered = [snapshots[i] for i in inventory.search_index.search(search_query)]
 
         # Apply device type filter
         if device_type and device_type != "All types":
             # Hardware types
             if device_type in ["Pico", "ATxmega"]:
-                filtered = [d for d in filtered if d.kind == device_type]
+                filtered = [d for d in filtered if d.device.kind == device_type]
             # Health status filters
             elif device_type == "Healthy":
-                filtered = [d for d in filtered if d.state == "Online"]
+                filtered = [d for d in filtered if d.device.state == "Online"]
             elif device_type == "Error":
                 filtered = [
-                    d for d in filtered if d.state in ["DriverError", "Unknown"]
+                    d for d in filtered if d.device.state in ["DriverError", "Unknown"]
                 ]
             elif device_type == "Needs update":
-                # This would require firmware version checking
-                # For now, just show devices that are online but might need updates
-                filtered = [d for d in filtered if d.state == "Online"]
+                filtered = [
+                    d for d in filtered if d.identity_key in inventory.available_updates
+                ]
 
         # Apply health status filter (if explicitly provided)
         if health_status:
@@ -113,8 +332,78 @@ class DeviceManager:
 
         return filtered
 
+    def query_snapshots(
+        self,
+        search_query: str = "",
+        device_type: Optional[str] = None,
+        sort_by: Optional[str] = "name",
+        descending: bool = False,
+        page: int = 1,
+        rows_per_page: int = 10,
+        inventory: Optional[DeviceInventory] = None,
+    ) -> Tuple[List[DeviceSnapshot], int]:
+        """
+        Filter, sort and page device snapshots for server-side table data
+
+        Sorted orders are computed once per inventory version and column, so
+        each request costs one pass over the matching devices.
+
+        Args:
+            search_query: Text to search in name, port, serial number,
+                description and firmware version
+            device_type: Filter by device kind or status (see filter_devices)
+            sort_by: Table column to sort by (see models/inventory.SORT_KEYS)
+            descending: Sort in descending order
+            page: Page number, starting at 1; clamped to the last page
+            rows_per_page: Rows per page, 0 for all rows
+            inventory: Inventory version to query (default: the current one)
+
+        Returns:
+            Tuple of (snapshots on the page, total number of matches)
+        """
+        inventory = inventory or self._inventory
+        order = inventory.sorted_snapshots(sort_by or "")
+
+        if search_query or (device_type and device_type != "All types"):
+            matches = self.filter_snapshots(
+                search_query, device_type, inventory=inventory
+            )
+            keys = {snapshot.identity_key for snapshot in matches}
+            order = [snapshot for snapshot in order if snapshot.identity_key in keys]
+
+        if descending:
+            order = order[::-1]
+
+        total = len(order)
+        if rows_per_page <= 0:
+            return list(order), total
+
+        last_page = max(1, -(-total // rows_per_page))
+        start = (min(max(page, 1), last_page) - 1) * rows_per_page
+        return list(order[start : start + rows_per_page]), total
+
+    def get_upload_target(self, device: Device) -> Optional[str]:
+        """
+        Get the HarpRegulator upload target for a device
+
+        Args:
+            device: Target device
+
+        Returns:
+            COM port, or "PICOBOOT" for Pico devices in bootloader state
+        """
+        # Use PICOBOOT if device is in bootloader state and is Pico
+        if device.state == "Bootloader" and device.kind == "Pico":
+            return "PICOBOOT"
+
+        return device.port_name
+
     def upload_firmware_to_device(
-        self, device: Device, firmware_path: str, force: bool = False
+        self,
+        device: Device,
+        firmware_path: str,
+        force: bool = False,
+        on_progress: Optional[Callable[[UploadProgress], None]] = None,
     ) -> tuple[bool, str]:
         """
         Upload firmware to a specific device
@@ -123,23 +412,58 @@ class DeviceManager:
             device: Target device
             firmware_path: Path to firmware file
             force: Force upload even if checks fail
+            on_progress: Optional callback receiving streamed upload progress
 
         Returns:
             Tuple of (success, message)
         """
-        target = device.port_name
-
-        # Use PICOBOOT if device is in bootloader state and is Pico
-        if device.state == "Bootloader" and device.kind == "Pico":
-            target = "PICOBOOT"
+        target = self.get_upload_target(device)
 
         success, output = self.cli.upload_firmware(
             firmware_path=firmware_path,
             target=target,
             force=force,
             no_interactive=True,
-            progress=False,
+            progress=on_progress is not None,
             verbose=force,
+            on_progress=on_progress,
         )
 
+        # The firmware (and possibly the device identity) changed
+        self.metadata_cache.invalidate(device)
+
+        return success, output
+
+    async def upload_firmware_to_device_async(
+        self,
+        device: Device,
+        firmware_path: str,
+        force: bool = False,
+        on_progress: Optional[Callable[[UploadProgress], None]] = None,
+    ) -> tuple[bool, str]:
+        """
+        Upload firmware to a specific device on the event loop
+
+        Args:
+            device: Target device
+            firmware_path: Path to firmware file
+            force: Force upload even if checks fail
+            on_progress: Optional callback receiving streamed upload progress
+
+        Returns:
+            Tuple of (success, message)
+        """
+        success, output = await self.cli.upload_firmware_async(
+            firmware_path=firmware_path,
+            target=self.get_upload_target(device),
+            force=force,
+            no_interactive=True,
+            progress=on_progress is not None,
+            verbose=force,
+            on_progress=on_progress,
+        )
+
+        # The firmware (and possibly the device identity) changed
+        self.metadata_cache.invalidate(device)
+
         return success, output
@@ -0,0 +1,162 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional, Union
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.services.device_manager import DeviceManager
+
+
+@dataclass
+class HotplugEvent:
+    """Devices that appeared, disappeared or changed state between two polls"""
+
+    added: List[Device] = field(default_factory=list)
+    removed: List[Device] = field(default_factory=list)
+    changed: List[Device] = field(default_factory=list)
+
+
+class DeviceWatcher:
+    """Background hot-plug detection using cheap no-connect enumeration
+
+    The polling interval starts at min_interval, grows by backoff_factor after
+    every poll without changes (up to max_interval, or hidden_interval while the
+    window is hidden) and snaps back to min_interval after a change.
+    """
+
+    def __init__(
+        self,
+        device_manager: DeviceManager,
+        on_change: Callable[[HotplugEvent], Union[None, Awaitable[None]]],
+        is_paused: Optional[Callable[[], bool]] = None,
+        min_interval: float = 1.0,
+        max_interval: float = 4.0,
+        hidden_interval: float = 15.0,
+        backoff_factor: float = 1.5,
+    ):
+        """
+        Initialize device watcher
+
+        Args:
+            device_manager: Device manager receiving hot-plug updates
+            on_change: Called (or awaited) with a HotplugEvent after a change
+            is_paused: Returns True while polling must not run (e.g. during a
+                refresh or a firmware upload)
+            min_interval: Polling interval after a change (seconds)
+            max_interval: Longest polling interval while visible (seconds)
+            hidden_interval: Polling interval while the window is hidden (seconds)
+            backoff_factor: Interval multiplier after a poll without changes
+        """
+        self.device_manager = device_manager
+        self.on_change = on_change
+        self.is_paused = is_paused or (lambda: False)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.hidden_interval = hidden_interval
+        self.backoff_factor = backoff_factor
+
+        self.interval = min_interval
+        self.hidden = False
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        # Poll started by the polling loop, while its HarpRegulator call runs
+        self._poll: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def polling(self) -> bool:
+        """True while a background poll is enumerating devices"""
+        return self._poll is not None and not self._poll.done()
+
+    async def wait_idle(self):
+        """Wait until the running background poll (if any) has finished"""
+        if self.polling:
+            await asyncio.wait({self._poll})
+
+    def start(self):
+        """Start polling in a background task on the running event loop"""
+        if not self.running:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        """Stop polling"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def set_hidden(self, hidden: bool):
+        """
+        Update window visibility
+
+        Args:
+            hidden: True while the window is hidden or minimized
+        """
+        was_hidden = self.hidden
+        self.hidden = hidden
+        if was_hidden and not hidden:
+            # Catch up immediately when the window becomes visible again
+            self.interval = self.min_interval
+            if self._wake:
+                self._wake.set()
+
+    def _next_interval(self, changed: bool) -> float:
+        """Compute the interval until the next poll"""
+        if self.hidden:
+            return self.hidden_interval
+        if changed:
+            return self.min_interval
+        return min(self.max_interval, self.interval * self.backoff_factor)
+
+    async def _run(self):
+        """Polling loop"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            if self.is_paused():
+                continue
+
+            try:
+                self._poll = asyncio.create_task(self.poll_once())
+                event = await self._poll
+            except Exception as e:
+                print(f"Error polling for devices: {e}")
+                event = None
+
+            self.interval = self._next_interval(event is not None)
+
+            if event is not None:
+                # A failing callback must not end hot-plug detection
+                try:
+                    result = self.on_change(event)
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    print(f"Error handling device change: {e}")
+
+    async def poll_once(self) -> Optional[HotplugEvent]:
+        """
+        Enumerate devices once without connecting and apply hot-plug changes
+
+        Returns:
+            HotplugEvent if devices were added, removed or changed state,
+            otherwise None
+        """
+        device_data = await self.device_manager.cli.list_devices_async(
+            all_devices=True, allow_connect=False
+        )
+
+        # A refresh or upload may have started while the CLI was running
+        if self.is_paused():
+            return None
+
+        added, removed, changed = self.device_manager.apply_hotplug_data(device_data)
+        if not (added or removed or changed):
+            return None
+
+        return HotplugEvent(added=added, removed=removed, changed=changed)
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from harp_updater_gui.utils.paths import get_data_dir
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 digest of a file without loading it into memory
+
+    Args:
+        path: File path
+        chunk_size: Read size in bytes
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FirmwareInspectionCache:
+    """Persistent, content-addressed cache of firmware inspection results
+
+    Results are stored by SHA-256 of the firmware contents, so overwriting a
+    file with a new build never returns stale metadata. A path index records
+    (size, mtime) for each known path, so a lookup of an unchanged file costs
+    a single stat call instead of re-hashing it. Entries are evicted in least
+    recently used order once max_entries is exceeded.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = 256):
+        """
+        Initialize firmware inspection cache
+
+        Args:
+            path: JSON file used to persist the cache (default: app data directory)
+            max_entries: Maximum number of inspection results kept
+        """
+        self.path = path or get_data_dir() / "firmware_inspection_cache.json"
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # digest -> inspection result, least recently used first
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # file path -> {"size", "mtime_ns", "sha256"}
+        self._paths: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._load()
+
+    def _load(self):
+        """Load persisted entries, ignoring unreadable files"""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            entries = data["entries"]
+            paths = data["paths"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+
+        if isinstance(entries, dict) and isinstance(paths, dict):
+            self._entries.update(entries)
+            self._paths.update(paths)
+
+    def _save(self):
+        """Persist entries to disk"""
+        data = {"entries": self._entries, "paths": self._paths}
+        try:
+            self.path.write_text(json.dumps(data), encoding="utf-8")
+        except OSError as e:
+            print(f"Error saving firmware inspection cache: {e}")
+
+    def _digest_for(self, firmware_path: str) -> Tuple[Optional[str], bool]:
+        """
+        Get the content digest of a file, re-hashing only if it changed on disk
+
+        Returns:
+            Tuple of (digest or None if the file cannot be read, path index updated)
+        """
+        try:
+            stat = os.stat(firmware_path)
+        except OSError:
+            return None, False
+
+        key = os.path.abspath(firmware_path)
+        known = self._paths.get(key)
+        if (
+            known
+            and known["size"] == stat.st_size
+            and known["mtime_ns"] == stat.st_mtime_ns
+        ):
+            self._paths.move_to_end(key)
+            return known["sha256"], False
+
+        try:
+            digest = file_sha256(firmware_path)
+        except OSError:
+            return None, False
+
+        self._paths[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+        }
+        self._paths.move_to_end(key)
+        return digest, True
+
+    def digest(self, firmware_path: str) -> Optional[str]:
+        """
+        Get the SHA-256 digest of a firmware file, using the path index
+
+        Args:
+            firmware_path: Path to firmware file
+
+        Returns:
+            Hex digest, or None if the file cannot be read
+        """
+        with self._lock:
+            digest, updated = self._digest_for(firmware_path)
+            if updated:
+                self._save()
+            return digest
+
+    def get(self, firmware_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the inspection result of a firmware file
+
+        Args:
+            firmware_path: Path to firmware file
+
+        Returns:
+            Cached inspection result, or None on a miss
+        """
+        with self._lock:
+            digest, updated = self._digest_for(firmware_path)
+            if updated:
+                self._save()
+            if digest is None or digest not in self._entries:
+                return None
+
+            self._entries.move_to_end(digest)
+            return self._entries[digest]
+
+    def put(self, firmware_path: str, info: Dict[str, Any]):
+        """
+        Store the inspection result of a firmware file
+
+        Args:
+            firmware_path: Path to the inspected firmware file
+            info: Inspection result
+        """
+        with self._lock:
+            digest, _ = self._digest_for(firmware_path)
+            if digest is None:
+                return
+
+            self._entries[digest] = info
+            self._entries.move_to_end(digest)
+            self._evict()
+            self._save()
+
+    def _evict(self):
+        """Drop least recently used entries beyond the size cap"""
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        # Path records are cheap but must not grow without bound either
+        while len(self._paths) > 4 * self.max_entries:
+            self._paths.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_shared_caches: Dict[Path, FirmwareInspectionCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_shared_inspection_cache() -> FirmwareInspectionCache:
+    """Get the inspection cache shared by all FirmwareService instances"""
+    path = get_data_dir() / "firmware_inspection_cache.json"
+    with _shared_caches_lock:
+        if path not in _shared_caches:
+            _shared_caches[path] = FirmwareInspectionCache(path)
+        return _shared_caches[path]
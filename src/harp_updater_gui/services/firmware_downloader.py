@@ -0,0 +1,488 @@
+import hashlib
+import http.client
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urljoin, urlsplit
+from harp_updater_gui.services.firmware_cache import file_sha256
+from harp_updater_gui.utils.paths import get_data_dir
+from harp_updater_gui.utils.versions import parse_version
+
+
+# Errors after which a kept-alive connection is reopened and the request retried
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS = 5
+
+
+class DownloadError(Exception):
+    """Raised when a firmware file cannot be downloaded or verified"""
+
+
+@dataclass(frozen=True)
+class FirmwareRelease:
+    """A firmware file published by the release server"""
+
+    device: str
+    version: str
+    url: str
+    sha256: Optional[str] = None
+    hardware_version: Optional[str] = None
+
+
+class HTTPConnectionPool:
+    """Thread-safe pool of kept-alive HTTP(S) connections per host"""
+
+    def __init__(self, max_idle_per_host: int = 4, timeout: float = 30.0):
+        """
+        Initialize connection pool
+
+        Args:
+            max_idle_per_host: Idle connections kept open per host
+            timeout: Socket timeout in seconds
+        """
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+
+    def acquire(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        """Get an idle connection to a host, or open a new one"""
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop()
+
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        if scheme == "http":
+            return http.client.HTTPConnection(netloc, timeout=self.timeout)
+        raise DownloadError(f"Unsupported URL scheme: {scheme}")
+
+    def release(
+        self, scheme: str, netloc: str, connection: http.client.HTTPConnection, reusable: bool
+    ):
+        """Return a connection to the pool, closing it if it cannot be reused"""
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if reusable and len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            connections = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+
+class FirmwareDownloader:
+    """Mirrors firmware releases from an HTTP server with resumable, verified downloads
+
+    The release server publishes a JSON manifest (default "index.json" under
+    the server URL) listing its firmware files:
+
+        {"firmware": [{"device": "Behavior", "version": "2.1.0",
+                       "hardware_version": "1.1",
+                       "url": "Behavior/Behavior-fw2.1.0.uf2", "sha256": "..."}]}
+
+    Relative URLs are resolved against the manifest URL. Files are mirrored as
+    <mirror>/<device>/<file name>, the layout FirmwareRepository indexes.
+
+    - The manifest is fetched with If-None-Match/If-Modified-Since, so an
+      unchanged catalog costs a 304 response.
+    - Mirrored files whose SHA-256 matches the manifest are served from disk
+      without any request; files without a digest are revalidated conditionally.
+    - Interrupted downloads are kept as ".part" files and resumed with Range
+      requests (guarded by If-Range so a changed file restarts from scratch).
+    - Connections are kept alive and shared through a pool, so concurrent
+      downloads from the same server reuse sockets.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        server_url: str,
+        mirror_dir: Path,
+        manifest_name: str = "index.json",
+        state_path: Optional[Path] = None,
+        max_connections: int = 4,
+        timeout: float = 30.0,
+    ):
+        """
+        Initialize firmware downloader
+
+        Args:
+            server_url: Base URL of the release server
+            mirror_dir: Local directory receiving firmware files
+            manifest_name: Manifest path relative to server_url
+            state_path: JSON file with HTTP validators and the cached manifest
+                (default: app data directory)
+            max_connections: Concurrent downloads and pooled connections per host
+            timeout: Socket timeout in seconds
+        """
+        self.server_url = server_url if server_url.endswith("/") else server_url + "/"
+        self.manifest_url = urljoin(self.server_url, manifest_name)
+        self.mirror_dir = Path(mirror_dir)
+        self.state_path = state_path or get_data_dir() / "firmware_downloads.json"
+        self.max_connections = max_connections
+        self.pool = HTTPConnectionPool(max_connections, timeout)
+
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict] = self._load_state()
+
+    def _load_state(self) -> Dict[str, Dict]:
+        """Load persisted validators, ignoring unreadable files"""
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"manifest": {}, "files": {}}
+
+        if not isinstance(state, dict):
+            return {"manifest": {}, "files": {}}
+        state.setdefault("manifest", {})
+        state.setdefault("files", {})
+        return state
+
+    def _save_state(self):
+        """Persist validators to disk; callers hold the lock"""
+        try:
+            self.state_path.write_text(json.dumps(self._state), encoding="utf-8")
+        except OSError as e:
+            print(f"Error saving firmware download state: {e}")
+
+    @contextmanager
+    def _request(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Iterator[http.client.HTTPResponse]:
+        """
+        Send a GET request over a pooled connection, following redirects
+
+        The response must be read completely inside the context for the
+        connection to be reused.
+        """
+        for _ in range(_MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+
+            connection, response = self._send(parts.scheme, parts.netloc, path, headers)
+            if response.status in _REDIRECT_STATUSES and response.getheader("Location"):
+                response.read()
+                self.pool.release(
+                    parts.scheme, parts.netloc, connection, not response.will_close
+                )
+                url = urljoin(url, response.getheader("Location"))
+                continue
+
+            reusable = False
+            try:
+                yield response
+                reusable = response.isclosed() and not response.will_close
+            finally:
+                self.pool.release(parts.scheme, parts.netloc, connection, reusable)
+            return
+
+        raise DownloadError(f"Too many redirects for {url}")
+
+    def _send(
+        self, scheme: str, netloc: str, path: str, headers: Optional[Dict[str, str]]
+    ) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        """Send a request, retrying once on a connection the server dropped"""
+        for attempt in range(2):
+            connection = self.pool.acquire(scheme, netloc)
+            try:
+                connection.request("GET", path, headers=headers or {})
+                return connection, connection.getresponse()
+            except _STALE_CONNECTION_ERRORS as e:
+                connection.close()
+                if attempt:
+                    raise DownloadError(f"Request to {netloc} failed: {e}") from e
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise DownloadError(f"Request to {netloc} failed: {e}") from e
+        raise DownloadError(f"Request to {netloc} failed")
+
+    @staticmethod
+    def _validators(entry: Dict) -> Dict[str, str]:
+        """Build conditional request headers from stored validators"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def fetch_manifest(self) -> List[FirmwareRelease]:
+        """
+        Get the release list, revalidating the cached manifest
+
+        Returns:
+            Releases published by the server
+
+        Raises:
+            DownloadError: If the manifest cannot be fetched or parsed
+        """
+        with self._lock:
+            cached = dict(self._state["manifest"])
+
+        with self._request(self.manifest_url, self._validators(cached)) as response:
+            body = response.read()
+            status = response.status
+            etag = response.getheader("ETag")
+            last_modified = response.getheader("Last-Modified")
+
+        if status == 304 and "releases" in cached:
+            releases = cached["releases"]
+        elif status == 200:
+            try:
+                releases = self._parse_manifest(json.loads(body))
+            except (ValueError, KeyError, TypeError) as e:
+                raise DownloadError(f"Invalid firmware manifest: {e}") from e
+            with self._lock:
+                self._state["manifest"] = {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "releases": releases,
+                }
+                self._save_state()
+        else:
+            raise DownloadError(f"Firmware manifest request failed: HTTP {status}")
+
+        return [FirmwareRelease(**release) for release in releases]
+
+    def _parse_manifest(self, data: Dict) -> List[Dict]:
+        """Normalize manifest entries, resolving relative URLs"""
+        releases = []
+        for item in data["firmware"]:
+            releases.append(
+                asdict(
+                    FirmwareRelease(
+                        device=str(item["device"]),
+                        version=str(item["version"]),
+                        url=urljoin(self.manifest_url, item["url"]),
+                        sha256=item.get("sha256"),
+                        hardware_version=item.get("hardware_version"),
+                    )
+                )
+            )
+        return releases
+
+    def find_release(self, device: str, version: str) -> Optional[FirmwareRelease]:
+        """
+        Find a release by device name and version
+
+        Args:
+            device: Device name (case-insensitive)
+            version: Firmware version; "v1.2" and "1.2.0" are equivalent
+
+        Returns:
+            Matching release, or None
+        """
+        wanted = parse_version(version)
+        for release in self.fetch_manifest():
+            if release.device.lower() != device.lower():
+                continue
+            if release.version == version or (
+                wanted is not None and parse_version(release.version) == wanted
+            ):
+                return release
+        return None
+
+    def mirror_path(self, release: FirmwareRelease) -> Path:
+        """Get the local path of a mirrored release"""
+        device_dir = re.sub(r"[^\w.-]", "_", release.device) or "unknown"
+        file_name = Path(urlsplit(release.url).path).name
+        if not file_name:
+            raise DownloadError(f"Release URL has no file name: {release.url}")
+        return self.mirror_dir / device_dir / file_name
+
+    def download(self, release: FirmwareRelease) -> Path:
+        """
+        Ensure a release is in the local mirror
+
+        Args:
+            release: Release to download
+
+        Returns:
+            Path of the mirrored file
+
+        Raises:
+            DownloadError: If the transfer fails or the digest does not match
+        """
+        target = self.mirror_path(release)
+        with self._lock:
+            entry = dict(self._state["files"].get(release.url, {}))
+
+        if target.exists():
+            if release.sha256 and self._matches_digest(target, entry, release.sha256):
+                return target
+            if not release.sha256 and entry.get("sha256"):
+                # No digest to compare against: ask the server whether it changed
+                with self._request(release.url, self._validators(entry)) as response:
+                    if response.status == 304:
+                        response.read()
+                        return target
+                    return self._receive(release, response, target, entry, offset=0)
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        part = self._part_path(target)
+        offset = part.stat().st_size if part.exists() else 0
+
+        headers = {}
+        if offset and (entry.get("partial_etag") or entry.get("partial_last_modified")):
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = entry.get("partial_etag") or entry["partial_last_modified"]
+        else:
+            offset = 0
+
+        with self._request(release.url, headers) as response:
+            if response.status == 416:
+                response.read()
+                part.unlink()
+                with self._lock:
+                    self._state["files"].pop(release.url, None)
+                return self.download(release)
+            return self._receive(release, response, target, entry, offset)
+
+    def _receive(
+        self,
+        release: FirmwareRelease,
+        response: http.client.HTTPResponse,
+        target: Path,
+        entry: Dict,
+        offset: int,
+    ) -> Path:
+        """Stream a response body into the part file, then verify and publish it"""
+        if response.status == 206 and offset:
+            content_range = response.getheader("Content-Range", "")
+            if not content_range.startswith(f"bytes {offset}-"):
+                response.read()
+                raise DownloadError(f"Unexpected Content-Range: {content_range}")
+        elif response.status == 200:
+            offset = 0
+        else:
+            response.read()
+            raise DownloadError(f"Download of {release.url} failed: HTTP {response.status}")
+
+        etag = response.getheader("ETag")
+        last_modified = response.getheader("Last-Modified")
+        expected_length = response.getheader("Content-Length")
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        part = self._part_path(target)
+        digest = hashlib.sha256()
+        received = 0
+
+        with self._lock:
+            self._state["files"][release.url] = {
+                "partial_etag": etag,
+                "partial_last_modified": last_modified,
+            }
+            self._save_state()
+
+        with open(part, "r+b" if offset else "wb") as f:
+            if offset:
+                for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                f.seek(offset)
+                f.truncate()
+            try:
+                for chunk in iter(lambda: response.read(self.CHUNK_SIZE), b""):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    received += len(chunk)
+            except (OSError, http.client.HTTPException) as e:
+                raise DownloadError(f"Download of {release.url} interrupted: {e}") from e
+
+        if expected_length is not None and received != int(expected_length):
+            raise DownloadError(
+                f"Download of {release.url} incomplete: {received} of {expected_length} bytes"
+            )
+
+        sha256 = digest.hexdigest()
+        if release.sha256 and sha256 != release.sha256.lower():
+            part.unlink()
+            with self._lock:
+                self._state["files"].pop(release.url, None)
+                self._save_state()
+            raise DownloadError(f"SHA-256 mismatch for {release.url}")
+
+        os.replace(part, target)
+        stat = target.stat()
+        with self._lock:
+            self._state["files"][release.url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "sha256": sha256,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+            self._save_state()
+        return target
+
+    @staticmethod
+    def _part_path(target: Path) -> Path:
+        return target.with_name(target.name + ".part")
+
+    def _matches_digest(self, path: Path, entry: Dict, sha256: str) -> bool:
+        """Check a mirrored file's digest, trusting the stored one if unchanged on disk"""
+        stat = path.stat()
+        if (
+            entry.get("size") == stat.st_size
+            and entry.get("mtime_ns") == stat.st_mtime_ns
+            and entry.get("sha256")
+        ):
+            return entry["sha256"] == sha256.lower()
+        return file_sha256(str(path)) == sha256.lower()
+
+    def download_many(
+        self, releases: List[FirmwareRelease]
+    ) -> Dict[FirmwareRelease, Union[Path, DownloadError]]:
+        """
+        Download several releases concurrently
+
+        Args:
+            releases: Releases to mirror
+
+        Returns:
+            Mirrored path, or the error raised, per release
+        """
+
+        def fetch(release: FirmwareRelease) -> Union[Path, DownloadError]:
+            try:
+                return self.download(release)
+            except DownloadError as e:
+                return e
+            except OSError as e:
+                return DownloadError(str(e))
+
+        if not releases:
+            return {}
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_connections, len(releases)),
+            thread_name_prefix="harp-firmware-download",
+        ) as pool:
+            return dict(zip(releases, pool.map(fetch, releases)))
+
+    def close(self):
+        """Close pooled connections"""
+        self.pool.close()
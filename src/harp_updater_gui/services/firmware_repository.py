@@ -0,0 +1,467 @@
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.utils.paths import get_data_dir
+from harp_updater_gui.utils.uf2 import UF2Error, parse_uf2_file
+from harp_updater_gui.utils.versions import VersionKey, parse_version
+
+
+FIRMWARE_EXTENSIONS = (".uf2", ".hex")
+
+# Dashes also separate file name fields, so only common pre-release labels
+# are read as part of a version ("fw2.1.0-rc.1-harp1.13" -> "2.1.0-rc.1")
+_FILENAME_PRERELEASE = r"(?:-(?:alpha|beta|rc|pre|dev)[0-9A-Za-z.]*)?"
+_FILENAME_FIRMWARE_VERSION = re.compile(
+    r"fw[-_]?v?(\d+\.\d+(?:\.\d+)?" + _FILENAME_PRERELEASE + ")", re.IGNORECASE
+)
+_FILENAME_HARDWARE_VERSION = re.compile(r"hw[-_]?v?(\d+\.\d+(?:\.\d+)?)", re.IGNORECASE)
+_FILENAME_VERSION = re.compile(
+    r"(?<![\w.])v?(\d+\.\d+(?:\.\d+)?" + _FILENAME_PRERELEASE + ")", re.IGNORECASE
+)
+
+
+@dataclass
+class FirmwareEntry:
+    """A firmware file in the local repository"""
+
+    path: str
+    file_type: str
+    size: int
+    mtime_ns: int
+    device_name: Optional[str] = None
+    who_am_i: Optional[int] = None
+    firmware_version: Optional[str] = None
+    hardware_version: Optional[str] = None
+
+    @property
+    def version_key(self) -> Optional[VersionKey]:
+        return parse_version(self.firmware_version)
+
+    @property
+    def sort_key(self) -> Tuple[bool, Any, int]:
+        """Newest-first ordering; unversioned files rank below versioned ones"""
+        version_key = self.version_key
+        return (version_key is not None, version_key or (), self.mtime_ns)
+
+
+def device_keys(device_name: Optional[str] = None, who_am_i: Optional[int] = None) -> List[str]:
+    """
+    Get the index keys of a device, most specific first
+
+    Args:
+        device_name: Device name (case-insensitive)
+        who_am_i: Device WhoAmI
+
+    Returns:
+        Keys such as "whoami:1405" and "name:behavior"
+    """
+    keys = []
+    if who_am_i is not None:
+        keys.append(f"whoami:{who_am_i}")
+    if device_name:
+        keys.append(f"name:{device_name.lower()}")
+    return keys
+
+
+def find_value(data: Any, names: Tuple[str, ...]) -> Any:
+    """
+    Breadth-first search of nested inspect output for the first named field
+
+    Args:
+        data: Inspect output (nested dictionaries and lists)
+        names: Field names, in order of preference
+
+    Returns:
+        First non-empty value found, or None
+    """
+    queue = [data]
+    while queue:
+        current = queue.pop(0)
+        if isinstance(current, dict):
+            for name in names:
+                if current.get(name) not in (None, ""):
+                    return current[name]
+            queue.extend(current.values())
+        elif isinstance(current, list):
+            queue.extend(current)
+    return None
+
+
+class FirmwareRepository:
+    """Index of the firmware files in a local directory tree
+
+    Files are expected under <root>/<DeviceName>/..., and are identified by
+    metadata embedded in the file (HarpRegulator inspect output, Pico SDK
+    binary info) with the path and file name (e.g. "Behavior-fw2.1.0-hw1.0.uf2")
+    as fallback. refresh() only stats the tree and inspects new or modified
+    files, in a worker pool. Latest-version lookups are dictionary reads.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        inspect: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None,
+        index_path: Optional[Path] = None,
+        max_workers: int = 4,
+    ):
+        """
+        Initialize firmware repository
+
+        Args:
+            root: Directory containing firmware files
+            inspect: Returns HarpRegulator inspect output for a file (optional)
+            index_path: JSON file used to persist the index (default: app data directory)
+            max_workers: Worker threads inspecting new files
+        """
+        self.root = Path(root)
+        self.inspect = inspect
+        self.index_path = index_path or get_data_dir() / "firmware_index.json"
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._by_path: Dict[str, FirmwareEntry] = {}
+        # device key ("whoami:1405", "name:behavior") -> {path: entry}
+        self._by_device: Dict[str, Dict[str, FirmwareEntry]] = {}
+        # (device key, hardware version or None) -> newest entry
+        self._latest: Dict[Tuple[str, Optional[str]], FirmwareEntry] = {}
+        # device key -> newest entry for any hardware version
+        self._latest_any: Dict[str, FirmwareEntry] = {}
+        # Incremented whenever the index changes, so dependent indexes can rebuild
+        self.generation = 0
+        # Modification time of the root at the last refresh
+        self._root_mtime_ns: Optional[int] = None
+
+        self._load()
+
+    def _load(self):
+        """Load the persisted index, if it belongs to this root"""
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+            if data["root"] != str(self.root.resolve()):
+                return
+            entries = [FirmwareEntry(**entry) for entry in data["entries"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+
+        for entry in entries:
+            self._add(entry)
+
+    def _save(self):
+        """Persist the index to disk"""
+        data = {
+            "root": str(self.root.resolve()),
+            "entries": [asdict(entry) for entry in self._by_path.values()],
+        }
+        try:
+            self.index_path.write_text(json.dumps(data), encoding="utf-8")
+        except OSError as e:
+            print(f"Error saving firmware index: {e}")
+
+    def refresh(self) -> Tuple[int, int, int]:
+        """
+        Bring the index up to date with the directory tree
+
+        Returns:
+            Tuple of (added, updated, removed) file counts
+        """
+        self._root_mtime_ns = self._stat_root()
+        found = self._scan()
+
+        with self._lock:
+            known = {path: (e.size, e.mtime_ns) for path, e in self._by_path.items()}
+
+        stale = [
+            (path, size, mtime_ns)
+            for path, (size, mtime_ns) in found.items()
+            if known.get(path) != (size, mtime_ns)
+        ]
+        removed = [path for path in known if path not in found]
+
+        new_entries: List[FirmwareEntry] = []
+        if stale:
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_workers, len(stale)),
+                thread_name_prefix="harp-firmware-index",
+            ) as pool:
+                indexed = pool.map(lambda args: self._index_file(*args), stale)
+                new_entries = [entry for entry in indexed if entry is not None]
+
+        if not (stale or removed):
+            return 0, 0, 0
+
+        # Files that could not be indexed are left out until the next refresh
+        indexed_paths = {entry.path for entry in new_entries}
+        skipped = [path for path, _, _ in stale if path not in indexed_paths]
+
+        with self._lock:
+            for path in removed + skipped:
+                self._remove(path)
+            for entry in new_entries:
+                self._remove(entry.path)
+                self._add(entry)
+            self.generation += 1
+            self._save()
+
+        updated = sum(1 for path in indexed_paths if path in known)
+        return len(indexed_paths) - updated, updated, len(removed)
+
+    def refresh_if_changed(self) -> Tuple[int, int, int]:
+        """
+        Refresh only if the root directory changed since the last refresh
+
+        Only the root is stated, so files added to or removed from an
+        existing device folder are picked up by the next refresh().
+
+        Returns:
+            Tuple of (added, updated, removed) file counts
+        """
+        if self._root_mtime_ns is not None and self._stat_root() == self._root_mtime_ns:
+            return 0, 0, 0
+        return self.refresh()
+
+    def _stat_root(self) -> Optional[int]:
+        try:
+            return self.root.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """Stat every firmware file under the root"""
+        found: Dict[str, Tuple[int, int]] = {}
+        pending = [str(self.root)]
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as it:
+                    for item in it:
+                        if item.is_dir(follow_symlinks=False):
+                            pending.append(item.path)
+                        elif item.name.lower().endswith(FIRMWARE_EXTENSIONS):
+                            stat = item.stat()
+                            found[item.path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue
+        return found
+
+    def _index_file(self, path: str, size: int, mtime_ns: int) -> Optional[FirmwareEntry]:
+        """Build the index entry of a file from its metadata and name"""
+        file_type = Path(path).suffix.lower()
+        entry = FirmwareEntry(path=path, file_type=file_type, size=size, mtime_ns=mtime_ns)
+
+        if self.inspect:
+            try:
+                info = self.inspect(path) or {}
+            except Exception as e:
+                # e.g. HarpRegulator is missing; skip the file rather than the refresh
+                print(f"Error inspecting firmware file {path}: {e}")
+                return None
+            entry.who_am_i = find_value(info, ("WhoAmI",))
+            entry.device_name = find_value(info, ("DeviceDescription", "Description"))
+            entry.firmware_version = find_value(info, ("FirmwareVersion", "Version"))
+            entry.hardware_version = find_value(info, ("HardwareVersion",))
+
+        if file_type == ".uf2" and not (entry.device_name and entry.firmware_version):
+            try:
+                metadata = parse_uf2_file(path).metadata
+            except (UF2Error, OSError):
+                metadata = {}
+            entry.device_name = entry.device_name or metadata.get("program_name")
+            entry.firmware_version = entry.firmware_version or metadata.get(
+                "program_version"
+            )
+
+        self._apply_path_conventions(entry)
+
+        if entry.who_am_i is not None:
+            try:
+                entry.who_am_i = int(entry.who_am_i)
+            except (TypeError, ValueError):
+                entry.who_am_i = None
+        for name in ("device_name", "firmware_version", "hardware_version"):
+            value = getattr(entry, name)
+            if value is not None:
+                setattr(entry, name, str(value))
+
+        return entry
+
+    def _apply_path_conventions(self, entry: FirmwareEntry):
+        """Fill missing fields from <root>/<DeviceName>/... and the file name"""
+        stem = Path(entry.path).stem
+
+        if not entry.device_name:
+            relative = Path(entry.path).relative_to(self.root)
+            if len(relative.parts) > 1:
+                entry.device_name = relative.parts[0]
+            else:
+                entry.device_name = re.split(r"[-_ ]", stem, maxsplit=1)[0] or None
+
+        if not entry.firmware_version:
+            match = _FILENAME_FIRMWARE_VERSION.search(stem) or _FILENAME_VERSION.search(
+                stem
+            )
+            if match:
+                entry.firmware_version = match.group(1)
+
+        if not entry.hardware_version:
+            match = _FILENAME_HARDWARE_VERSION.search(stem)
+            if match:
+                entry.hardware_version = match.group(1)
+
+    def _add(self, entry: FirmwareEntry):
+        """Insert an entry into every index"""
+        self._by_path[entry.path] = entry
+        for key in device_keys(entry.device_name, entry.who_am_i):
+            self._by_device.setdefault(key, {})[entry.path] = entry
+
+            latest_key = (key, entry.hardware_version)
+            current = self._latest.get(latest_key)
+            if current is None or entry.sort_key > current.sort_key:
+                self._latest[latest_key] = entry
+
+            current = self._latest_any.get(key)
+            if current is None or entry.sort_key > current.sort_key:
+                self._latest_any[key] = entry
+
+    def _remove(self, path: str):
+        """Remove an entry from every index, recomputing affected latest entries"""
+        entry = self._by_path.pop(path, None)
+        if entry is None:
+            return
+
+        for key in device_keys(entry.device_name, entry.who_am_i):
+            remaining = self._by_device.get(key, {})
+            remaining.pop(path, None)
+            if not remaining:
+                self._by_device.pop(key, None)
+
+            latest_key = (key, entry.hardware_version)
+            same_hardware = [
+                other
+                for other in remaining.values()
+                if other.hardware_version == entry.hardware_version
+            ]
+            if same_hardware:
+                self._latest[latest_key] = max(same_hardware, key=lambda e: e.sort_key)
+            else:
+                self._latest.pop(latest_key, None)
+
+            if remaining:
+                self._latest_any[key] = max(remaining.values(), key=lambda e: e.sort_key)
+            else:
+                self._latest_any.pop(key, None)
+
+    def latest(
+        self,
+        device_name: Optional[str] = None,
+        who_am_i: Optional[int] = None,
+        hardware_version: Optional[str] = None,
+    ) -> Optional[FirmwareEntry]:
+        """
+        Get the newest firmware for a device
+
+        Args:
+            device_name: Device name (e.g. "Behavior")
+            who_am_i: Device WhoAmI; preferred over the name when both match
+            hardware_version: Only consider firmware built for this hardware
+                version or for no specific hardware version
+
+        Returns:
+            Newest matching entry, or None
+        """
+        with self._lock:
+            for key in device_keys(device_name, who_am_i):
+                if hardware_version is None:
+                    candidates = [self._latest_any.get(key)]
+                else:
+                    candidates = [
+                        self._latest.get((key, hardware_version)),
+                        self._latest.get((key, None)),
+                    ]
+                candidates = [entry for entry in candidates if entry is not None]
+                if candidates:
+                    return max(candidates, key=lambda e: e.sort_key)
+        return None
+
+    def latest_for_device(self, device: Device) -> Optional[FirmwareEntry]:
+        """
+        Get the newest firmware matching a connected device
+
+        Args:
+            device: Device to look up by WhoAmI, description and hardware version
+
+        Returns:
+            Newest matching entry, or None
+        """
+        return self.latest(
+            device_name=device.device_description,
+            who_am_i=device.who_am_i,
+            hardware_version=device.hardware_version,
+        )
+
+    def entries(
+        self, device_name: Optional[str] = None, who_am_i: Optional[int] = None
+    ) -> List[FirmwareEntry]:
+        """
+        Get the firmware files of a device, newest first
+
+        Args:
+            device_name: Device name
+            who_am_i: Device WhoAmI; preferred over the name when both match
+
+        Returns:
+            Matching entries
+        """
+        with self._lock:
+            for key in device_keys(device_name, who_am_i):
+                if key in self._by_device:
+                    return sorted(
+                        self._by_device[key].values(),
+                        key=lambda e: e.sort_key,
+                        reverse=True,
+                    )
+        return []
+
+    def versions(
+        self, device_name: Optional[str] = None, who_am_i: Optional[int] = None
+    ) -> List[str]:
+        """
+        Get the distinct firmware versions available for a device, newest first
+        """
+        versions: List[str] = []
+        for entry in self.entries(device_name, who_am_i):
+            if entry.firmware_version and entry.firmware_version not in versions:
+                versions.append(entry.firmware_version)
+        return versions
+
+    def contains(self, path: str) -> bool:
+        """Check whether a path lies under the repository root"""
+        try:
+            relative = os.path.relpath(os.path.abspath(path), os.path.abspath(self.root))
+        except ValueError:
+            # On Windows, paths on different drives have no relative path
+            return False
+        return relative != os.pardir and not relative.startswith(os.pardir + os.sep)
+
+    def get(self, path: str) -> Optional[FirmwareEntry]:
+        """Get the index entry of a file, if it is in the repository"""
+        # Index keys are paths as found by scanning the root
+        try:
+            key = os.path.join(str(self.root), os.path.relpath(path, self.root))
+        except ValueError:
+            # On Windows, a file on another drive cannot be in the repository
+            return None
+        with self._lock:
+            return self._by_path.get(key)
+
+    def all_entries(self) -> List[FirmwareEntry]:
+        """Get every indexed firmware file"""
+        with self._lock:
+            return list(self._by_path.values())
+
+    def __len__(self) -> int:
+        return len(self._by_path)
@@ -1,22 +1,80 @@
+import os
+import shutil
 from typing import List, Optional, Dict, Any
 from pathlib import Path
+from harp_updater_gui.models.device import Device
 from harp_updater_gui.services.cli_wrapper import CLIWrapper
+from harp_updater_gui.services.compatibility import (
+    CompatibilityIndex,
+    CompatibilityResult,
+    FirmwareTarget,
+    hardware_key,
+)
+from harp_updater_gui.services.firmware_cache import (
+    FirmwareInspectionCache,
+    get_shared_inspection_cache,
+)
+from harp_updater_gui.services.firmware_downloader import (
+    DownloadError,
+    FirmwareDownloader,
+)
+from harp_updater_gui.services.firmware_repository import (
+    FirmwareEntry,
+    FirmwareRepository,
+    find_value,
+)
+from harp_updater_gui.utils.constants import (
+    ATXMEGA_MAX_FLASH_BYTES,
+    ATXMEGA_MEMORY_SECTIONS,
+    FIRMWARE_SERVER_ENV_VAR,
+)
+from harp_updater_gui.utils.intel_hex import (
+    IntelHexError,
+    IntelHexImage,
+    parse_intel_hex_file,
+)
+from harp_updater_gui.utils.paths import get_data_dir
+from harp_updater_gui.utils.uf2 import RP_FAMILIES, UF2Error, UF2Image, parse_uf2_file
 # from harp_updater_gui.models.firmware import Firmware
-# from harp_updater_gui.models.device import Device
 
 
 class FirmwareService:
     """Service for firmware operations"""
 
-    def __init__(self, cli_path: str = "HarpRegulator"):
+    def __init__(
+        self,
+        cli_path: str = "HarpRegulator",
+        inspection_cache: Optional[FirmwareInspectionCache] = None,
+        firmware_dir: Optional[Path] = None,
+        firmware_server_url: Optional[str] = None,
+    ):
         """
         Initialize firmware service
 
         Args:
             cli_path: Path to HarpRegulator executable
+            inspection_cache: Inspection result cache (default: the persistent
+                cache shared by all instances in the process)
+            firmware_dir: Local firmware repository directory
+                (default: "firmware" in the app data directory)
+            firmware_server_url: Release server to download firmware from
+                (default: HARP_FIRMWARE_SERVER_URL environment variable)
         """
         self.cli = CLIWrapper(cli_path)
-        self.firmware_cache: Dict[str, Dict[str, Any]] = {}
+        self.inspection_cache = inspection_cache or get_shared_inspection_cache()
+        self.repository = FirmwareRepository(
+            firmware_dir or get_data_dir() / "firmware", inspect=self.inspect_firmware
+        )
+
+        self.compatibility = CompatibilityIndex()
+        self._compatibility_generation = -1
+
+        server_url = firmware_server_url or os.environ.get(FIRMWARE_SERVER_ENV_VAR)
+        self.downloader: Optional[FirmwareDownloader] = (
+            FirmwareDownloader(server_url, mirror_dir=self.repository.root)
+            if server_url
+            else None
+        )
 
     def inspect_firmware(self, firmware_path: str) -> Optional[Dict[str, Any]]:
         """
@@ -28,14 +86,15 @@ class FirmwareService:
         Returns:
             Dictionary with firmware information or None on error
         """
-        # Check cache first
-        if firmware_path in self.firmware_cache:
-            return self.firmware_cache[firmware_path]
+        # Check cache first (keyed by file contents)
+        firmware_info = self.inspection_cache.get(firmware_path)
+        if firmware_info is not None:
+            return firmware_info
 
         firmware_info = self.cli.inspect_firmware(firmware_path)
 
         if firmware_info:
-            self.firmware_cache[firmware_path] = firmware_info
+            self.inspection_cache.put(firmware_path, firmware_info)
 
         return firmware_info
 
@@ -68,48 +127,223 @@ class FirmwareService:
             hardware_version: Hardware version string
 
         Returns:
-            True if compatible
+            True if compatible, or if the firmware does not declare a hardware version
+        """
+        firmware_hardware = hardware_key(find_value(firmware_info, ("HardwareVersion",)))
+        if firmware_hardware is None or not hardware_version:
+            return True
+        return hardware_key(hardware_version) == firmware_hardware
+
+    def get_available_updates(
+        self, devices: List[Device], refresh_repository: bool = True
+    ) -> Dict[str, FirmwareEntry]:
+        """
+        Find the devices running older firmware than the newest compatible one
+
+        The repository is scanned at most once; each device then costs one
+        index lookup and a comparison of pre-parsed versions.
+
+        Args:
+            devices: Devices to check
+            refresh_repository: Rescan the firmware directory first; pass False
+                for cheap re-evaluation (e.g. after hot-plug events)
+
+        Returns:
+            Newest firmware entry per device identity key, for devices that
+            have an update available
+        """
+        if refresh_repository:
+            self.repository.refresh()
+
+        updates = {}
+        for device in devices:
+            current = device.firmware_version_key
+            if current is None:
+                continue
+            latest = self.repository.latest_for_device(device)
+            if latest is not None and latest.version_key is not None:
+                if latest.version_key > current:
+                    updates[device.identity_key] = latest
+        return updates
+
+    def get_compatibility_index(self, refresh_repository: bool = True) -> CompatibilityIndex:
+        """
+        Get the compatibility index, rebuilding it if the repository changed
+
+        Args:
+            refresh_repository: Rescan the firmware directory first; pass False
+                when the caller has just scanned it
+
+        Returns:
+            Index of compatible firmware versions per device and hardware version
         """
-        # This would need to parse the firmware info structure
-        # For now, return True as a placeholder
-        return True
+        if refresh_repository:
+            self.repository.refresh()
+        if self._compatibility_generation != self.repository.generation:
+            self.compatibility.build(self.repository.all_entries())
+            self._compatibility_generation = self.repository.generation
+        return self.compatibility
+
+    def describe_firmware(self, firmware_path: str) -> FirmwareTarget:
+        """
+        Get what a firmware file was built for
+
+        Files in the local repository are read from its index, which is
+        rescanned first; other files are inspected (through the inspection
+        cache) without scanning the repository.
+
+        Args:
+            firmware_path: Path to firmware file
 
-    def get_available_firmware_versions(self, device_type: str) -> List[str]:
+        Returns:
+            FirmwareTarget; fields are None when unknown
         """
-        Get available firmware versions for a device type
+        target = FirmwareTarget(file_type=self.get_firmware_type(firmware_path))
+
+        in_repository = self.repository.contains(firmware_path)
+        if in_repository:
+            self.repository.refresh()
+        entry = self.repository.get(firmware_path) if in_repository else None
+        if entry is not None:
+            target.who_am_i = entry.who_am_i
+            target.device_name = entry.device_name
+            target.hardware_version = entry.hardware_version
+            target.firmware_version = entry.firmware_version
+            return target
+
+        info = self.inspect_firmware(firmware_path) or {}
+        target.who_am_i = find_value(info, ("WhoAmI",))
+        target.device_name = find_value(info, ("DeviceDescription", "Description"))
+        target.hardware_version = find_value(info, ("HardwareVersion",))
+        target.firmware_version = find_value(info, ("FirmwareVersion", "Version"))
+        return target
+
+    def check_devices_compatibility(
+        self, devices: List[Device], firmware_path: str
+    ) -> List[CompatibilityResult]:
+        """
+        Check a batch of devices against a firmware file in one call
 
-        This is a placeholder - in a real implementation, this would
-        query a firmware repository or local directory
+        The repository is scanned at most once, and only for files inside it.
+
+        Args:
+            devices: Devices to check
+            firmware_path: Path to firmware file
+
+        Returns:
+            One result per device, in order
+        """
+        target = self.describe_firmware(firmware_path)
+        return self.get_compatibility_index(refresh_repository=False).check_devices(
+            devices, target
+        )
+
+    def get_available_firmware_versions(
+        self, device_type: str, refresh_repository: bool = False
+    ) -> List[str]:
+        """
+        Get available firmware versions for a device type from the local repository
 
         Args:
             device_type: Device type (e.g., "EnvironmentSensor")
+            refresh_repository: Rescan the whole firmware directory first; by
+                default it is rescanned only if its top-level folder changed
 
         Returns:
-            List of available firmware version strings
+            List of available firmware version strings, newest first
         """
-        # Placeholder implementation
-        return ["v0.9.1", "v0.9.0", "v0.5.0"]
+        self._refresh_repository(refresh_repository)
+        return self.repository.versions(device_name=device_type)
+
+    def get_latest_firmware(
+        self, device: Device, refresh_repository: bool = False
+    ) -> Optional[FirmwareEntry]:
+        """
+        Get the newest firmware in the local repository for a device
+
+        Args:
+            device: Device to look up by WhoAmI, description and hardware version
+            refresh_repository: Rescan the whole firmware directory first; by
+                default it is rescanned only if its top-level folder changed
+
+        Returns:
+            Newest matching firmware entry, or None
+        """
+        self._refresh_repository(refresh_repository)
+        return self.repository.latest_for_device(device)
+
+    def _refresh_repository(self, full: bool):
+        if full:
+            self.repository.refresh()
+        else:
+            self.repository.refresh_if_changed()
 
     def download_firmware(
-        self, version: str, device_type: str, output_path: str
+        self, version: str, device_type: str, output_path: Optional[str] = None
     ) -> bool:
         """
-        Download firmware from a repository
+        Download firmware from the release server into the local mirror
 
-        This is a placeholder - in a real implementation, this would
-        download from a web service or package manager
+        Releases already mirrored with a matching digest are not downloaded again.
 
         Args:
             version: Firmware version to download
             device_type: Device type
-            output_path: Where to save the firmware file
+            output_path: Where to copy the firmware file (optional; the
+                mirrored file is always kept in the firmware directory)
 
         Returns:
             True if successful
         """
-        # Placeholder implementation
-        print(f"Would download {device_type} firmware {version} to {output_path}")
-        return False
+        if self.downloader is None:
+            print(f"No firmware server configured (set {FIRMWARE_SERVER_ENV_VAR})")
+            return False
+
+        try:
+            release = self.downloader.find_release(device_type, version)
+            if release is None:
+                print(f"No {device_type} firmware {version} on the release server")
+                return False
+
+            path = self.downloader.download(release)
+            if output_path and Path(output_path).resolve() != path.resolve():
+                shutil.copyfile(path, output_path)
+            return True
+        except (DownloadError, OSError) as e:
+            print(f"Error downloading firmware: {e}")
+            return False
+
+    def mirror_releases(self, device_type: Optional[str] = None) -> Dict[str, bool]:
+        """
+        Download every release (of a device type) concurrently into the local mirror
+
+        Args:
+            device_type: Only mirror releases of this device (default: all)
+
+        Returns:
+            Success per release URL
+        """
+        if self.downloader is None:
+            print(f"No firmware server configured (set {FIRMWARE_SERVER_ENV_VAR})")
+            return {}
+
+        try:
+            releases = self.downloader.fetch_manifest()
+        except DownloadError as e:
+            print(f"Error fetching firmware releases: {e}")
+            return {}
+
+        if device_type:
+            releases = [r for r in releases if r.device.lower() == device_type.lower()]
+
+        results = self.downloader.download_many(releases)
+        for release, result in results.items():
+            if isinstance(result, DownloadError):
+                print(f"Error downloading {release.url}: {result}")
+        return {
+            release.url: not isinstance(result, DownloadError)
+            for release, result in results.items()
+        }
 
     def validate_firmware_file(
         self, device_kind: str, firmware_path: str
@@ -143,9 +377,60 @@ class FirmwareService:
         if device_kind == "ATxmega" and ext != ".hex":
             return False, "ATxmega devices require .hex firmware files"
 
-        # Could add more validation here (e.g., file size, magic bytes)
+        if ext == ".uf2":
+            try:
+                parse_uf2_file(firmware_path, allowed_families=list(RP_FAMILIES))
+            except (UF2Error, OSError) as e:
+                return False, f"Invalid UF2 file: {e}"
+
+        if ext == ".hex":
+            try:
+                parse_intel_hex_file(
+                    firmware_path,
+                    max_address=ATXMEGA_MAX_FLASH_BYTES,
+                    sections=ATXMEGA_MEMORY_SECTIONS,
+                )
+            except (IntelHexError, OSError) as e:
+                return False, f"Invalid HEX file: {e}"
+
         return True, ""
 
+    def inspect_uf2(self, firmware_path: str) -> Optional[UF2Image]:
+        """
+        Parse a UF2 file in-process, without running HarpRegulator
+
+        Args:
+            firmware_path: Path to .uf2 firmware file
+
+        Returns:
+            UF2Image with layout and embedded metadata, or None on error
+        """
+        try:
+            return parse_uf2_file(firmware_path)
+        except (UF2Error, OSError) as e:
+            print(f"Error parsing UF2 file: {e}")
+            return None
+
+    def inspect_hex(self, firmware_path: str) -> Optional[IntelHexImage]:
+        """
+        Parse an Intel HEX file in-process, without running HarpRegulator
+
+        Args:
+            firmware_path: Path to .hex firmware file
+
+        Returns:
+            IntelHexImage with address ranges, image size and digest, or None on error
+        """
+        try:
+            return parse_intel_hex_file(
+                firmware_path,
+                max_address=ATXMEGA_MAX_FLASH_BYTES,
+                sections=ATXMEGA_MEMORY_SECTIONS,
+            )
+        except (IntelHexError, OSError) as e:
+            print(f"Error parsing HEX file: {e}")
+            return None
+
     def fetch_available_firmware(self, device_id: str) -> List[str]:
         """
         Fetch available firmware versions for a device
@@ -165,11 +450,16 @@ class FirmwareService:
         Check if a firmware version is compatible with a device
 
         Args:
-            device_id: Device identifier
+            device_id: Device identifier (device name or WhoAmI)
             firmware_version: Firmware version string
 
         Returns:
-            True if compatible
+            True if the local repository has that version for the device
         """
-        # Placeholder implementation
-        return True
+        device_id = str(device_id)
+        who_am_i = int(device_id) if device_id.isdigit() else None
+        return self.get_compatibility_index().is_compatible(
+            firmware_version,
+            device_name=None if who_am_i is not None else device_id,
+            who_am_i=who_am_i,
+        )
@@ -0,0 +1,241 @@
+import asyncio
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Union
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.services.cli_executor import get_cli_executor
+from harp_updater_gui.services.device_manager import DeviceManager
+from harp_updater_gui.services.device_watcher import DeviceWatcher, HotplugEvent
+from harp_updater_gui.services.firmware_service import FirmwareService
+from harp_updater_gui.utils.metrics import INVENTORY_DEVICES, INVENTORY_REFRESH_DURATION
+
+
+# Called after the inventory changed; the event is None after a full refresh
+InventoryListener = Callable[[Optional[HotplugEvent]], Union[None, Awaitable[None]]]
+
+
+class InventoryService:
+    """Process-wide device inventory shared by every connected client
+
+    Owns the only DeviceManager, FirmwareService and DeviceWatcher of the
+    process. Concurrent refresh requests share one in-flight HarpRegulator
+    call, and every change is pushed to all subscribed clients, so several
+    windows never enumerate (and open) the same serial ports at once.
+    """
+
+    def __init__(
+        self,
+        device_manager: DeviceManager,
+        firmware_service: FirmwareService,
+        **watcher_options,
+    ):
+        """
+        Initialize inventory service
+
+        Args:
+            device_manager: Device manager holding the shared inventory
+            firmware_service: Firmware service used to find available updates
+            **watcher_options: Polling options passed to DeviceWatcher
+        """
+        self.device_manager = device_manager
+        self.firmware_service = firmware_service
+        self.watcher = DeviceWatcher(
+            device_manager,
+            on_change=self._on_hotplug,
+            is_paused=lambda: self.is_busy,
+            **watcher_options,
+        )
+
+        self._listeners: Dict[int, InventoryListener] = {}
+        self._hidden: Set[int] = set()
+        self._tokens = itertools.count(1)
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refresh_connects = False
+        # Upload target -> lock, shared by the DeployScheduler of every client
+        self.target_locks: Dict[str, asyncio.Lock] = {}
+        # Owner token of every active hold (None for anonymous holds)
+        self._holders: List[Optional[int]] = []
+
+    @property
+    def refreshing(self) -> bool:
+        return self._refresh_task is not None and not self._refresh_task.done()
+
+    @property
+    def is_busy(self) -> bool:
+        """True while a refresh or a firmware upload is in progress"""
+        return self.refreshing or bool(self._holders)
+
+    def subscribe(self, listener: InventoryListener) -> int:
+        """
+        Receive inventory changes
+
+        Args:
+            listener: Called (or awaited) after every refresh or hot-plug change
+
+        Returns:
+            Token for unsubscribe() and set_hidden()
+        """
+        token = next(self._tokens)
+        self._listeners[token] = listener
+        return token
+
+    def unsubscribe(self, token: int):
+        """Stop receiving changes; polling stops when the last client leaves"""
+        self._listeners.pop(token, None)
+        self._hidden.discard(token)
+        if not self._listeners:
+            self.watcher.stop()
+        else:
+            self._update_visibility()
+
+    def start_watching(self):
+        """Start hot-plug polling if it is not already running"""
+        self.watcher.start()
+
+    def set_hidden(self, token: int, hidden: bool):
+        """
+        Update a client's window visibility
+
+        Polling slows down only while every client is hidden.
+
+        Args:
+            token: Token returned by subscribe()
+            hidden: True while the client's window is hidden or minimized
+        """
+        if hidden:
+            self._hidden.add(token)
+        else:
+            self._hidden.discard(token)
+        self._update_visibility()
+
+    def _update_visibility(self):
+        self.watcher.set_hidden(
+            bool(self._listeners) and self._hidden >= set(self._listeners)
+        )
+
+    @contextmanager
+    def hold(self, owner: Optional[int] = None):
+        """
+        Pause hot-plug polling and other clients' connecting refreshes
+
+        Used during uploads. Refreshes requested by the owner itself may
+        still connect.
+
+        Args:
+            owner: Token returned by subscribe() of the client holding
+        """
+        self._holders.append(owner)
+        try:
+            yield
+        finally:
+            self._holders.remove(owner)
+
+    async def refresh(
+        self,
+        all_devices: bool = True,
+        allow_connect: bool = False,
+        owner: Optional[int] = None,
+    ) -> List[Device]:
+        """
+        Refresh the shared inventory and push it to every client
+
+        A request arriving while a refresh is running joins it, unless it
+        needs to connect and the running one does not; it then runs once the
+        current one finishes. A hot-plug poll that is already enumerating is
+        awaited first, so two list calls never overlap. While another client
+        holds the service for an upload, refreshes never connect to devices.
+
+        Args:
+            all_devices: Include all devices, even low-confidence ones
+            allow_connect: Allow connecting to devices for more information
+            owner: Token returned by subscribe() of the requesting client
+
+        Returns:
+            List of Device objects
+        """
+        if any(holder is None or holder != owner for holder in self._holders):
+            allow_connect = False
+
+        while True:
+            if self.refreshing:
+                task = self._refresh_task
+                if self._refresh_connects or not allow_connect:
+                    return await asyncio.shield(task)
+                try:
+                    await asyncio.shield(task)
+                except Exception:
+                    pass
+            elif self.watcher.polling:
+                # Never run a second HarpRegulator list next to a hot-plug poll
+                await self.watcher.wait_idle()
+            else:
+                break
+
+        self._refresh_connects = allow_connect
+        self._refresh_task = asyncio.create_task(
+            self._run_refresh(all_devices, allow_connect)
+        )
+        return await asyncio.shield(self._refresh_task)
+
+    async def _run_refresh(self, all_devices: bool, allow_connect: bool) -> List[Device]:
+        """Run one refresh and notify the clients"""
+        with INVENTORY_REFRESH_DURATION.time(allow_connect=str(allow_connect).lower()):
+            devices = await self.device_manager.refresh_devices_async(
+                all_devices, allow_connect
+            )
+            updates = await get_cli_executor().run(
+                self.firmware_service.get_available_updates, devices
+            )
+            self._set_available_updates(updates)
+        await self._notify(None)
+        return devices
+
+    async def _on_hotplug(self, event: HotplugEvent):
+        """Re-evaluate updates for the new device list and notify the clients"""
+        # New devices are checked against the already-scanned repository
+        self._set_available_updates(
+            self.firmware_service.get_available_updates(
+                self.device_manager.get_devices(), refresh_repository=False
+            )
+        )
+        await self._notify(event)
+
+    def _set_available_updates(self, updates):
+        self.device_manager.set_available_updates(
+            {key: entry.firmware_version for key, entry in updates.items()}
+        )
+        INVENTORY_DEVICES.set(len(self.device_manager.inventory.devices))
+
+    async def _notify(self, event: Optional[HotplugEvent]):
+        """Call every listener; a failing client does not affect the others"""
+        for token, listener in list(self._listeners.items()):
+            try:
+                result = listener(event)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                print(f"Error notifying inventory listener {token}: {e}")
+
+
+_shared_service: Optional[InventoryService] = None
+_shared_service_lock = threading.Lock()
+
+
+def get_inventory_service(cli_path: str = "HarpRegulator") -> InventoryService:
+    """
+    Get the process-wide inventory service, creating it on first use
+
+    Args:
+        cli_path: Path to HarpRegulator, used only when the service is created
+
+    Returns:
+        InventoryService
+    """
+    global _shared_service
+    with _shared_service_lock:
+        if _shared_service is None:
+            _shared_service = InventoryService(
+                DeviceManager(cli_path), FirmwareService(cli_path)
+            )
+        return _shared_service
@@ -0,0 +1,164 @@
+import json
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.utils.paths import get_data_dir
+
+
+class DeviceMetadataCache:
+    """On-disk cache of the last known good metadata of each device
+
+    Cheap (no-connect) enumerations often lack the description and versions
+    of a device. This cache remembers every non-empty value seen for a device,
+    keyed by serial number and USB source, and fills gaps in later results.
+    A USB source only names a hub port or cable, so another board plugged in
+    there must not inherit the previous board's identity: identity fields are
+    restored from serial number matches only.
+    """
+
+    # HarpRegulator list fields restored from the cache when missing
+    CACHED_FIELDS = (
+        "DeviceDescription",
+        "FirmwareVersion",
+        "HardwareVersion",
+        "WhoAmI",
+        "SerialNumber",
+    )
+    # Fields identifying a board (identity_key, batch-by-name, compatibility)
+    IDENTITY_FIELDS = ("DeviceDescription", "WhoAmI", "SerialNumber")
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize device metadata cache
+
+        Args:
+            path: JSON file used to persist the cache (default: app data directory)
+        """
+        self.path = path or get_data_dir() / "device_metadata.json"
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Dict[str, Any]]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Load persisted entries, ignoring unreadable files"""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+        return data if isinstance(data, dict) else {}
+
+    def _save(self):
+        """Persist entries to disk"""
+        try:
+            self.path.write_text(json.dumps(self._entries), encoding="utf-8")
+        except OSError as e:
+            print(f"Error saving device metadata cache: {e}")
+
+    @staticmethod
+    def _keys_for(
+        record: Dict[str, Any], ambiguous_sources: Optional[Set[str]] = None
+    ) -> List[str]:
+        """Get the cache keys of a list record, most specific first"""
+        keys = []
+        if record.get("SerialNumber") is not None:
+            keys.append(f"sn:{record['SerialNumber']}")
+        source = record.get("Source")
+        if source and source not in (ambiguous_sources or ()):
+            keys.append(f"src:{source}")
+        return keys
+
+    @staticmethod
+    def _ambiguous_sources(records: List[Dict[str, Any]]) -> Set[str]:
+        """Get sources shared by several records, which cannot identify a device"""
+        counts = Counter(record.get("Source") for record in records)
+        return {source for source, count in counts.items() if source and count > 1}
+
+    def remember(self, records: List[Dict[str, Any]]):
+        """
+        Store the metadata present in list records
+
+        Args:
+            records: Device dictionaries from the list command
+        """
+        now = time.time()
+        changed = False
+        ambiguous_sources = self._ambiguous_sources(records)
+
+        with self._lock:
+            for record in records:
+                fields = {
+                    name: {"value": record[name], "updated": now}
+                    for name in self.CACHED_FIELDS
+                    if record.get(name) is not None
+                }
+                for key in self._keys_for(record, ambiguous_sources):
+                    if fields:
+                        self._entries.setdefault(key, {}).update(fields)
+                        changed = True
+
+            if changed:
+                self._save()
+
+    def merge(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Fill missing metadata in list records from the cache
+
+        Args:
+            records: Device dictionaries from the list command
+
+        Returns:
+            New records; restored fields are listed in "cached_fields" with the
+            time they were last observed (seconds since the epoch). Records
+            matched by USB source only get descriptive fields (versions) back
+        """
+        merged = []
+        ambiguous_sources = self._ambiguous_sources(records)
+
+        with self._lock:
+            for record in records:
+                key = next(
+                    (
+                        key
+                        for key in self._keys_for(record, ambiguous_sources)
+                        if key in self._entries
+                    ),
+                    None,
+                )
+                if key is None:
+                    merged.append(record)
+                    continue
+
+                entry = self._entries[key]
+                names = self.CACHED_FIELDS
+                if not key.startswith("sn:"):
+                    names = [n for n in names if n not in self.IDENTITY_FIELDS]
+
+                record = dict(record)
+                cached_fields = {}
+                for name in names:
+                    if record.get(name) is None and name in entry:
+                        record[name] = entry[name]["value"]
+                        cached_fields[name] = entry[name]["updated"]
+
+                if cached_fields:
+                    record["cached_fields"] = cached_fields
+                merged.append(record)
+
+        return merged
+
+    def invalidate(self, device: Device):
+        """
+        Forget the cached metadata of a device, e.g. after a firmware upload
+
+        Args:
+            device: Device whose entries are removed
+        """
+        record = {"SerialNumber": device.serial_number, "Source": device.source}
+
+        with self._lock:
+            removed = [self._entries.pop(key, None) for key in self._keys_for(record)]
+            if any(entry is not None for entry in removed):
+                self._save()
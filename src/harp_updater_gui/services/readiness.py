@@ -0,0 +1,308 @@
+import json
+import math
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+from harp_updater_gui.services.cli_wrapper import CLIWrapper
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.utils.paths import get_data_dir
+
+
+PHASE_PORT_RELEASE = "port_release"
+PHASE_REBOOT = "reboot"
+
+
+def is_port_available(port_name: str) -> bool:
+    """
+    Check whether a serial port exists and can be opened right now
+
+    Args:
+        port_name: COM port name (e.g. "COM5") or device path (e.g. "/dev/ttyACM0")
+
+    Returns:
+        True if the port could be opened (and was closed again)
+    """
+    if sys.platform == "win32":
+        prefix = "\\\\.\\"
+        path = port_name if port_name.startswith(prefix) else prefix + port_name
+    else:
+        path = port_name if port_name.startswith("/") else f"/dev/{port_name}"
+
+    flags = os.O_RDWR | getattr(os, "O_NOCTTY", 0) | getattr(os, "O_NONBLOCK", 0)
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        return False
+
+    os.close(fd)
+    return True
+
+
+class ReadinessTimings:
+    """Per-kind readiness durations learned from past deploys"""
+
+    # Timeouts used until a device kind has history (seconds)
+    DEFAULT_TIMEOUTS = {
+        ("Pico", PHASE_PORT_RELEASE): 5.0,
+        ("ATxmega", PHASE_PORT_RELEASE): 5.0,
+        ("Pico", PHASE_REBOOT): 10.0,
+        ("ATxmega", PHASE_REBOOT): 6.0,
+    }
+    FALLBACK_TIMEOUT = 10.0
+    MIN_TIMEOUT = 1.0
+    MAX_TIMEOUT = 60.0
+    SAFETY_FACTOR = 1.5
+    SAFETY_MARGIN = 1.0
+    MAX_SAMPLES = 20
+    # Learned timeouts cover this fraction of past waits, so one outlier
+    # does not stretch them for the next MAX_SAMPLES deploys
+    PERCENTILE = 0.9
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize readiness timings
+
+        Args:
+            path: JSON file used to persist samples (default: app data directory)
+        """
+        self.path = path or get_data_dir() / "readiness_timings.json"
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = self._load()
+
+    def _load(self) -> Dict[str, List[float]]:
+        """Load persisted samples, ignoring unreadable files"""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(data, dict):
+            return {}
+
+        return {
+            key: [float(v) for v in values][-self.MAX_SAMPLES :]
+            for key, values in data.items()
+            if isinstance(values, list)
+        }
+
+    def _save(self):
+        """Persist samples to disk"""
+        try:
+            self.path.write_text(json.dumps(self._samples), encoding="utf-8")
+        except OSError as e:
+            print(f"Error saving readiness timings: {e}")
+
+    def timeout(self, kind: Optional[str], phase: str) -> float:
+        """
+        Get the timeout to use for a device kind and readiness phase
+
+        Args:
+            kind: Device kind (Pico, ATxmega, ...)
+            phase: PHASE_PORT_RELEASE or PHASE_REBOOT
+
+        Returns:
+            Timeout in seconds
+        """
+        with self._lock:
+            samples = self._samples.get(f"{kind}/{phase}")
+
+        if not samples:
+            return self.DEFAULT_TIMEOUTS.get((kind, phase), self.FALLBACK_TIMEOUT)
+
+        ordered = sorted(samples)
+        typical = ordered[max(0, math.ceil(self.PERCENTILE * len(ordered)) - 1)]
+        learned = typical * self.SAFETY_FACTOR + self.SAFETY_MARGIN
+        return min(self.MAX_TIMEOUT, max(self.MIN_TIMEOUT, learned))
+
+    def record(self, kind: Optional[str], phase: str, elapsed: float):
+        """
+        Record how long a successful readiness phase took
+
+        Timed-out waits are not recorded: their duration is the timeout
+        itself, and feeding it back would lengthen every following timeout.
+
+        Args:
+            kind: Device kind
+            phase: PHASE_PORT_RELEASE or PHASE_REBOOT
+            elapsed: Observed duration in seconds
+        """
+        with self._lock:
+            samples = self._samples.setdefault(f"{kind}/{phase}", [])
+            samples.append(round(elapsed, 3))
+            del samples[: -self.MAX_SAMPLES]
+            self._save()
+
+
+@dataclass
+class ReadinessResult:
+    """Outcome of waiting for a device to become ready"""
+
+    device: Device
+    ready: bool
+    elapsed: float
+
+
+class DeviceReadiness:
+    """Polls serial ports and device enumeration until devices are ready"""
+
+    def __init__(
+        self,
+        cli: CLIWrapper,
+        timings: Optional[ReadinessTimings] = None,
+        port_poll_interval: float = 0.1,
+        enumeration_poll_interval: float = 0.5,
+        min_reboot_delay: float = 2.0,
+    ):
+        """
+        Initialize device readiness detection
+
+        Args:
+            cli: CLI wrapper used for no-connect enumeration
+            timings: Learned per-kind timings (default: persisted in app data)
+            port_poll_interval: Seconds between serial port open attempts
+            enumeration_poll_interval: Seconds between enumeration polls
+            min_reboot_delay: Seconds after which a device that was never
+                seen rebooting is accepted as ready
+        """
+        self.cli = cli
+        self.timings = timings or ReadinessTimings()
+        self.port_poll_interval = port_poll_interval
+        self.enumeration_poll_interval = enumeration_poll_interval
+        self.min_reboot_delay = min_reboot_delay
+
+    def wait_for_port_release(
+        self, port_name: str, kind: Optional[str]
+    ) -> Tuple[bool, float]:
+        """
+        Wait until a serial port can be opened
+
+        Args:
+            port_name: Serial port of the device
+            kind: Device kind, used to select the learned timeout
+
+        Returns:
+            Tuple of (released: bool, elapsed seconds)
+        """
+        timeout = self.timings.timeout(kind, PHASE_PORT_RELEASE)
+        start = time.monotonic()
+
+        while True:
+            if is_port_available(port_name):
+                elapsed = time.monotonic() - start
+                self.timings.record(kind, PHASE_PORT_RELEASE, elapsed)
+                return True, elapsed
+
+            elapsed = time.monotonic() - start
+            if elapsed >= timeout:
+                return False, elapsed
+
+            time.sleep(self.port_poll_interval)
+
+    def wait_for_devices(
+        self, devices: List[Device], known_ports: Optional[Set[str]] = None
+    ) -> List[ReadinessResult]:
+        """
+        Wait until devices re-appear in enumeration after a reboot
+
+        A device is ready once it is enumerated outside of bootloader state and
+        its serial port (if any) can be opened. Devices without a port or serial
+        number (Pico bootloader) are matched to a newly enumerated device of the
+        same kind on a port not in known_ports.
+
+        Right after an upload a board may still be listed on its old port, so
+        a device only counts as ready after it was seen missing or in another
+        state at least once, or after min_reboot_delay. Only waits where the
+        reboot was observed are recorded as timings.
+
+        Args:
+            devices: Devices that were just flashed
+            known_ports: Ports occupied by other devices before the upload
+
+        Returns:
+            ReadinessResult per device, in input order
+        """
+        known_ports = set(known_ports or ())
+        timeouts = [self.timings.timeout(d.kind, PHASE_REBOOT) for d in devices]
+        elapsed: List[Optional[float]] = [None] * len(devices)
+        rebooted = [False] * len(devices)
+        claimed_ports: Dict[int, str] = {}
+        start = time.monotonic()
+
+        while True:
+            records = self.cli.list_devices(all_devices=True, allow_connect=False)
+            now = time.monotonic() - start
+
+            for idx, device in enumerate(devices):
+                if elapsed[idx] is not None:
+                    continue
+
+                excluded_ports = known_ports | {
+                    port for other, port in claimed_ports.items() if other != idx
+                }
+                record = self._find_record(device, records, excluded_ports)
+                if record is None or record.get("State") != device.state:
+                    rebooted[idx] = True
+                if record is None or record.get("State") == "Bootloader":
+                    continue
+                if not rebooted[idx] and now < self.min_reboot_delay:
+                    continue
+
+                port_name = record.get("PortName")
+                if port_name:
+                    claimed_ports[idx] = port_name
+                    if not is_port_available(port_name):
+                        continue
+
+                elapsed[idx] = now
+                if rebooted[idx]:
+                    self.timings.record(device.kind, PHASE_REBOOT, now)
+
+            pending = [
+                idx
+                for idx in range(len(devices))
+                if elapsed[idx] is None and now < timeouts[idx]
+            ]
+            if not pending:
+                break
+
+            time.sleep(self.enumeration_poll_interval)
+
+        results = []
+        for idx, device in enumerate(devices):
+            if elapsed[idx] is None:
+                waited = time.monotonic() - start
+                results.append(ReadinessResult(device, False, waited))
+            else:
+                results.append(ReadinessResult(device, True, elapsed[idx]))
+
+        return results
+
+    @staticmethod
+    def _find_record(
+        device: Device, records: List[Dict[str, Any]], excluded_ports: Set[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Find the enumeration record matching a flashed device"""
+        if device.serial_number:
+            for record in records:
+                if str(record.get("SerialNumber")) == device.serial_number:
+                    return record
+
+        if device.port_name:
+            for record in records:
+                if record.get("PortName") == device.port_name:
+                    return record
+            return None
+
+        for record in records:
+            if (
+                record.get("Kind") == device.kind
+                and record.get("State") == "Online"
+                and record.get("PortName") not in excluded_ports
+            ):
+                return record
+
+        return None
@@ -16,5 +16,42 @@ FILTER_HEALTHY = "Healthy"
 FILTER_NEEDS_UPDATE = "Needs update"
 FILTER_ERROR = "Error"
 
+# Maximum number of devices flashed at the same time during batch updates
+DEFAULT_DEPLOY_CONCURRENCY = 4
+
+# Worker threads reserved for blocking HarpRegulator calls
+DEFAULT_CLI_WORKERS = 4
+
+# Flash size of the largest ATxmega (application + boot section); .hex data
+# beyond this address cannot belong to a valid image
+ATXMEGA_MAX_FLASH_BYTES = 0x62000
+
+# Non-flash memories avr-gcc places in .hex files at fixed offsets: EEPROM,
+# fuses, lock bits, signature and user signature row ([start, end) addresses)
+ATXMEGA_MEMORY_SECTIONS = (
+    (0x810000, 0x820000),
+    (0x820000, 0x820010),
+    (0x830000, 0x830010),
+    (0x840000, 0x840010),
+    (0x850000, 0x850400),
+)
+
+# Base URL of the firmware release server (unset: downloads disabled)
+FIRMWARE_SERVER_ENV_VAR = "HARP_FIRMWARE_SERVER_URL"
+
+# Activity log: seconds between UI flushes, pending entries kept between
+# flushes, entries sent per flush and blocks kept in the log widget
+ACTIVITY_LOG_FLUSH_INTERVAL = 0.25
+ACTIVITY_LOG_BUFFER_SIZE = 1000
+ACTIVITY_LOG_MAX_ENTRIES_PER_FLUSH = 200
+ACTIVITY_LOG_MAX_LINES = 300
+
 LOGGING_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
 LOGGING_LEVEL = "INFO"
+
+# Persistent application data (caches, learned timings, journals)
+APP_DATA_DIR_NAME = "harp-updater-gui"
+DATA_DIR_ENV_VAR = "HARP_UPDATER_DATA_DIR"
+
+# Path to the HarpRegulator executable (unset: PATH, then the bundled copy)
+HARP_REGULATOR_ENV_VAR = "HARP_REGULATOR_PATH"
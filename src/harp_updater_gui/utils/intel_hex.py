@@ -0,0 +1,249 @@
+import hashlib
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+
+RECORD_DATA = 0x00
+RECORD_EOF = 0x01
+RECORD_EXTENDED_SEGMENT_ADDRESS = 0x02
+RECORD_START_SEGMENT_ADDRESS = 0x03
+RECORD_EXTENDED_LINEAR_ADDRESS = 0x04
+RECORD_START_LINEAR_ADDRESS = 0x05
+
+# Required payload length of each non-data record type
+_RECORD_LENGTHS = {
+    RECORD_EOF: 0,
+    RECORD_EXTENDED_SEGMENT_ADDRESS: 2,
+    RECORD_START_SEGMENT_ADDRESS: 4,
+    RECORD_EXTENDED_LINEAR_ADDRESS: 2,
+    RECORD_START_LINEAR_ADDRESS: 4,
+}
+
+# Value of unprogrammed flash, used to fill gaps when hashing the image
+ERASED_BYTE = 0xFF
+
+
+class IntelHexError(ValueError):
+    """Raised when an Intel HEX file is malformed"""
+
+
+@dataclass
+class IntelHexImage:
+    """Summary of a validated Intel HEX file"""
+
+    record_count: int
+    data_size: int
+    address_ranges: List[Tuple[int, int]] = field(default_factory=list)
+    sha256: str = ""
+    entry_point: Optional[int] = None
+    # Data beyond max_address in an allowed section (e.g. EEPROM, fuses)
+    section_ranges: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def start_address(self) -> Optional[int]:
+        return self.address_ranges[0][0] if self.address_ranges else None
+
+    @property
+    def end_address(self) -> Optional[int]:
+        return self.address_ranges[-1][1] if self.address_ranges else None
+
+    @property
+    def image_size(self) -> int:
+        """Size of the flattened image, gaps included"""
+        if not self.address_ranges:
+            return 0
+        return self.end_address - self.start_address
+
+
+class _RangeSet:
+    """Sorted, merged address ranges with overlap detection"""
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+
+    def add(self, start: int, end: int) -> bool:
+        """Add [start, end); returns False if it overlaps an existing range"""
+        idx = bisect_right(self.starts, start) - 1
+        if idx >= 0 and self.ends[idx] > start:
+            return False
+        if idx + 1 < len(self.starts) and self.starts[idx + 1] < end:
+            return False
+
+        if idx >= 0 and self.ends[idx] == start:
+            self.ends[idx] = end
+        else:
+            idx += 1
+            self.starts.insert(idx, start)
+            self.ends.insert(idx, end)
+
+        if idx + 1 < len(self.starts) and self.starts[idx + 1] == end:
+            self.ends[idx] = self.ends.pop(idx + 1)
+            self.starts.pop(idx + 1)
+        return True
+
+    def ranges(self) -> List[Tuple[int, int]]:
+        return list(zip(self.starts, self.ends))
+
+
+def parse_intel_hex_file(
+    path: str,
+    max_address: Optional[int] = None,
+    sections: Sequence[Tuple[int, int]] = (),
+) -> IntelHexImage:
+    """
+    Validate an Intel HEX file line by line
+
+    Args:
+        path: Path to the .hex file
+        max_address: Exclusive upper bound of flash addresses (default: none)
+        sections: [start, end) ranges beyond max_address that are also
+            valid, such as EEPROM and fuses
+
+    Returns:
+        IntelHexImage summary
+
+    Raises:
+        IntelHexError: If the file is not a valid Intel HEX image
+        OSError: If the file cannot be read
+    """
+    with open(path, "rb") as f:
+        return parse_intel_hex(f, max_address, sections)
+
+
+def parse_intel_hex(
+    lines: Iterable[bytes],
+    max_address: Optional[int] = None,
+    sections: Sequence[Tuple[int, int]] = (),
+) -> IntelHexImage:
+    """
+    Validate Intel HEX records and compute the flattened image layout and digest
+
+    Records are processed as they are read, so only the decoded data bytes
+    (never the file text) are held in memory. The digest is the SHA-256 of the
+    flattened image from its lowest to highest address, with gaps filled with
+    erased flash (0xFF), followed by the data of any sections.
+
+    Args:
+        lines: Lines of the file, e.g. a file opened in binary mode
+        max_address: Exclusive upper bound of flash addresses (default: none)
+        sections: [start, end) ranges beyond max_address that are also
+            valid, such as EEPROM and fuses; they are kept out of the
+            flattened image
+
+    Returns:
+        IntelHexImage summary
+
+    Raises:
+        IntelHexError: If a record is malformed, a checksum fails, data
+            overlaps or lies out of range, or the end-of-file record is missing
+    """
+    ranges = _RangeSet()
+    chunks: List[Tuple[int, bytes]] = []
+    section_ranges = _RangeSet()
+    section_chunks: List[Tuple[int, bytes]] = []
+    base = 0
+    entry_point = None
+    record_count = 0
+    data_size = 0
+    ended = False
+
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if ended:
+            raise IntelHexError(f"Line {line_no}: data after end-of-file record")
+        if line[:1] != b":":
+            raise IntelHexError(f"Line {line_no}: missing ':' start code")
+
+        try:
+            record = bytes.fromhex(line[1:].decode("ascii"))
+        except (UnicodeDecodeError, ValueError):
+            raise IntelHexError(f"Line {line_no}: invalid hexadecimal characters")
+
+        if len(record) < 5 or len(record) != record[0] + 5:
+            raise IntelHexError(f"Line {line_no}: record length mismatch")
+        if sum(record) & 0xFF:
+            raise IntelHexError(f"Line {line_no}: checksum mismatch")
+
+        record_count += 1
+        offset = (record[1] << 8) | record[2]
+        record_type = record[3]
+        payload = record[4:-1]
+
+        if record_type == RECORD_DATA:
+            start = base + offset
+            end = start + len(payload)
+            if max_address is not None and end > max_address:
+                if not any(low <= start and end <= high for low, high in sections):
+                    raise IntelHexError(
+                        f"Line {line_no}: address 0x{start:X} beyond 0x{max_address:X}"
+                    )
+                if payload and not section_ranges.add(start, end):
+                    raise IntelHexError(f"Line {line_no}: overlapping data at 0x{start:X}")
+                section_chunks.append((start, payload))
+                data_size += len(payload)
+                continue
+            if payload and not ranges.add(start, end):
+                raise IntelHexError(f"Line {line_no}: overlapping data at 0x{start:X}")
+            chunks.append((start, payload))
+            data_size += len(payload)
+            continue
+
+        if record_type not in _RECORD_LENGTHS:
+            raise IntelHexError(f"Line {line_no}: unknown record type {record_type:02X}")
+        if len(payload) != _RECORD_LENGTHS[record_type]:
+            raise IntelHexError(f"Line {line_no}: bad length for type {record_type:02X}")
+
+        value = int.from_bytes(payload, "big")
+        if record_type == RECORD_EOF:
+            ended = True
+        elif record_type == RECORD_EXTENDED_SEGMENT_ADDRESS:
+            base = value << 4
+        elif record_type == RECORD_EXTENDED_LINEAR_ADDRESS:
+            base = value << 16
+        elif record_type == RECORD_START_SEGMENT_ADDRESS:
+            entry_point = ((value >> 16) << 4) + (value & 0xFFFF)
+        else:
+            entry_point = value
+
+    if not ended:
+        raise IntelHexError("Missing end-of-file record (file truncated?)")
+
+    address_ranges = ranges.ranges()
+    return IntelHexImage(
+        record_count=record_count,
+        data_size=data_size,
+        address_ranges=address_ranges,
+        sha256=_image_digest(chunks, address_ranges, section_chunks),
+        entry_point=entry_point,
+        section_ranges=section_ranges.ranges(),
+    )
+
+
+def _image_digest(
+    chunks: List[Tuple[int, bytes]],
+    address_ranges: List[Tuple[int, int]],
+    section_chunks: Sequence[Tuple[int, bytes]] = (),
+) -> str:
+    """Hash the flattened image, filling gaps with erased flash, then the sections"""
+    digest = hashlib.sha256()
+    if address_ranges:
+        # Files are almost always in address order; avoid the sort when they are
+        if any(chunks[i][0] > chunks[i + 1][0] for i in range(len(chunks) - 1)):
+            chunks = sorted(chunks, key=lambda chunk: chunk[0])
+
+        position = address_ranges[0][0]
+        for start, payload in chunks:
+            if start > position:
+                digest.update(bytes([ERASED_BYTE]) * (start - position))
+            digest.update(payload)
+            position = start + len(payload)
+
+    # Sections are sparse and far apart, so each chunk is hashed with its address
+    for start, payload in sorted(section_chunks, key=lambda chunk: chunk[0]):
+        digest.update(start.to_bytes(4, "big") + payload)
+
+    return digest.hexdigest()
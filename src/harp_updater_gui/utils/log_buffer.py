@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, List, NamedTuple, Tuple, Union
+
+
+# A message, or a callable producing it only when the entry is displayed
+LazyMessage = Union[str, Callable[[], str]]
+
+
+class LogEntry(NamedTuple):
+    """A log message as recorded, before any formatting"""
+
+    timestamp: float
+    level: Any
+    message: LazyMessage
+
+    @property
+    def text(self) -> str:
+        """The message, evaluated if it was passed lazily"""
+        message = self.message
+        return message() if callable(message) else str(message)
+
+
+class LogBuffer:
+    """Bounded ring buffer of log entries waiting to be flushed to the UI
+
+    When more entries arrive between two flushes than the buffer holds, the
+    oldest are dropped and counted instead of growing without limit.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        Initialize log buffer
+
+        Args:
+            capacity: Maximum number of pending entries
+        """
+        self._entries: Deque[LogEntry] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def append(self, level: Any, message: LazyMessage, timestamp: float = None):
+        """
+        Record an entry without formatting it
+
+        Args:
+            level: Log level
+            message: Message text or zero-argument callable returning it
+            timestamp: Time of the event (default: now)
+        """
+        entry = LogEntry(time.time() if timestamp is None else timestamp, level, message)
+        with self._lock:
+            if len(self._entries) == self._entries.maxlen:
+                self._dropped += 1
+            self._entries.append(entry)
+
+    def drain(self, limit: int = 0) -> Tuple[List[LogEntry], int]:
+        """
+        Take pending entries out of the buffer, oldest first
+
+        Args:
+            limit: Maximum number of entries to take, 0 for all; the rest
+                stay for the next flush
+
+        Returns:
+            Tuple of (entries, number of entries dropped since the last drain)
+        """
+        with self._lock:
+            count = len(self._entries) if limit <= 0 else min(limit, len(self._entries))
+            entries = [self._entries.popleft() for _ in range(count)]
+            dropped, self._dropped = self._dropped, 0
+        return entries, dropped
+
+
+def fold_text(text: str, max_lines: int = 20, max_line_length: int = 300) -> str:
+    """
+    Shorten oversized output (e.g. a full CLI stderr) for display
+
+    Args:
+        text: Text to shorten
+        max_lines: Lines kept; the middle of longer text is folded into a marker
+        max_line_length: Characters kept per line
+
+    Returns:
+        Text with at most max_lines + 1 lines
+    """
+    lines = text.splitlines() or [""]
+    lines = [
+        line if len(line) <= max_line_length else line[:max_line_length] + "…"
+        for line in lines
+    ]
+    if len(lines) <= max_lines:
+        return "\n".join(lines)
+
+    head = (max_lines + 1) // 2
+    tail = max_lines - head
+    folded = len(lines) - head - tail
+    return "\n".join(
+        lines[:head] + [f"… {folded} lines folded …"] + (lines[-tail:] if tail else [])
+    )
@@ -0,0 +1,329 @@
+import asyncio
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Latency buckets (seconds) for CLI subprocesses and firmware uploads
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# Latency buckets (seconds) for in-process work such as rendering the table
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric(ABC):
+    """A named metric with one series per combination of label values"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> LabelKey:
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"{self.name} expects labels {self.label_names}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        """Render the metric in the Prometheus text format"""
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        return lines + self._render_samples()
+
+    @abstractmethod
+    def _render_samples(self) -> List[str]:
+        """Render the sample lines of every series"""
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        """Add a non-negative amount to the series selected by labels"""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Current value of a series (0 if never incremented)"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = SLOW_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per series: (count per bucket, sum, count)
+        self._series: Dict[LabelKey, List] = {}
+
+    def observe(self, value: float, **labels):
+        """Record one observation in the series selected by labels"""
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the wall-clock duration of the block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        """Number of observations in a series"""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[2] if series else 0
+
+    def sum(self, **labels) -> float:
+        """Sum of the observations in a series"""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[1] if series else 0.0
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(
+                (key, (list(s[0]), s[1], s[2])) for key, s in self._series.items()
+            )
+
+        names = self.label_names + ("le",)
+        lines = []
+        for key, (bucket_counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(names, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together for scraping"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = SLOW_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry served at /metrics
+REGISTRY = MetricsRegistry()
+
+CLI_COMMAND_DURATION = REGISTRY.histogram(
+    "harp_cli_command_duration_seconds",
+    "Duration of HarpRegulator invocations by subcommand and outcome",
+    labels=("command", "outcome"),
+)
+CLI_COMMANDS_IN_FLIGHT = REGISTRY.gauge(
+    "harp_cli_commands_in_flight",
+    "HarpRegulator subprocesses currently running",
+    labels=("command",),
+)
+CLI_OUTPUT_ERRORS = REGISTRY.counter(
+    "harp_cli_output_errors_total",
+    "HarpRegulator runs whose output could not be parsed",
+    labels=("command",),
+)
+INVENTORY_REFRESH_DURATION = REGISTRY.histogram(
+    "harp_inventory_refresh_duration_seconds",
+    "Duration of device refreshes, including the update check",
+    labels=("allow_connect",),
+)
+INVENTORY_DEVICES = REGISTRY.gauge(
+    "harp_inventory_devices",
+    "Devices in the current inventory",
+)
+TABLE_UPDATE_DURATION = REGISTRY.histogram(
+    "harp_device_table_update_duration_seconds",
+    "Duration of device table updates; unchanged updates skip rendering",
+    labels=("rendered",),
+    buckets=FAST_BUCKETS,
+)
+DEVICE_UPLOAD_DURATION = REGISTRY.histogram(
+    "harp_device_upload_duration_seconds",
+    "Duration of firmware uploads by device kind and outcome",
+    labels=("kind", "outcome"),
+)
+# Labelled by serial number only: port- or ordinal-based keys would leave a
+# stale series behind every time a device moves
+DEVICE_LAST_UPLOAD_DURATION = REGISTRY.gauge(
+    "harp_device_last_upload_duration_seconds",
+    "Duration of the most recent firmware upload per device serial number",
+    labels=("serial",),
+)
+DEVICE_LAST_UPLOAD_SUCCESS = REGISTRY.gauge(
+    "harp_device_last_upload_success",
+    "1 if the most recent firmware upload to the device succeeded, else 0",
+    labels=("serial",),
+)
+
+for _command in ("list", "inspect", "upload", "install-drivers"):
+    CLI_COMMANDS_IN_FLIGHT.set(0, command=_command)
+
+
+class CommandCall:
+    """Outcome of a tracked CLI command, set by the caller before the block ends"""
+
+    __slots__ = ("outcome",)
+
+    def __init__(self):
+        self.outcome = "success"
+
+
+@contextmanager
+def track_cli_command(command: str) -> Iterator[CommandCall]:
+    """
+    Count a HarpRegulator invocation as in flight and record its duration
+
+    The outcome is "success" unless the caller sets call.outcome (e.g. to
+    "failure" for a non-zero exit code); an exception records "cancelled"
+    or "error".
+
+    Args:
+        command: Subcommand name (e.g. "list")
+
+    Yields:
+        CommandCall whose outcome is recorded when the block exits
+    """
+    call = CommandCall()
+    CLI_COMMANDS_IN_FLIGHT.inc(command=command)
+    start = time.perf_counter()
+    try:
+        yield call
+    except asyncio.CancelledError:
+        call.outcome = "cancelled"
+        raise
+    except BaseException:
+        call.outcome = "error"
+        raise
+    finally:
+        CLI_COMMANDS_IN_FLIGHT.dec(command=command)
+        CLI_COMMAND_DURATION.observe(
+            time.perf_counter() - start, command=command, outcome=call.outcome
+        )
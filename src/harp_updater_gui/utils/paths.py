@@ -0,0 +1,63 @@
+import os
+import shutil
+import sys
+from pathlib import Path
+from harp_updater_gui.utils.constants import (
+    APP_DATA_DIR_NAME,
+    DATA_DIR_ENV_VAR,
+    HARP_REGULATOR_ENV_VAR,
+)
+
+
+def get_data_dir() -> Path:
+    """
+    Get the per-user directory for persistent application data
+
+    The location can be overridden with the HARP_UPDATER_DATA_DIR environment
+    variable; otherwise the platform's conventional application data folder is used.
+
+    Returns:
+        Existing directory path
+    """
+    override = os.environ.get(DATA_DIR_ENV_VAR)
+    if override:
+        data_dir = Path(override)
+    elif sys.platform == "win32":
+        local_app_data = os.environ.get("LOCALAPPDATA")
+        base = Path(local_app_data) if local_app_data else Path.home() / "AppData" / "Local"
+        data_dir = base / APP_DATA_DIR_NAME
+    elif sys.platform == "darwin":
+        data_dir = Path.home() / "Library" / "Application Support" / APP_DATA_DIR_NAME
+    else:
+        xdg_data_home = os.environ.get("XDG_DATA_HOME")
+        base = Path(xdg_data_home) if xdg_data_home else Path.home() / ".local" / "share"
+        data_dir = base / APP_DATA_DIR_NAME
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
+
+
+def get_harp_regulator_path() -> str:
+    """
+    Locate the HarpRegulator executable
+
+    The HARP_REGULATOR_PATH environment variable takes precedence, then
+    HarpRegulator on PATH, then the copy bundled with a frozen build or kept
+    in deps/ of a source checkout.
+
+    Returns:
+        Path to the executable (the bundled location even if it is missing)
+    """
+    override = os.environ.get(HARP_REGULATOR_ENV_VAR)
+    if override:
+        return override
+
+    found = shutil.which("HarpRegulator.exe") or shutil.which("HarpRegulator")
+    if found:
+        return found
+
+    if getattr(sys, "frozen", False):
+        base = Path(sys.executable).resolve().parent / "_internal"
+    else:
+        base = Path(__file__).resolve().parents[3] / "deps"
+    return str(base / "harp_regulator" / "win-x64" / "HarpRegulator.exe")
@@ -0,0 +1,59 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+
+Row = Dict[str, Any]
+
+
+@dataclass
+class RowDiff:
+    """Difference between two versions of a keyed row set"""
+
+    added: List[Row] = field(default_factory=list)
+    removed: List[Row] = field(default_factory=list)
+    changed: List[Row] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+
+def rows_fingerprint(rows: List[Row]) -> int:
+    """
+    Compute an order-sensitive hash of a row set
+
+    Args:
+        rows: Row dictionaries with hashable values
+
+    Returns:
+        Hash that changes whenever any row, or the row order, changes
+    """
+    return hash(tuple(tuple(sorted(row.items())) for row in rows))
+
+
+def diff_rows(old_rows: Dict[str, Row], new_rows: List[Row], key: str) -> RowDiff:
+    """
+    Compute added, removed and changed rows
+
+    Args:
+        old_rows: Current rows indexed by key
+        new_rows: New rows
+        key: Name of the field holding the stable row key
+
+    Returns:
+        RowDiff; changed rows are taken from new_rows
+    """
+    diff = RowDiff()
+    new_keys = set()
+
+    for row in new_rows:
+        row_key = row[key]
+        new_keys.add(row_key)
+        old_row = old_rows.get(row_key)
+        if old_row is None:
+            diff.added.append(row)
+        elif old_row != row:
+            diff.changed.append(row)
+
+    diff.removed = [row for row_key, row in old_rows.items() if row_key not in new_keys]
+    return diff
@@ -0,0 +1,80 @@
+from typing import Dict, FrozenSet, List, Sequence, Set
+
+
+# Joins the fields of a text; it cannot be typed in a search box, so no query
+# matches across two fields
+FIELD_SEPARATOR = "\x00"
+
+
+class SubstringIndex:
+    """Case-insensitive substring search over a fixed list of texts
+
+    Every substring of up to GRAM_SIZE characters maps to the positions of
+    the texts containing it. Queries up to that length are a single lookup;
+    longer queries intersect the sets of their grams and confirm the few
+    remaining candidates with a plain substring check. Results are exactly
+    those of `query in text`.
+    """
+
+    GRAM_SIZE = 3
+
+    def __init__(self, texts: Sequence[str]):
+        """
+        Build the index
+
+        Args:
+            texts: Texts to search; results refer to positions in this sequence
+        """
+        self._texts = [text.lower() for text in texts]
+        grams: Dict[str, Set[int]] = {}
+        for position, text in enumerate(self._texts):
+            for gram in self._grams_of(text):
+                grams.setdefault(gram, set()).add(position)
+        self._grams: Dict[str, FrozenSet[int]] = {
+            gram: frozenset(positions) for gram, positions in grams.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def _grams_of(self, text: str) -> Set[str]:
+        size = self.GRAM_SIZE
+        return {
+            text[start : start + n]
+            for n in range(1, size + 1)
+            for start in range(len(text) - n + 1)
+        }
+
+    def search(self, query: str) -> List[int]:
+        """
+        Find the texts containing a query
+
+        Args:
+            query: Text to look for (case-insensitive); empty matches everything
+
+        Returns:
+            Positions of matching texts, in ascending order
+        """
+        query = query.strip().lower()
+        if not query:
+            return list(range(len(self._texts)))
+
+        size = self.GRAM_SIZE
+        if len(query) <= size:
+            return sorted(self._grams.get(query, ()))
+
+        candidate_sets = []
+        for start in range(len(query) - size + 1):
+            positions = self._grams.get(query[start : start + size])
+            if not positions:
+                return []
+            candidate_sets.append(positions)
+
+        candidate_sets.sort(key=len)
+        candidates = set(candidate_sets[0])
+        for positions in candidate_sets[1:]:
+            candidates &= positions
+            if not candidates:
+                return []
+
+        return sorted(p for p in candidates if query in self._texts[p])
@@ -0,0 +1,390 @@
+import mmap
+import struct
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+
+UF2_BLOCK_SIZE = 512
+UF2_DATA_SIZE = 476
+UF2_MAGIC_START0 = 0x0A324655
+UF2_MAGIC_START1 = 0x9E5D5157
+UF2_MAGIC_END = 0x0AB16F30
+
+UF2_FLAG_NOT_MAIN_FLASH = 0x00000001
+UF2_FLAG_FILE_CONTAINER = 0x00001000
+UF2_FLAG_FAMILY_ID_PRESENT = 0x00002000
+UF2_FLAG_MD5_PRESENT = 0x00004000
+UF2_FLAG_EXTENSION_TAGS = 0x00008000
+
+# Block header, payload skipped so iterating the file copies no data
+_BLOCK = struct.Struct("<8I476xI")
+_U32 = struct.Struct("<I")
+
+# Family ID -> (name, writable address ranges)
+RP_FAMILIES: Dict[int, Tuple[str, Tuple[Tuple[int, int], ...]]] = {
+    0xE48BFF56: ("RP2040", ((0x10000000, 0x11000000), (0x20000000, 0x20042000))),
+    0xE48BFF57: ("ABSOLUTE", ((0x10000000, 0x14000000),)),
+    0xE48BFF58: ("DATA", ((0x10000000, 0x14000000),)),
+    0xE48BFF59: ("RP2350-ARM-S", ((0x10000000, 0x14000000), (0x20000000, 0x20082000))),
+    0xE48BFF5A: ("RP2350-RISCV", ((0x10000000, 0x14000000), (0x20000000, 0x20082000))),
+    0xE48BFF5B: ("RP2350-ARM-NS", ((0x10000000, 0x14000000), (0x20000000, 0x20082000))),
+}
+
+# UF2 extension tags carrying metadata
+_EXTENSION_TAGS = {
+    0x9FC7BC: "uf2_version",
+    0x650D9D: "uf2_description",
+    0x0BE9F7: "uf2_page_size",
+    0xB46DB0: "uf2_sha2",
+    0xC8A729: "uf2_device_id",
+}
+_INT_EXTENSION_TAGS = {0x0BE9F7, 0xC8A729}
+
+# Pico SDK binary info (picotool "info") embedded in the program image
+BINARY_INFO_MARKER_START = 0x7188EBF2
+BINARY_INFO_MARKER_END = 0xE71AA390
+BINARY_INFO_TYPE_ID_AND_INT = 5
+BINARY_INFO_TYPE_ID_AND_STRING = 6
+BINARY_INFO_TAG_RASPBERRY_PI = ord("R") | (ord("P") << 8)
+_BINARY_INFO_IDS = {
+    0x02031C86: "program_name",
+    0x11A9BC3A: "program_version",
+    0x9DA22254: "program_build_date",
+    0x68F465DE: "binary_end",
+    0x1856239A: "program_url",
+    0xB6A07C19: "program_description",
+    0x5360B3AB: "sdk_version",
+    0xB63CFFBB: "pico_board",
+    0x7F8882E1: "boot2_name",
+}
+
+# Search window for the binary info header from the start of the image
+_BINARY_INFO_SEARCH_BYTES = 0x400
+_BINARY_INFO_MAX_ENTRIES = 1024
+_BINARY_INFO_MAX_STRING = 256
+
+
+class UF2Error(ValueError):
+    """Raised when a UF2 file is malformed"""
+
+
+@dataclass
+class UF2Image:
+    """Summary of a validated UF2 file"""
+
+    block_count: int
+    payload_size: int
+    family_ids: List[int] = field(default_factory=list)
+    address_ranges: List[Tuple[int, int]] = field(default_factory=list)
+    metadata: Dict[str, Union[str, int]] = field(default_factory=dict)
+
+    @property
+    def family_names(self) -> List[str]:
+        return [
+            RP_FAMILIES[family_id][0] if family_id in RP_FAMILIES else f"0x{family_id:08x}"
+            for family_id in self.family_ids
+        ]
+
+    @property
+    def start_address(self) -> Optional[int]:
+        return self.address_ranges[0][0] if self.address_ranges else None
+
+
+def parse_uf2_file(path: str, allowed_families: Optional[List[int]] = None) -> UF2Image:
+    """
+    Validate a UF2 file and extract its metadata without copying its contents
+
+    Args:
+        path: Path to the UF2 file
+        allowed_families: Family IDs accepted (default: any)
+
+    Returns:
+        UF2Image summary
+
+    Raises:
+        UF2Error: If the file is not a valid UF2 image
+        OSError: If the file cannot be read
+    """
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise UF2Error("File is empty")
+
+        with mapped:
+            view = memoryview(mapped)
+            try:
+                return parse_uf2(view, allowed_families)
+            finally:
+                view.release()
+
+
+def parse_uf2(
+    data: Union[bytes, memoryview], allowed_families: Optional[List[int]] = None
+) -> UF2Image:
+    """
+    Validate UF2 data and extract its metadata
+
+    Checks block magic numbers, payload sizes, block numbering per family,
+    family IDs, target address ranges and overlapping writes.
+
+    Args:
+        data: UF2 file contents
+        allowed_families: Family IDs accepted (default: any)
+
+    Returns:
+        UF2Image summary
+
+    Raises:
+        UF2Error: If the data is not a valid UF2 image
+    """
+    if len(data) == 0:
+        raise UF2Error("File is empty")
+    if len(data) % UF2_BLOCK_SIZE:
+        raise UF2Error(
+            f"File size {len(data)} is not a multiple of {UF2_BLOCK_SIZE} bytes"
+        )
+
+    # Per family: expected block count and block numbers seen
+    block_totals: Dict[Optional[int], int] = {}
+    block_numbers: Dict[Optional[int], set] = {}
+    # (target address, payload size, offset of payload in data) of flash blocks
+    writes: List[Tuple[int, int, int]] = []
+    metadata: Dict[str, Union[str, int]] = {}
+    payload_size = 0
+
+    for index, block in enumerate(_BLOCK.iter_unpack(data)):
+        (
+            magic0,
+            magic1,
+            flags,
+            target_addr,
+            size,
+            block_no,
+            num_blocks,
+            family_or_size,
+            magic_end,
+        ) = block
+
+        if (
+            magic0 != UF2_MAGIC_START0
+            or magic1 != UF2_MAGIC_START1
+            or magic_end != UF2_MAGIC_END
+        ):
+            raise UF2Error(f"Block {index}: bad magic number")
+        if size == 0 or size > UF2_DATA_SIZE:
+            raise UF2Error(f"Block {index}: invalid payload size {size}")
+        if num_blocks == 0 or block_no >= num_blocks:
+            raise UF2Error(f"Block {index}: block number {block_no} of {num_blocks}")
+
+        family_id = family_or_size if flags & UF2_FLAG_FAMILY_ID_PRESENT else None
+        if family_id is not None and allowed_families is not None:
+            if family_id not in allowed_families:
+                raise UF2Error(f"Block {index}: unsupported family ID 0x{family_id:08x}")
+
+        expected_total = block_totals.setdefault(family_id, num_blocks)
+        if num_blocks != expected_total:
+            raise UF2Error(
+                f"Block {index}: block count {num_blocks} differs from {expected_total}"
+            )
+        seen = block_numbers.setdefault(family_id, set())
+        if block_no in seen:
+            raise UF2Error(f"Block {index}: duplicate block number {block_no}")
+        seen.add(block_no)
+
+        if flags & UF2_FLAG_EXTENSION_TAGS:
+            _read_extension_tags(data, index * UF2_BLOCK_SIZE, size, metadata)
+
+        if flags & (UF2_FLAG_NOT_MAIN_FLASH | UF2_FLAG_FILE_CONTAINER):
+            continue
+
+        if family_id in RP_FAMILIES:
+            ranges = RP_FAMILIES[family_id][1]
+            if not any(
+                start <= target_addr and target_addr + size <= end
+                for start, end in ranges
+            ):
+                raise UF2Error(
+                    f"Block {index}: address 0x{target_addr:08x} outside "
+                    f"{RP_FAMILIES[family_id][0]} memory"
+                )
+
+        writes.append((target_addr, size, index * UF2_BLOCK_SIZE + 32))
+        payload_size += size
+
+    for family_id, total in block_totals.items():
+        if len(block_numbers[family_id]) != total:
+            missing = total - len(block_numbers[family_id])
+            raise UF2Error(f"{missing} of {total} blocks missing")
+
+    writes.sort()
+    address_ranges: List[Tuple[int, int]] = []
+    for target_addr, size, _ in writes:
+        if address_ranges and target_addr < address_ranges[-1][1]:
+            raise UF2Error(f"Overlapping write at 0x{target_addr:08x}")
+        if address_ranges and target_addr == address_ranges[-1][1]:
+            address_ranges[-1] = (address_ranges[-1][0], target_addr + size)
+        else:
+            address_ranges.append((target_addr, target_addr + size))
+
+    metadata.update(_read_binary_info(data, writes))
+
+    return UF2Image(
+        block_count=len(data) // UF2_BLOCK_SIZE,
+        payload_size=payload_size,
+        family_ids=[family_id for family_id in block_totals if family_id is not None],
+        address_ranges=address_ranges,
+        metadata=metadata,
+    )
+
+
+def _read_extension_tags(
+    data: Union[bytes, memoryview],
+    block_offset: int,
+    payload_size: int,
+    metadata: Dict[str, Union[str, int]],
+):
+    """Read UF2 extension tags stored after the payload of a block"""
+    position = block_offset + 32 + ((payload_size + 3) & ~3)
+    end = block_offset + 32 + UF2_DATA_SIZE
+
+    while position + 4 <= end:
+        (header,) = _U32.unpack_from(data, position)
+        tag_size = header & 0xFF
+        tag_type = header >> 8
+        if tag_size < 4 or position + tag_size > end:
+            break
+
+        name = _EXTENSION_TAGS.get(tag_type)
+        if name and name not in metadata:
+            value = bytes(data[position + 4 : position + tag_size])
+            if tag_type in _INT_EXTENSION_TAGS:
+                metadata[name] = int.from_bytes(value[:4], "little")
+            elif name == "uf2_sha2":
+                metadata[name] = value.hex()
+            else:
+                metadata[name] = value.rstrip(b"\0").decode("utf-8", "replace")
+
+        position += (tag_size + 3) & ~3
+
+
+class _ImageReader:
+    """Random access to the flashed image described by sorted UF2 writes"""
+
+    def __init__(self, data: Union[bytes, memoryview], writes: List[Tuple[int, int, int]]):
+        self.data = data
+        self.writes = writes
+        self.starts = [target_addr for target_addr, _, _ in writes]
+        self.mapping: List[Tuple[int, int, int]] = []
+
+    def read(self, address: int, length: int) -> bytes:
+        """Read bytes at an image address; raises KeyError if unmapped"""
+        address = self._translate(address)
+        chunks = []
+        while length > 0:
+            idx = bisect_right(self.starts, address) - 1
+            if idx < 0:
+                raise KeyError(address)
+            target_addr, size, offset = self.writes[idx]
+            if address >= target_addr + size:
+                raise KeyError(address)
+            count = min(length, target_addr + size - address)
+            start = offset + address - target_addr
+            chunks.append(bytes(self.data[start : start + count]))
+            address += count
+            length -= count
+        return b"".join(chunks)
+
+    def u32(self, address: int) -> int:
+        return _U32.unpack(self.read(address, 4))[0]
+
+    def string(self, address: int) -> str:
+        """Read a NUL-terminated string"""
+        chars = bytearray()
+        while len(chars) < _BINARY_INFO_MAX_STRING:
+            byte = self.read(address + len(chars), 1)
+            if byte == b"\0":
+                break
+            chars += byte
+        return chars.decode("utf-8", "replace")
+
+    def _translate(self, address: int) -> int:
+        """Map a RAM address copied from flash at boot back to its flash address"""
+        for source, dest_start, dest_end in self.mapping:
+            if dest_start <= address < dest_end:
+                return source + address - dest_start
+        return address
+
+
+def _read_binary_info(
+    data: Union[bytes, memoryview], writes: List[Tuple[int, int, int]]
+) -> Dict[str, Union[str, int]]:
+    """Extract Pico SDK binary info entries; best effort, never raises"""
+    if not writes:
+        return {}
+
+    reader = _ImageReader(data, writes)
+    base = writes[0][0]
+    metadata: Dict[str, Union[str, int]] = {}
+
+    try:
+        header = None
+        for address in range(base, base + _BINARY_INFO_SEARCH_BYTES, 4):
+            try:
+                if (
+                    reader.u32(address) == BINARY_INFO_MARKER_START
+                    and reader.u32(address + 16) == BINARY_INFO_MARKER_END
+                ):
+                    header = address
+                    break
+            except KeyError:
+                break
+        if header is None:
+            return {}
+
+        entries_start = reader.u32(header + 4)
+        entries_end = reader.u32(header + 8)
+        mapping_table = reader.u32(header + 12)
+
+        address = mapping_table
+        while len(reader.mapping) < 16:
+            source = reader.u32(address)
+            if source == 0:
+                break
+            reader.mapping.append(
+                (source, reader.u32(address + 4), reader.u32(address + 8))
+            )
+            address += 12
+
+        count = min((entries_end - entries_start) // 4, _BINARY_INFO_MAX_ENTRIES)
+        for idx in range(max(count, 0)):
+            try:
+                entry = reader.u32(entries_start + 4 * idx)
+                core = reader.u32(entry)
+                entry_type, tag = core & 0xFFFF, core >> 16
+                if entry_type not in (
+                    BINARY_INFO_TYPE_ID_AND_INT,
+                    BINARY_INFO_TYPE_ID_AND_STRING,
+                ):
+                    continue
+
+                entry_id = reader.u32(entry + 4)
+                if tag == BINARY_INFO_TAG_RASPBERRY_PI:
+                    name = _BINARY_INFO_IDS.get(entry_id)
+                    if name is None:
+                        continue
+                else:
+                    # Custom tags, e.g. firmware-specific version records
+                    name = f"{tag:04x}:{entry_id:08x}"
+
+                if entry_type == BINARY_INFO_TYPE_ID_AND_INT:
+                    metadata.setdefault(name, reader.u32(entry + 8))
+                else:
+                    metadata.setdefault(name, reader.string(reader.u32(entry + 8)))
+            except KeyError:
+                continue
+    except KeyError:
+        pass
+
+    return metadata
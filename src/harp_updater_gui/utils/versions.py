@@ -0,0 +1,43 @@
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+# Sort key: (major, minor, patch, is_release, prerelease identifiers)
+VersionKey = Tuple[int, int, int, int, Tuple[Tuple[int, object], ...]]
+
+_VERSION_RE = re.compile(
+    r"^\s*(?:fw|v)?[-_]?v?(\d+)\.(\d+)(?:\.(\d+))?"
+    r"(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?\s*$",
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=4096)
+def parse_version(text: Optional[str]) -> Optional[VersionKey]:
+    """
+    Parse a semantic version into a sortable key
+
+    Accepts "1.2.3", "v1.2.3", "fw1.2", "1.2.3-rc.1+build"; pre-releases sort
+    before their release as in Semantic Versioning.
+
+    Args:
+        text: Version string
+
+    Returns:
+        Comparable version key, or None if the text is not a version
+    """
+    if not text:
+        return None
+
+    match = _VERSION_RE.match(str(text))
+    if not match:
+        return None
+
+    major, minor, patch, prerelease = match.groups()
+    identifiers = tuple(
+        (0, int(part)) if part.isdigit() else (1, part)
+        for part in (prerelease or "").split(".")
+        if part
+    )
+    return (int(major), int(minor), int(patch or 0), 0 if identifiers else 1, identifiers)
@@ -0,0 +1,10 @@
+import pytest
+from harp_updater_gui.utils.constants import DATA_DIR_ENV_VAR
+
+
+@pytest.fixture(autouse=True)
+def isolated_data_dir(tmp_path, monkeypatch):
+    """Keep persistent application data out of the user's data directory"""
+    data_dir = tmp_path / "app_data"
+    monkeypatch.setenv(DATA_DIR_ENV_VAR, str(data_dir))
+    return data_dir
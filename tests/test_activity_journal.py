@@ -0,0 +1,109 @@
+import json
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.services.activity_journal import ActivityJournal
+
+
+def make_device(port="COM5"):
+    return Device(
+        Confidence="High",
+        Kind="Pico",
+        State="Online",
+        PortName=port,
+        DeviceDescription="Behavior",
+        SerialNumber=1234,
+    )
+
+
+def test_record_writes_structured_lines(tmp_path):
+    """Test entries carry device identity and extra fields"""
+    journal = ActivityJournal(tmp_path)
+    journal.record("success", "Uploaded", device=make_device(), duration=3.5, firmware_sha256="ab" * 32)
+    journal.record("debug", lambda: "built lazily")
+    journal.close()
+
+    lines = [json.loads(line) for line in journal.path.read_text().splitlines()]
+    assert [e["seq"] for e in lines] == [1, 2]
+    assert lines[0]["device"]["key"] == "sn:1234"
+    assert lines[0]["device"]["port"] == "COM5"
+    assert lines[0]["duration"] == 3.5
+    assert lines[0]["firmware_sha256"] == "ab" * 32
+    assert lines[1]["message"] == "built lazily"
+    assert "device" not in lines[1]
+
+
+def test_rotation_keeps_backups(tmp_path):
+    """Test that files rotate at max_bytes and the oldest are dropped"""
+    journal = ActivityJournal(tmp_path, max_bytes=200, backup_count=2)
+    for i in range(30):
+        journal.record("info", f"message {i:02d} " + "x" * 40)
+        journal.flush()
+    journal.close()
+
+    names = [path.name for path in journal.files()]
+    assert "activity.1.jsonl" in names and "activity.2.jsonl" in names
+    assert "activity.3.jsonl" not in names
+    assert all(path.stat().st_size < 400 for path in journal.files())
+    # Newest entries survive rotation, the oldest are gone
+    seqs = [entry["seq"] for entry in journal.page(limit=100)[0]]
+    assert seqs[0] == 30
+    assert 1 not in seqs
+
+
+def test_page_reads_newest_first_across_files(tmp_path):
+    """Test lazy paging backwards through rotated files"""
+    journal = ActivityJournal(tmp_path, max_bytes=300, backup_count=20)
+    for i in range(50):
+        journal.record("info", f"message {i}")
+    journal.close()
+
+    first, cursor = journal.page(limit=10)
+    assert [e["message"] for e in first] == [f"message {i}" for i in range(49, 39, -1)]
+
+    older, cursor = journal.page(cursor, limit=45)
+    assert [e["seq"] for e in older] == list(range(40, 0, -1))
+    assert journal.page(cursor) == ([], cursor)
+
+
+def test_page_cursor_survives_rotation(tmp_path):
+    """Test that paging continues where it stopped after files were rotated"""
+    journal = ActivityJournal(tmp_path, max_bytes=300, backup_count=20)
+    for i in range(20):
+        journal.record("info", f"message {i}")
+    journal.flush()
+
+    first, cursor = journal.page(limit=5)
+    for i in range(20, 30):
+        journal.record("info", f"message {i}")
+    journal.close()
+
+    older, _ = journal.page(cursor, limit=100)
+    assert [e["seq"] for e in first + older] == list(range(20, 0, -1))
+
+
+def test_page_search(tmp_path):
+    """Test searching messages and device fields"""
+    journal = ActivityJournal(tmp_path)
+    journal.record("info", "Starting upload", device=make_device("COM7"))
+    journal.record("error", "Upload failed: timeout")
+    journal.record("info", "Ready")
+    journal.close()
+
+    assert [e["message"] for e in journal.page(query="UPLOAD")[0]] == [
+        "Upload failed: timeout",
+        "Starting upload",
+    ]
+    assert [e["message"] for e in journal.page(query="com7")[0]] == ["Starting upload"]
+    assert journal.page(query="seq")[0] == []
+
+
+def test_sequence_continues_after_restart(tmp_path):
+    """Test that a new journal continues numbering from the file"""
+    journal = ActivityJournal(tmp_path)
+    journal.record("info", "one")
+    journal.close()
+
+    journal = ActivityJournal(tmp_path)
+    journal.record("info", "two")
+    journal.close()
+
+    assert [e["seq"] for e in journal.page()[0]] == [2, 1]
@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+from harp_updater_gui.models.device import parse_device_list
+from harp_updater_gui.models.inventory import DeviceInventory
+from harp_updater_gui.services.cli_wrapper import CLIWrapper
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from fake_harp_regulator import create_launcher, simulated_devices  # noqa: E402
+from run_benchmarks import format_results, run_suite  # noqa: E402
+
+
+def test_simulated_devices_have_unique_identities():
+    """Test that the simulated device list parses into distinct devices"""
+    devices, errors = parse_device_list(simulated_devices(50))
+    inventory = DeviceInventory.build(1, devices)
+
+    assert errors == []
+    assert len(inventory.by_key) == 50
+    assert len(inventory.by_state["Bootloader"]) == 2
+
+
+def test_fake_cli_through_wrapper(tmp_path):
+    """Test CLIWrapper against the simulated executable"""
+    firmware = tmp_path / "firmware.uf2"
+    firmware.write_bytes(b"\0" * 512)
+    cli = CLIWrapper(str(create_launcher(tmp_path / "cli", devices=5, failure_rate=1)))
+
+    listed = cli.list_devices(all_devices=True, allow_connect=False)
+    assert len(listed) == 5
+    assert cli.inspect_firmware(str(firmware))["DeviceDescription"] == "Behavior"
+
+    updates = []
+    success, output = cli.upload_firmware(
+        str(firmware), "COM3", on_progress=updates.append
+    )
+    assert success is False
+    assert "failed" in output
+    assert updates and updates[-1].percent < 100
+
+
+def test_suite_runs_at_small_sizes(tmp_path):
+    """Test that every benchmark produces timings"""
+    results = run_suite(sizes=(1, 3), repeat=2, upload_delay=0.01, work_dir=tmp_path)
+
+    names = {r.name for r in results}
+    assert "filter_devices" in names
+    assert "update_table rows" in names
+    assert any(name.startswith("batch deploy") for name in names)
+    assert all(r.runs and r.throughput > 0 for r in results)
+
+    deploy = [r for r in results if r.name.startswith("batch deploy") and r.devices == 3]
+    assert deploy[0].notes == "0/3 failed"
+    assert "refresh_devices" in format_results(results)
@@ -0,0 +1,125 @@
+import io
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from harp_updater_gui.cli import main, select_devices
+from harp_updater_gui.models.device import parse_device_list
+from harp_updater_gui.models.inventory import DeviceInventory
+from harp_updater_gui.utils.paths import get_harp_regulator_path
+from tests.test_uf2 import make_uf2
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from fake_harp_regulator import create_launcher, simulated_devices  # noqa: E402
+
+
+@pytest.fixture
+def firmware(tmp_path):
+    """A valid RP2040 UF2 file (the fake inspect reports it as Behavior firmware)"""
+    path = tmp_path / "behavior.uf2"
+    path.write_bytes(make_uf2(bytes(1024)))
+    return str(path)
+
+
+def regulator(tmp_path, **options) -> str:
+    return str(create_launcher(tmp_path / "cli", devices=12, upload_delay=0.01, **options))
+
+
+def run_json(capsys, argv):
+    """Run the command line and parse its JSON output"""
+    code = main(argv + ["--json"])
+    return code, json.loads(capsys.readouterr().out)
+
+
+def test_startup_does_not_import_ui_or_models():
+    """Test that parsing arguments loads neither NiceGUI nor pydantic"""
+    src = str(Path(__file__).resolve().parents[1] / "src")
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([src, os.environ.get("PYTHONPATH", "")])}
+    script = (
+        "import sys\n"
+        "from harp_updater_gui.cli import build_parser\n"
+        "build_parser().parse_args(['list'])\n"
+        "print(sorted({m.split('.')[0] for m in sys.modules}"
+        " & {'nicegui', 'webview', 'fastapi', 'pydantic'}))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, env=env, check=True
+    ).stdout
+    assert output.strip() == "[]"
+
+
+def test_select_devices():
+    """Test selecting devices by port, serial number and name"""
+    devices, _ = parse_device_list(simulated_devices(12))
+    inventory = DeviceInventory.build(1, devices)
+
+    selected, unmatched = select_devices(inventory, ["COM4", "1008", "Behavior", "COM99"])
+
+    assert [s.device.port_name for s in selected] == ["COM3", "COM4", "COM9", "COM11"]
+    assert unmatched == ["COM99"]
+    assert len(select_devices(inventory, [])[0]) == 12
+
+
+def test_list_json(tmp_path, capsys):
+    """Test listing devices from the CLI"""
+    code, records = run_json(capsys, ["list", "--regulator", regulator(tmp_path)])
+
+    assert code == 0
+    assert len(records) == 12
+    assert records[0]["name"] == "Behavior"
+    assert records[0]["port"] == "COM3"
+
+
+def test_plan_skips_incompatible_devices(tmp_path, capsys, firmware):
+    """Test that plan selects only devices the firmware was built for"""
+    code, plan = run_json(capsys, ["plan", firmware, "--regulator", regulator(tmp_path)])
+
+    assert code == 0
+    assert [d["port"] for d in plan["flash"]] == ["COM3", "COM9"]
+    reasons = {d["port"]: d["reason"] for d in plan["skip"]}
+    assert "WhoAmI" in reasons["COM4"]
+    assert ".hex" in reasons["COM6"]
+
+
+def test_plan_usage_errors(tmp_path, capsys, firmware):
+    """Test unknown selectors and missing files"""
+    cli_path = regulator(tmp_path)
+    assert main(["plan", firmware, "-d", "COM99", "--regulator", cli_path]) == 2
+    assert main(["plan", str(tmp_path / "missing.uf2"), "--regulator", cli_path]) == 2
+    assert "COM99" in capsys.readouterr().err
+
+
+def test_deploy(tmp_path, capsys, firmware):
+    """Test deploying in parallel and reporting results"""
+    argv = ["deploy", firmware, "--regulator", regulator(tmp_path), "-y", "--no-wait", "-j", "4"]
+    code, result = run_json(capsys, argv)
+
+    assert code == 0
+    assert result["succeeded"] == 2
+    assert all(r["success"] for r in result["results"])
+    assert len(result["skipped"]) == 10
+
+
+def test_deploy_failures_and_confirmation(tmp_path, capsys, firmware, monkeypatch):
+    """Test the exit code on failed uploads and the confirmation requirement"""
+    cli_path = regulator(tmp_path, failure_rate=1)
+
+    monkeypatch.setattr(sys, "stdin", io.StringIO(""))
+    assert main(["deploy", firmware, "--regulator", cli_path, "--no-wait"]) == 2
+    capsys.readouterr()
+
+    code, result = run_json(
+        capsys, ["deploy", firmware, "-d", "COM3", "--regulator", cli_path, "-y", "--no-wait"]
+    )
+    assert code == 1
+    assert result["failed"] == 1
+    assert "stopped responding" in result["results"][0]["output"]
+
+
+def test_regulator_path_override(monkeypatch):
+    """Test that HARP_REGULATOR_PATH selects the executable"""
+    monkeypatch.setenv("HARP_REGULATOR_PATH", "/opt/harp/HarpRegulator")
+    assert get_harp_regulator_path() == "/opt/harp/HarpRegulator"
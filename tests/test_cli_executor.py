@@ -0,0 +1,47 @@
+import asyncio
+import threading
+import pytest
+from harp_updater_gui.services.cli_executor import CLIExecutor, get_cli_executor
+
+
+@pytest.fixture
+def executor():
+    """Create a CLI executor instance for testing"""
+    executor = CLIExecutor(max_workers=2)
+    yield executor
+    executor.shutdown()
+
+
+def test_warm_up_starts_all_workers(executor):
+    """Test that the pool threads exist before the first real call"""
+    names = [t.name for t in threading.enumerate() if t.name.startswith("harp-cli")]
+    assert len(names) >= 2
+
+
+def test_run_in_process(executor):
+    """Test that callables run in-process and can mutate caller state"""
+    state = {"calls": 0}
+
+    def work(increment, label=""):
+        state["calls"] += increment
+        return f"{label}{threading.current_thread().name}"
+
+    result = asyncio.run(executor.run(work, 2, label="ran on "))
+
+    assert state["calls"] == 2
+    assert result.startswith("ran on harp-cli")
+
+
+def test_dispatch_stats(executor):
+    """Test that dispatch overhead is measured per call"""
+    for _ in range(5):
+        executor.submit(lambda: None).result()
+
+    stats = executor.stats()
+    assert stats["dispatches"] == 5
+    assert 0 <= stats["mean_ms"] <= stats["max_ms"]
+
+
+def test_shared_executor():
+    """Test that the process-wide executor is a singleton"""
+    assert get_cli_executor() is get_cli_executor()
@@ -0,0 +1,135 @@
+import asyncio
+import sys
+import time
+import pytest
+from harp_updater_gui.services.cli_wrapper import CLIWrapper, parse_progress_line
+
+
+@pytest.fixture
+def cli():
+    """Create a CLI wrapper instance for testing"""
+    return CLIWrapper()
+
+
+def test_parse_progress_line():
+    """Test parsing percent and phase from progress output"""
+    update = parse_progress_line("Uploading [#####     ] 45%")
+    assert update.percent == 45.0
+    assert update.phase == "Uploading"
+
+    update = parse_progress_line("Erasing flash... 12.5 %")
+    assert update.percent == 12.5
+    assert update.phase == "Erasing flash"
+
+    update = parse_progress_line("Writing 1024/4096")
+    assert update.percent == 25.0
+    assert update.phase == "Writing"
+
+    update = parse_progress_line("Rebooting device...")
+    assert update.percent is None
+    assert update.phase == "Rebooting device"
+
+    assert parse_progress_line("   ") is None
+
+
+def test_run_streaming_reports_progress(cli):
+    """Test that carriage-return progress output is streamed as it arrives"""
+    script = (
+        "import sys\n"
+        "for p in (0, 50, 100):\n"
+        "    sys.stdout.write(f'\\rUploading {p}%')\n"
+        "    sys.stdout.flush()\n"
+        "print()\n"
+        "print('Done')\n"
+    )
+    updates = []
+
+    success, output = cli._run_streaming([sys.executable, "-c", script], updates.append)
+
+    assert success is True
+    assert [u.percent for u in updates] == [0.0, 50.0, 100.0, None]
+    assert updates[-1].phase == "Done"
+    assert "Uploading 100%" in output
+
+
+def test_run_streaming_failure_returns_stderr(cli):
+    """Test that a failing command returns its stderr"""
+    script = "import sys; sys.stderr.write('device not found'); sys.exit(1)"
+
+    success, output = cli._run_streaming([sys.executable, "-c", script], print)
+
+    assert success is False
+    assert output == "device not found"
+
+
+def test_run_async_streams_output(cli):
+    """Test that the asyncio backend streams stdout and stderr lines"""
+    script = (
+        "import sys\n"
+        "print('line 1', flush=True)\n"
+        "sys.stderr.write('warning\\n')\n"
+        "print('line 2')\n"
+    )
+    lines = []
+
+    returncode, stdout, stderr = asyncio.run(
+        cli._run_async(
+            [sys.executable, "-c", script], lambda name, text: lines.append((name, text))
+        )
+    )
+
+    assert returncode == 0
+    assert stdout.split() == ["line", "1", "line", "2"]
+    assert stderr.strip() == "warning"
+    assert ("stdout", "line 1") in lines
+    assert ("stderr", "warning") in lines
+
+
+def test_run_async_cancellation_kills_process(cli):
+    """Test that cancelling an async CLI call terminates the subprocess"""
+
+    async def run_and_cancel():
+        task = asyncio.create_task(
+            cli._run_async([sys.executable, "-c", "import time; time.sleep(30)"])
+        )
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    start = time.monotonic()
+    asyncio.run(run_and_cancel())
+    assert time.monotonic() - start < 10
+
+
+def test_list_devices_async(cli, mocker):
+    """Test async device listing parses JSON output"""
+    mocker.patch.object(
+        cli, "_run_async", return_value=(0, '[{"Kind": "Pico"}]', "")
+    )
+
+    devices = asyncio.run(cli.list_devices_async(allow_connect=False))
+
+    assert devices == [{"Kind": "Pico"}]
+    cmd = cli._run_async.call_args[0][0]
+    assert cmd == ["HarpRegulator", "list", "--json", "--all"]
+
+
+def test_upload_firmware_async_progress(cli, mocker):
+    """Test async upload reports progress parsed from stdout lines"""
+
+    async def fake_run(cmd, on_output=None):
+        on_output("stdout", "Uploading 50%")
+        on_output("stderr", "ignored 10%")
+        return 0, "Uploading 50%", ""
+
+    mocker.patch.object(cli, "_run_async", side_effect=fake_run)
+    updates = []
+
+    success, _ = asyncio.run(
+        cli.upload_firmware_async("fw.uf2", "COM5", on_progress=updates.append)
+    )
+
+    assert success is True
+    assert [u.percent for u in updates] == [50.0]
+    assert "--progress" in cli._run_async.call_args[0][0]
@@ -0,0 +1,116 @@
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.models.firmware import Firmware
+from harp_updater_gui.services.compatibility import (
+    CompatibilityIndex,
+    FirmwareTarget,
+    hardware_key,
+)
+from harp_updater_gui.services.firmware_repository import FirmwareEntry
+
+
+def make_entry(version, hardware_version=None, who_am_i=1216, name="Behavior"):
+    """Build a repository entry"""
+    return FirmwareEntry(
+        path=f"/firmware/{name}-fw{version}.uf2",
+        file_type=".uf2",
+        size=1,
+        mtime_ns=0,
+        device_name=name,
+        who_am_i=who_am_i,
+        firmware_version=version,
+        hardware_version=hardware_version,
+    )
+
+
+def make_device(port, who_am_i=1216, hardware_version="1.1", kind="Pico"):
+    """Build an online device"""
+    return Device(
+        Confidence="High",
+        Kind=kind,
+        State="Online",
+        PortName=port,
+        WhoAmI=who_am_i,
+        HardwareVersion=hardware_version,
+    )
+
+
+def test_hardware_key():
+    """Test hardware version normalization"""
+    assert hardware_key("1.1") == hardware_key("v1.1.0") == (1, 1)
+    assert hardware_key("RevB") == "revb"
+    assert hardware_key(None) is None
+
+
+def test_compatible_versions():
+    """Test lookups by WhoAmI, name and hardware version"""
+    index = CompatibilityIndex(
+        [
+            make_entry("2.0.0"),
+            make_entry("2.1.0", "1.1"),
+            make_entry("v2.2", "1.2"),
+        ]
+    )
+
+    assert index.compatible_versions(who_am_i=1216, hardware_version="1.1") == {
+        "2.0.0",
+        "2.1.0",
+    }
+    assert index.compatible_versions(device_name="behavior") == {"2.0.0", "2.1.0", "2.2.0"}
+    assert index.is_compatible("2.2.0", who_am_i=1216, hardware_version="1.2")
+    assert not index.is_compatible("2.2.0", who_am_i=1216, hardware_version="1.1")
+    assert not index.is_compatible("2.0.0", who_am_i=9999)
+
+
+def test_check_devices():
+    """Test checking a batch of devices against one firmware file"""
+    devices = [
+        make_device("COM1"),
+        make_device("COM2", who_am_i=1405),
+        make_device("COM3", hardware_version="1.0"),
+        make_device("COM4", kind="ATxmega"),
+        make_device("COM5", who_am_i=None, hardware_version=None),
+    ]
+    target = FirmwareTarget(file_type=".uf2", who_am_i=1216, hardware_version="1.1")
+
+    results = CompatibilityIndex().check_devices(devices, target)
+
+    assert [r.compatible for r in results] == [True, False, False, False, True]
+    assert "WhoAmI 1216" in results[1].reason
+    assert "hardware v1.1" in results[2].reason
+    assert ".uf2" in results[3].reason
+
+
+def test_check_devices_uses_index_when_hardware_unknown():
+    """Test that the index decides hardware compatibility for files without it"""
+    index = CompatibilityIndex([make_entry("2.1.0", "1.1"), make_entry("2.0.0")])
+    devices = [make_device("COM1"), make_device("COM2", hardware_version="1.0")]
+
+    results = index.check_devices(
+        devices, FirmwareTarget(file_type=".uf2", who_am_i=1216, firmware_version="2.1.0")
+    )
+    assert [r.compatible for r in results] == [True, False]
+    assert "not released for hardware v1.0" in results[1].reason
+
+    # Firmware built for every hardware version
+    results = index.check_devices(
+        devices, FirmwareTarget(file_type=".uf2", who_am_i=1216, firmware_version="2.0.0")
+    )
+    assert all(r.compatible for r in results)
+
+
+def test_check_devices_with_unparseable_who_am_i():
+    """Test that a non-numeric WhoAmI from inspect counts as unknown"""
+    devices = [make_device("COM1"), make_device("COM2", who_am_i=1405)]
+
+    for who_am_i in ("n/a", [1216]):
+        target = FirmwareTarget(file_type=".uf2", who_am_i=who_am_i)
+        results = CompatibilityIndex().check_devices(devices, target)
+        assert all(r.compatible for r in results)
+
+
+def test_firmware_model_compatibility():
+    """Test hardware membership on the firmware model"""
+    firmware = Firmware(version="1.0.0", compatible_hardware=["1.0", "1.1"])
+
+    assert firmware.is_compatible("1.1")
+    assert not firmware.is_compatible("2.0")
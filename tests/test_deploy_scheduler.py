@@ -0,0 +1,131 @@
+import asyncio
+import pytest
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.services.deploy_scheduler import DeployScheduler, device_tag
+
+
+def make_device(port: str, state: str = "Online", kind: str = "Pico") -> Device:
+    """Create a test device on the given port"""
+    return Device(
+        Confidence="High",
+        Kind=kind,
+        State=state,
+        PortName=port,
+        DeviceDescription="EnvironmentSensor",
+    )
+
+
+@pytest.fixture
+def devices():
+    """Eight online devices on distinct ports"""
+    return [make_device(f"COM{i}") for i in range(1, 9)]
+
+
+def test_bounded_concurrency(devices):
+    """Test that no more than max_concurrency uploads run at once"""
+    running = 0
+    peak = 0
+
+    async def upload(device):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return True, "ok"
+
+    scheduler = DeployScheduler(max_concurrency=3)
+    report = asyncio.run(scheduler.run(devices, upload))
+
+    assert peak == 3
+    assert report.total == len(devices)
+    assert report.success_count == len(devices)
+    assert report.elapsed > 0
+
+
+def test_per_device_accounting(devices):
+    """Test that failures and exceptions are tracked per device"""
+
+    async def upload(device):
+        if device.port_name == "COM2":
+            return False, "timeout"
+        if device.port_name == "COM3":
+            raise RuntimeError("boom")
+        return True, "ok"
+
+    started = []
+    finished = []
+    scheduler = DeployScheduler(max_concurrency=4)
+    report = asyncio.run(
+        scheduler.run(
+            devices,
+            upload,
+            on_start=lambda device, position: started.append(position),
+            on_finish=lambda result, completed: finished.append(completed),
+        )
+    )
+
+    assert report.success_count == len(devices) - 2
+    assert report.fail_count == 2
+    assert [r.device.port_name for r in report.failed] == ["COM2", "COM3"]
+    assert report.failed[1].output == "boom"
+    # Results keep input order regardless of completion order
+    assert [r.device.port_name for r in report.results] == [
+        d.port_name for d in devices
+    ]
+    assert sorted(started) == list(range(1, len(devices) + 1))
+    assert finished == list(range(1, len(devices) + 1))
+
+
+def test_shared_target_is_serialized():
+    """Test that devices sharing an upload target never upload concurrently"""
+    devices = [make_device(None, state="Bootloader") for _ in range(3)]
+    running = 0
+    peak = 0
+
+    async def upload(device):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return True, "ok"
+
+    scheduler = DeployScheduler(max_concurrency=3, target_key=lambda d: "PICOBOOT")
+    report = asyncio.run(scheduler.run(devices, upload))
+
+    assert peak == 1
+    assert report.success_count == 3
+
+
+def test_shared_target_locks_serialize_schedulers():
+    """Test that two schedulers sharing target locks never upload to one port at once"""
+    running = 0
+    peak = 0
+
+    async def upload(device):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return True, "ok"
+
+    async def scenario():
+        locks = {}
+        first = DeployScheduler(max_concurrency=2, target_locks=locks)
+        second = DeployScheduler(max_concurrency=2, target_locks=locks)
+        return await asyncio.gather(
+            first.run([make_device("COM5")], upload),
+            second.run([make_device("COM5")], upload),
+        )
+
+    reports = asyncio.run(scenario())
+
+    assert peak == 1
+    assert all(report.success_count == 1 for report in reports)
+
+
+def test_device_tag():
+    """Test device log tag formatting"""
+    assert device_tag(make_device("COM5")) == "[EnvironmentSensor @ COM5]"
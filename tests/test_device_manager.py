@@ -1,6 +1,7 @@
+import asyncio
 import pytest
 from harp_updater_gui.services.device_manager import DeviceManager
-from harp_updater_gui.models.device import Device
+from harp_updater_gui.models.device import Device, parse_device_list
 
 
 @pytest.fixture
@@ -120,3 +121,187 @@ def test_select_device(device_manager, mocker, sample_device_data):
     assert selected is not None
     assert selected.port_name == "COM5"
     assert selected.display_name == "EnvironmentSensor"
+
+
+def test_refresh_devices_async(device_manager, mocker, sample_device_data):
+    """Test async refresh applies results to the device manager itself"""
+
+    async def fake_list_devices(all_devices=True, allow_connect=True):
+        return [sample_device_data]
+
+    mocker.patch.object(
+        device_manager.cli, "list_devices_async", side_effect=fake_list_devices
+    )
+
+    devices = asyncio.run(device_manager.refresh_devices_async(allow_connect=False))
+
+    assert len(devices) == 1
+    assert device_manager.get_devices() == devices
+    device_manager.cli.list_devices_async.assert_called_once_with(
+        all_devices=True, allow_connect=False
+    )
+
+
+def test_device_identity_key(sample_device_data):
+    """Test stable device identity keys"""
+    device = Device(**sample_device_data)
+    assert device.identity_key == "port:COM5"
+
+    device = Device(**{**sample_device_data, "SerialNumber": 1234})
+    assert device.identity_key == "sn:1234"
+
+
+def test_filter_needs_update(device_manager, mocker, sample_device_data):
+    """Test the "Needs update" filter"""
+    mock_list = [
+        sample_device_data,
+        {**sample_device_data, "PortName": "COM6", "FirmwareVersion": "0.3.0"},
+    ]
+    mocker.patch.object(device_manager.cli, "list_devices", return_value=mock_list)
+    device_manager.refresh_devices()
+
+    assert device_manager.filter_devices(device_type="Needs update") == []
+
+    device_manager.set_available_updates({"port:COM5": "0.3.0"})
+    filtered = device_manager.filter_devices(device_type="Needs update")
+
+    assert [d.port_name for d in filtered] == ["COM5"]
+
+
+def test_device_firmware_version_key(sample_device_data):
+    """Test that the parsed firmware version is cached on the device"""
+    device = Device(**sample_device_data)
+
+    assert device.firmware_version_key == (0, 2, 0, 1, ())
+    assert device.firmware_version_key is device.firmware_version_key
+    assert Device(**{**sample_device_data, "FirmwareVersion": None}).firmware_version_key is None
+
+
+def test_device_indexes(device_manager, sample_device_data):
+    """Test lookups and grouping through the device indexes"""
+    bootloader = {
+        **sample_device_data,
+        "State": "Bootloader",
+        "PortName": None,
+        "Source": None,
+        "WhoAmI": None,
+        "DeviceDescription": None,
+        "FirmwareVersion": None,
+    }
+    device_manager.apply_device_data(
+        [
+            sample_device_data,
+            {**sample_device_data, "PortName": "COM6", "SerialNumber": 42},
+            bootloader,
+            bootloader,
+        ]
+    )
+
+    first = device_manager.get_device_by_port("COM5")
+    assert first is device_manager.devices[0]
+    assert device_manager.get_device_by_serial("42").port_name == "COM6"
+    assert device_manager.get_ports() == {"COM5", "COM6"}
+    assert len(device_manager.get_devices_by_source("Pico USB Serial Port")) == 2
+    assert len(device_manager.get_devices_by_name(first.display_name)) == 2
+    assert len(device_manager.get_devices_by_state("Bootloader")) == 2
+    assert set(device_manager.group_devices_by_state()) == {"Online", "Bootloader"}
+
+    # Bootloader devices without a port still get distinct row keys
+    keys = [d.identity_key for d in device_manager.devices]
+    assert len(set(keys)) == len(keys)
+    for key in keys:
+        assert device_manager.get_device_by_key(key).identity_key == key
+
+    # Keys are stable across refreshes
+    device_manager.apply_device_data([sample_device_data, bootloader, bootloader])
+    assert [d.identity_key for d in device_manager.devices] == [
+        keys[0],
+        keys[2],
+        keys[3],
+    ]
+    assert device_manager.get_device_by_port("COM6") is None
+
+
+def test_parse_device_list_collects_row_errors(sample_device_data):
+    """Test bulk validation keeps good rows and reports bad ones"""
+    payload = [
+        sample_device_data,
+        {**sample_device_data, "PortName": None},
+        {**sample_device_data, "Kind": None, "WhoAmI": "abc"},
+        {**sample_device_data, "PortName": "COM6"},
+    ]
+
+    devices, errors = parse_device_list(payload)
+
+    assert [d.port_name for d in devices] == ["COM5", "COM6"]
+    assert [e.index for e in errors] == [1, 2]
+    assert errors[0].data is payload[1]
+    assert "port_name is required" in str(errors[0])
+    assert {e.split(":")[0] for e in errors[1].errors} == {"Kind", "WhoAmI"}
+
+
+def test_refresh_records_parse_errors(device_manager, sample_device_data):
+    """Test malformed rows are skipped and recorded on refresh"""
+    device_manager.apply_device_data(
+        [sample_device_data, {**sample_device_data, "State": None}]
+    )
+
+    assert len(device_manager.get_devices()) == 1
+    assert [e.index for e in device_manager.parse_errors] == [1]
+
+
+def test_device_snapshots(device_manager, sample_device_data):
+    """Test snapshots carry precomputed derived fields"""
+    device_manager.apply_device_data([sample_device_data])
+
+    (snapshot,) = device_manager.snapshots
+    device = snapshot.device
+    assert snapshot.identity_key == device.identity_key
+    assert snapshot.display_name == device.display_name == "EnvironmentSensor"
+    assert snapshot.health_status == "Healthy"
+    assert snapshot.health_color == "green"
+    assert snapshot.metadata_line == device.metadata_line
+    assert snapshot.search_text.split("\x00") == ["environmentsensor", "com5", "0.2.0"]
+    assert not hasattr(snapshot, "__dict__")
+    with pytest.raises(AttributeError):
+        snapshot.display_name = "Other"
+
+    assert device_manager.filter_snapshots(search_query="com5") == [snapshot]
+    # Queries never match across two fields
+    assert device_manager.filter_snapshots(search_query="com5 0.2") == []
+    assert device_manager.filter_snapshots(health_status="Error") == []
+
+
+def test_query_snapshots_pages_sorts_and_searches(device_manager, sample_device_data):
+    """Test server-side paging, sorting and searching"""
+    device_manager.apply_device_data(
+        [
+            {**sample_device_data, "PortName": f"COM{n}", "SerialNumber": 100 + n}
+            for n in (10, 2, 7, 1)
+        ]
+    )
+
+    page, total = device_manager.query_snapshots(
+        sort_by="port", page=1, rows_per_page=3
+    )
+    assert total == 4
+    assert [s.device.port_name for s in page] == ["COM1", "COM2", "COM7"]
+
+    page, _ = device_manager.query_snapshots(sort_by="port", page=2, rows_per_page=3)
+    assert [s.device.port_name for s in page] == ["COM10"]
+
+    # Pages beyond the end are clamped to the last page
+    page, _ = device_manager.query_snapshots(sort_by="port", page=9, rows_per_page=3)
+    assert [s.device.port_name for s in page] == ["COM10"]
+
+    page, _ = device_manager.query_snapshots(
+        sort_by="port", descending=True, rows_per_page=0
+    )
+    assert [s.device.port_name for s in page] == ["COM10", "COM7", "COM2", "COM1"]
+
+    page, total = device_manager.query_snapshots(search_query="com1", sort_by="port")
+    assert total == 2
+    assert [s.device.serial_number for s in page] == ["101", "110"]
+
+    _, total = device_manager.query_snapshots(device_type="ATxmega")
+    assert total == 0
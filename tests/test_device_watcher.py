@@ -0,0 +1,164 @@
+import asyncio
+import pytest
+from harp_updater_gui.services.device_manager import DeviceManager
+from harp_updater_gui.services.device_watcher import DeviceWatcher
+
+
+def make_record(port: str, state: str = "Online", **extra) -> dict:
+    """Create a no-connect list record for testing"""
+    return {"Confidence": "Low", "Kind": "Pico", "State": state, "PortName": port, **extra}
+
+
+@pytest.fixture
+def device_manager():
+    """Create a device manager instance for testing"""
+    return DeviceManager()
+
+
+@pytest.fixture
+def watcher(device_manager):
+    """Create a device watcher collecting events"""
+    events = []
+    watcher = DeviceWatcher(device_manager, on_change=events.append)
+    watcher.events = events
+    return watcher
+
+
+def list_devices_returning(*payloads):
+    """Build an async list_devices replacement returning payloads in order"""
+    payloads = list(payloads)
+
+    async def fake_list_devices(all_devices=True, allow_connect=True):
+        assert allow_connect is False
+        return payloads.pop(0)
+
+    return fake_list_devices
+
+
+def test_poll_detects_added_and_removed(watcher, device_manager, mocker):
+    """Test that polls report plugged and unplugged devices"""
+    mocker.patch.object(
+        device_manager.cli,
+        "list_devices_async",
+        side_effect=list_devices_returning(
+            [make_record("COM5")],
+            [make_record("COM5")],
+            [make_record("COM6")],
+        ),
+    )
+
+    event = asyncio.run(watcher.poll_once())
+    assert [d.port_name for d in event.added] == ["COM5"]
+
+    assert asyncio.run(watcher.poll_once()) is None
+
+    event = asyncio.run(watcher.poll_once())
+    assert [d.port_name for d in event.added] == ["COM6"]
+    assert [d.port_name for d in event.removed] == ["COM5"]
+    assert [d.port_name for d in device_manager.get_devices()] == ["COM6"]
+
+
+def test_poll_keeps_connected_metadata(watcher, device_manager, mocker):
+    """Test that cheap polls do not discard metadata from a connecting refresh"""
+    device_manager.apply_device_data(
+        [make_record("COM5", DeviceDescription="EnvironmentSensor", SerialNumber=42)]
+    )
+    mocker.patch.object(
+        device_manager.cli,
+        "list_devices_async",
+        side_effect=list_devices_returning([make_record("COM5")]),
+    )
+
+    assert asyncio.run(watcher.poll_once()) is None
+    assert device_manager.get_devices()[0].display_name == "EnvironmentSensor"
+
+
+def test_poll_reports_state_change(watcher, device_manager, mocker):
+    """Test that a device changing state is reported as changed"""
+    device_manager.apply_device_data([make_record("COM5")])
+    mocker.patch.object(
+        device_manager.cli,
+        "list_devices_async",
+        side_effect=list_devices_returning([make_record("COM5", state="DriverError")]),
+    )
+
+    event = asyncio.run(watcher.poll_once())
+
+    assert [d.state for d in event.changed] == ["DriverError"]
+
+
+def test_paused_poll_does_not_apply(device_manager, mocker):
+    """Test that results are discarded when a refresh started meanwhile"""
+    watcher = DeviceWatcher(device_manager, on_change=print, is_paused=lambda: True)
+    mocker.patch.object(
+        device_manager.cli,
+        "list_devices_async",
+        side_effect=list_devices_returning([make_record("COM5")]),
+    )
+
+    assert asyncio.run(watcher.poll_once()) is None
+    assert device_manager.get_devices() == []
+
+
+def test_adaptive_interval(watcher):
+    """Test interval backoff, reset after change and hidden-window slowdown"""
+    watcher.interval = watcher.min_interval
+    for _ in range(10):
+        watcher.interval = watcher._next_interval(changed=False)
+    assert watcher.interval == watcher.max_interval
+
+    assert watcher._next_interval(changed=True) == watcher.min_interval
+
+    watcher.set_hidden(True)
+    assert watcher._next_interval(changed=True) == watcher.hidden_interval
+
+    watcher.set_hidden(False)
+    assert watcher.interval == watcher.min_interval
+
+
+def test_background_loop_reports_changes(watcher, device_manager, mocker):
+    """Test that the background task polls and invokes the change callback"""
+    mocker.patch.object(
+        device_manager.cli,
+        "list_devices_async",
+        side_effect=list_devices_returning(*([[make_record("COM5")]] * 50)),
+    )
+    watcher.min_interval = watcher.interval = 0.01
+
+    async def run_briefly():
+        watcher.start()
+        await asyncio.sleep(0.1)
+        assert watcher.running
+        watcher.stop()
+
+    asyncio.run(run_briefly())
+
+    assert len(watcher.events) == 1
+
+
+def test_failing_callback_keeps_polling(device_manager, mocker):
+    """Test that an exception in the change callback does not stop the loop"""
+    payloads = [[make_record(f"COM{i}")] for i in range(50)]
+    mocker.patch.object(
+        device_manager.cli,
+        "list_devices_async",
+        side_effect=list_devices_returning(*payloads),
+    )
+    calls = []
+
+    def failing_callback(event):
+        calls.append(event)
+        raise RuntimeError("listener failed")
+
+    watcher = DeviceWatcher(device_manager, on_change=failing_callback)
+    watcher.min_interval = watcher.interval = 0.01
+
+    async def run_briefly():
+        watcher.start()
+        await asyncio.sleep(0.1)
+        assert watcher.running
+        watcher.stop()
+
+    asyncio.run(run_briefly())
+
+    assert len(calls) > 1
@@ -0,0 +1,90 @@
+import os
+import pytest
+from harp_updater_gui.services.firmware_cache import FirmwareInspectionCache, file_sha256
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Firmware inspection cache persisted to a temporary file"""
+    return FirmwareInspectionCache(tmp_path / "cache.json", max_entries=2)
+
+
+def write_firmware(directory, name: str, content: bytes) -> str:
+    """Write a firmware file and return its path"""
+    path = directory / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_hit_after_put(cache, tmp_path):
+    """Test storing and retrieving an inspection result"""
+    path = write_firmware(tmp_path, "a.uf2", b"aaa")
+
+    assert cache.get(path) is None
+    cache.put(path, {"Version": "1.0.0"})
+
+    assert cache.get(path) == {"Version": "1.0.0"}
+
+
+def test_same_content_shares_entry(cache, tmp_path):
+    """Test that identical files at different paths share one entry"""
+    first = write_firmware(tmp_path, "a.uf2", b"same")
+    second = write_firmware(tmp_path, "b.uf2", b"same")
+
+    cache.put(first, {"Version": "1.0.0"})
+
+    assert cache.get(second) == {"Version": "1.0.0"}
+    assert len(cache) == 1
+
+
+def test_unchanged_file_is_not_rehashed(cache, tmp_path, mocker):
+    """Test that an unchanged file is looked up with a stat call only"""
+    path = write_firmware(tmp_path, "a.uf2", b"aaa")
+    cache.put(path, {"Version": "1.0.0"})
+
+    hasher = mocker.patch("harp_updater_gui.services.firmware_cache.file_sha256")
+    assert cache.get(path) == {"Version": "1.0.0"}
+    hasher.assert_not_called()
+
+
+def test_modified_file_misses(cache, tmp_path):
+    """Test that rewriting a file changes its cache key"""
+    path = write_firmware(tmp_path, "a.uf2", b"aaa")
+    cache.put(path, {"Version": "1.0.0"})
+
+    with open(path, "wb") as f:
+        f.write(b"bbbb")
+    os.utime(path, ns=(0, 0))
+
+    assert cache.get(path) is None
+
+
+def test_lru_eviction(cache, tmp_path):
+    """Test that the least recently used entry is evicted at the size cap"""
+    paths = [write_firmware(tmp_path, f"{n}.uf2", n.encode()) for n in "abc"]
+    cache.put(paths[0], {"Version": "a"})
+    cache.put(paths[1], {"Version": "b"})
+    cache.get(paths[0])
+    cache.put(paths[2], {"Version": "c"})
+
+    assert cache.get(paths[0]) == {"Version": "a"}
+    assert cache.get(paths[1]) is None
+    assert len(cache) == 2
+
+
+def test_persistence(cache, tmp_path):
+    """Test that entries survive a restart"""
+    path = write_firmware(tmp_path, "a.uf2", b"aaa")
+    cache.put(path, {"Version": "1.0.0"})
+
+    reloaded = FirmwareInspectionCache(tmp_path / "cache.json")
+
+    assert reloaded.get(path) == {"Version": "1.0.0"}
+
+
+def test_file_sha256(tmp_path):
+    """Test streaming SHA-256"""
+    path = write_firmware(tmp_path, "a.uf2", b"abc")
+    assert file_sha256(path, chunk_size=1) == (
+        "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"
+    )
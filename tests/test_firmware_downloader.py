@@ -0,0 +1,207 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from harp_updater_gui.services.firmware_downloader import (
+    DownloadError,
+    FirmwareDownloader,
+    FirmwareRelease,
+)
+
+
+FIRMWARE = bytes(range(256)) * 64
+
+
+class ReleaseServer(ThreadingHTTPServer):
+    """Local stand-in for the firmware release server"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ReleaseHandler)
+        self.files = {}
+        self.requests = []
+        self.connections = set()
+        self.truncate_next = False
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/releases/"
+
+    def publish(self, path: str, content: bytes, etag: str):
+        self.files[path] = (content, etag)
+
+
+class ReleaseHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, dict(self.headers)))
+        server.connections.add(self.client_address)
+
+        if self.path == "/old/index.json":
+            self.send_response(301)
+            self.send_header("Location", "/releases/index.json")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.path not in server.files:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        content, etag = server.files[self.path]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range") == etag:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(content) - 1}/{len(content)}")
+        else:
+            self.send_response(200)
+
+        body = content[start:]
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if server.truncate_next:
+            server.truncate_next = False
+            self.wfile.write(body[: len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    """Release server publishing one firmware file"""
+    server = ReleaseServer()
+    server.publish("/releases/Behavior/Behavior-fw2.1.0.uf2", FIRMWARE, '"fw-1"')
+    manifest = {
+        "firmware": [
+            {
+                "device": "Behavior",
+                "version": "2.1.0",
+                "url": "Behavior/Behavior-fw2.1.0.uf2",
+                "sha256": hashlib.sha256(FIRMWARE).hexdigest(),
+            }
+        ]
+    }
+    server.publish("/releases/index.json", json.dumps(manifest).encode(), '"manifest-1"')
+
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def downloader(server, tmp_path):
+    """Downloader mirroring into a temporary directory"""
+    downloader = FirmwareDownloader(server.url, mirror_dir=tmp_path / "mirror")
+    yield downloader
+    downloader.close()
+
+
+def paths(server):
+    return [path for path, _ in server.requests]
+
+
+def test_download_and_mirror(server, downloader, tmp_path):
+    """Test download, digest verification and serving from the mirror"""
+    release = downloader.find_release("behavior", "v2.1")
+
+    path = downloader.download(release)
+
+    assert path == tmp_path / "mirror" / "Behavior" / "Behavior-fw2.1.0.uf2"
+    assert path.read_bytes() == FIRMWARE
+
+    server.requests.clear()
+    assert downloader.download(release) == path
+    assert server.requests == []
+
+
+def test_manifest_conditional_request(server, downloader):
+    """Test that an unchanged manifest is revalidated with If-None-Match"""
+    downloader.fetch_manifest()
+    releases = downloader.fetch_manifest()
+
+    assert len(releases) == 1
+    assert server.requests[-1][1].get("If-None-Match") == '"manifest-1"'
+
+
+def test_redirects_are_followed(server, tmp_path):
+    """Test following a redirect to the manifest"""
+    downloader = FirmwareDownloader(
+        server.url, mirror_dir=tmp_path / "mirror", manifest_name="../old/index.json"
+    )
+
+    assert downloader.fetch_manifest()[0].device == "Behavior"
+
+
+def test_resume_interrupted_download(server, downloader):
+    """Test that an interrupted transfer resumes with a Range request"""
+    release = downloader.find_release("Behavior", "2.1.0")
+
+    server.truncate_next = True
+    with pytest.raises(DownloadError):
+        downloader.download(release)
+
+    path = downloader.download(release)
+
+    assert path.read_bytes() == FIRMWARE
+    last_headers = server.requests[-1][1]
+    assert last_headers["Range"] == f"bytes={len(FIRMWARE) // 2}-"
+    assert last_headers["If-Range"] == '"fw-1"'
+
+
+def test_digest_mismatch(server, downloader):
+    """Test that a corrupt download is rejected and not mirrored"""
+    release = FirmwareRelease(
+        device="Behavior",
+        version="2.1.0",
+        url=server.url + "Behavior/Behavior-fw2.1.0.uf2",
+        sha256="0" * 64,
+    )
+
+    with pytest.raises(DownloadError, match="SHA-256"):
+        downloader.download(release)
+    assert not downloader.mirror_path(release).exists()
+
+
+def test_download_many_reuses_connections(server, downloader):
+    """Test concurrent downloads over pooled keep-alive connections"""
+    releases = []
+    for n in range(8):
+        path = f"/releases/Behavior/Behavior-fw1.{n}.0.uf2"
+        server.publish(path, FIRMWARE, f'"fw-1.{n}"')
+        releases.append(
+            FirmwareRelease(device="Behavior", version=f"1.{n}.0", url=server.url[:-10] + path)
+        )
+    releases.append(
+        FirmwareRelease(device="Behavior", version="0.0.1", url=server.url + "missing.uf2")
+    )
+
+    results = downloader.download_many(releases)
+
+    assert all(results[release].read_bytes() == FIRMWARE for release in releases[:-1])
+    assert isinstance(results[releases[-1]], DownloadError)
+    assert len(server.connections) <= downloader.max_connections + 1
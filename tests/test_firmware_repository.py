@@ -0,0 +1,152 @@
+import os
+import pytest
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.services.firmware_repository import FirmwareRepository
+
+
+def write_firmware(root, relative_path: str, content: bytes = b"firmware"):
+    """Write a firmware file under the repository root"""
+    path = root / relative_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+@pytest.fixture
+def root(tmp_path):
+    """Repository directory with a few firmware files"""
+    root = tmp_path / "firmware"
+    write_firmware(root, "Behavior/Behavior-fw2.0.0.uf2")
+    write_firmware(root, "Behavior/Behavior-fw2.1.0-hw1.1.uf2")
+    write_firmware(root, "Behavior/Behavior-fw2.0.5-hw1.0.uf2")
+    write_firmware(root, "LoadCells-v1.3.0.hex")
+    return root
+
+
+def test_index_by_path_conventions(root):
+    """Test device name and versions taken from paths and file names"""
+    repository = FirmwareRepository(root)
+
+    assert repository.refresh() == (4, 0, 0)
+    assert repository.versions(device_name="behavior") == ["2.1.0", "2.0.5", "2.0.0"]
+    assert repository.versions(device_name="LoadCells") == ["1.3.0"]
+
+
+def test_latest_by_hardware_version(root):
+    """Test that hardware-specific builds only match their hardware"""
+    repository = FirmwareRepository(root)
+    repository.refresh()
+
+    assert repository.latest(device_name="Behavior").firmware_version == "2.1.0"
+    assert (
+        repository.latest(device_name="Behavior", hardware_version="1.0").firmware_version
+        == "2.0.5"
+    )
+    assert (
+        repository.latest(device_name="Behavior", hardware_version="2.0").firmware_version
+        == "2.0.0"
+    )
+    assert repository.latest(device_name="Unknown") is None
+
+
+def test_index_from_inspect_output(root):
+    """Test that embedded metadata takes precedence over the file name"""
+
+    def inspect(path):
+        if path.endswith(".hex"):
+            return {"FileType": "Intel HEX", "Metadata": {"WhoAmI": 1232, "Version": "1.4.0"}}
+        return None
+
+    repository = FirmwareRepository(root, inspect=inspect)
+    repository.refresh()
+
+    device = Device(
+        Confidence="High",
+        Kind="ATxmega",
+        State="Online",
+        PortName="COM3",
+        WhoAmI=1232,
+        DeviceDescription="Renamed",
+    )
+    assert repository.latest_for_device(device).firmware_version == "1.4.0"
+
+
+def test_incremental_refresh(root, mocker):
+    """Test that only new or modified files are inspected"""
+    inspect = mocker.Mock(return_value=None)
+    repository = FirmwareRepository(root, inspect=inspect)
+    repository.refresh()
+    assert inspect.call_count == 4
+
+    inspect.reset_mock()
+    assert repository.refresh() == (0, 0, 0)
+    inspect.assert_not_called()
+
+    write_firmware(root, "Behavior/Behavior-fw3.0.0.uf2")
+    modified = root / "LoadCells-v1.3.0.hex"
+    modified.write_bytes(b"changed firmware")
+    os.utime(modified, ns=(0, 0))
+    (root / "Behavior" / "Behavior-fw2.1.0-hw1.1.uf2").unlink()
+
+    assert repository.refresh() == (1, 1, 1)
+    assert inspect.call_count == 2
+    assert repository.latest(device_name="Behavior").firmware_version == "3.0.0"
+    assert (
+        repository.latest(device_name="Behavior", hardware_version="1.1").firmware_version
+        == "3.0.0"
+    )
+
+
+def test_index_persistence(root, mocker):
+    """Test that a restarted repository does not re-inspect unchanged files"""
+    FirmwareRepository(root).refresh()
+
+    inspect = mocker.Mock(return_value=None)
+    repository = FirmwareRepository(root, inspect=inspect)
+
+    assert repository.refresh() == (0, 0, 0)
+    inspect.assert_not_called()
+    assert len(repository) == 4
+
+
+def test_get_file_on_another_drive(root, mocker):
+    """Test that paths with no relative form (other Windows drive) are not found"""
+    repository = FirmwareRepository(root)
+    repository.refresh()
+    assert repository.get(str(root / "LoadCells-v1.3.0.hex")) is not None
+
+    mocker.patch(
+        "harp_updater_gui.services.firmware_repository.os.path.relpath",
+        side_effect=ValueError("path is on mount 'D:', start on mount 'C:'"),
+    )
+    assert repository.get("D:\\firmware\\Behavior.uf2") is None
+
+
+def test_refresh_if_changed(root, mocker):
+    """Test that lookups rescan only after the root directory changed"""
+    repository = FirmwareRepository(root)
+    scan = mocker.spy(repository, "_scan")
+
+    repository.refresh_if_changed()
+    repository.refresh_if_changed()
+    assert scan.call_count == 1
+
+    write_firmware(root, "Olfactometer-v1.0.0.hex")
+    os.utime(root, ns=(0, 0))
+    assert repository.refresh_if_changed() == (1, 0, 0)
+    assert scan.call_count == 2
+
+
+def test_inspect_errors_skip_the_file(root, mocker):
+    """Test that a failing inspect skips that file instead of the refresh"""
+
+    def inspect(path):
+        if path.endswith(".hex"):
+            raise FileNotFoundError("HarpRegulator")
+        return None
+
+    repository = FirmwareRepository(root, inspect=inspect)
+
+    assert repository.refresh() == (3, 0, 0)
+    assert repository.versions(device_name="LoadCells") == []
+    assert repository.versions(device_name="Behavior") == ["2.1.0", "2.0.5", "2.0.0"]
@@ -1,5 +1,8 @@
 import pytest
+from harp_updater_gui.models.device import Device
 from harp_updater_gui.services.firmware_service import FirmwareService
+from tests.test_intel_hex import EOF_RECORD, make_record
+from tests.test_uf2 import make_uf2
 
 
 @pytest.fixture
@@ -20,7 +23,7 @@ def test_validate_firmware_file(firmware_service, tmp_path):
     """Test firmware file validation"""
     # Create a test file
     test_file = tmp_path / "test.uf2"
-    test_file.write_text("test content")
+    test_file.write_bytes(make_uf2(bytes(512)))
 
     device_kind = "Pico"
 
@@ -43,6 +46,38 @@ def test_validate_firmware_file(firmware_service, tmp_path):
         firmware_service.validate_firmware_file("ATxmega", str(test_file))[0] is False
     )
 
+    # Test corrupt UF2 contents
+    corrupt_file = tmp_path / "corrupt.uf2"
+    corrupt_file.write_text("test content")
+    valid, error_msg = firmware_service.validate_firmware_file(
+        device_kind, str(corrupt_file)
+    )
+    assert valid is False
+    assert "Invalid UF2" in error_msg
+
+    # Test ATxmega image validation
+    hex_file = tmp_path / "test.hex"
+    hex_file.write_bytes(make_record(0x00, 0, b"\x01\x02") + EOF_RECORD)
+    assert firmware_service.validate_firmware_file("ATxmega", str(hex_file))[0] is True
+
+    # EEPROM and fuse sections beyond the flash are accepted
+    hex_file.write_bytes(
+        make_record(0x00, 0, b"\x01\x02")
+        + make_record(0x04, 0, b"\x00\x81")
+        + make_record(0x00, 0, b"\xAA")
+        + make_record(0x04, 0, b"\x00\x82")
+        + make_record(0x00, 0, b"\xFF\xFF")
+        + EOF_RECORD
+    )
+    assert firmware_service.validate_firmware_file("ATxmega", str(hex_file))[0] is True
+
+    hex_file.write_bytes(make_record(0x00, 0, b"\x01\x02"))
+    valid, error_msg = firmware_service.validate_firmware_file(
+        "ATxmega", str(hex_file)
+    )
+    assert valid is False
+    assert "Invalid HEX" in error_msg
+
     # Test invalid extension
     bad_file = tmp_path / "test.bin"
     bad_file.write_text("test")
@@ -51,12 +86,21 @@ def test_validate_firmware_file(firmware_service, tmp_path):
     )
 
 
-def test_get_available_firmware_versions(firmware_service):
-    """Test fetching available firmware versions"""
+def test_get_available_firmware_versions(mocker, tmp_path):
+    """Test fetching available firmware versions from the local repository"""
+    firmware_dir = tmp_path / "firmware"
+    (firmware_dir / "EnvironmentSensor").mkdir(parents=True)
+    for version in ("0.5.0", "0.9.1", "0.9.0"):
+        (firmware_dir / "EnvironmentSensor" / f"EnvironmentSensor-fw{version}.uf2").write_bytes(
+            make_uf2(version.encode())
+        )
+    firmware_service = FirmwareService(firmware_dir=firmware_dir)
+    mocker.patch.object(firmware_service.cli, "inspect_firmware", return_value=None)
+
     versions = firmware_service.get_available_firmware_versions("EnvironmentSensor")
 
-    assert isinstance(versions, list)
-    assert len(versions) > 0
+    assert versions == ["0.9.1", "0.9.0", "0.5.0"]
+    assert firmware_service.get_available_firmware_versions("Behavior") == []
 
 
 def test_is_compatible(firmware_service):
@@ -64,18 +108,24 @@ def test_is_compatible(firmware_service):
     firmware_info = {"version": "1.0.0"}
     hardware_version = "1.0"
 
-    # Placeholder test - in real implementation would check actual compatibility
+    # Firmware without a declared hardware version runs on any hardware
     assert firmware_service.is_compatible(firmware_info, hardware_version) is True
 
+    firmware_info = {"Metadata": {"HardwareVersion": "1.1"}}
+    assert firmware_service.is_compatible(firmware_info, "v1.1.0") is True
+    assert firmware_service.is_compatible(firmware_info, "1.0") is False
 
-def test_inspect_firmware_cache(firmware_service, mocker):
+
+def test_inspect_firmware_cache(firmware_service, mocker, tmp_path):
     """Test firmware inspection with caching"""
     mock_info = {"WhoAmI": 1405, "Version": "1.0.0"}
     mocker.patch.object(
         firmware_service.cli, "inspect_firmware", return_value=mock_info
     )
 
-    firmware_path = "test_firmware.uf2"
+    firmware_file = tmp_path / "test_firmware.uf2"
+    firmware_file.write_bytes(b"firmware v1")
+    firmware_path = str(firmware_file)
 
     # First call should hit the CLI
     info1 = firmware_service.inspect_firmware(firmware_path)
@@ -97,8 +147,16 @@ def test_fetch_available_firmware(firmware_service):
     assert isinstance(firmware_list, list)
 
 
-def test_check_firmware_compatibility(firmware_service):
+def test_check_firmware_compatibility(mocker, tmp_path):
     """Test checking firmware compatibility with device"""
+    firmware_dir = tmp_path / "firmware"
+    (firmware_dir / "EnvironmentSensor").mkdir(parents=True)
+    (firmware_dir / "EnvironmentSensor" / "EnvironmentSensor-fw0.9.1.uf2").write_bytes(
+        make_uf2(b"0.9.1")
+    )
+    firmware_service = FirmwareService(firmware_dir=firmware_dir)
+    mocker.patch.object(firmware_service.cli, "inspect_firmware", return_value=None)
+
     device_id = "EnvironmentSensor"
     firmware_version = "v0.9.1"
 
@@ -106,5 +164,108 @@ def test_check_firmware_compatibility(firmware_service):
         device_id, firmware_version
     )
 
-    # Placeholder implementation returns True
     assert is_compatible is True
+    assert firmware_service.check_firmware_compatibility(device_id, "0.5.0") is False
+
+
+def test_check_devices_compatibility(firmware_service, mocker, tmp_path):
+    """Test rejecting devices a firmware file was not built for"""
+    mocker.patch.object(
+        firmware_service.cli, "inspect_firmware", return_value={"WhoAmI": 1405}
+    )
+    firmware_file = tmp_path / "EnvironmentSensor.uf2"
+    firmware_file.write_bytes(make_uf2(b"firmware"))
+    devices = [
+        Device(Confidence="High", Kind="Pico", State="Online", PortName="COM1", WhoAmI=1405),
+        Device(Confidence="High", Kind="Pico", State="Online", PortName="COM2", WhoAmI=1216),
+    ]
+
+    results = firmware_service.check_devices_compatibility(devices, str(firmware_file))
+
+    assert [r.compatible for r in results] == [True, False]
+
+
+def test_inspect_firmware_cache_is_content_addressed(firmware_service, mocker, tmp_path):
+    """Test that overwriting a firmware file invalidates its cached metadata"""
+    mocker.patch.object(
+        firmware_service.cli,
+        "inspect_firmware",
+        side_effect=[{"Version": "1.0.0"}, {"Version": "1.1.0"}],
+    )
+    firmware_file = tmp_path / "build.uf2"
+    firmware_file.write_bytes(b"firmware v1")
+    assert firmware_service.inspect_firmware(str(firmware_file))["Version"] == "1.0.0"
+
+    firmware_file.write_bytes(b"firmware v1.1")
+    assert firmware_service.inspect_firmware(str(firmware_file))["Version"] == "1.1.0"
+
+    # Other instances share the same cache
+    other_service = FirmwareService()
+    mocker.patch.object(other_service.cli, "inspect_firmware")
+    assert other_service.inspect_firmware(str(firmware_file))["Version"] == "1.1.0"
+    other_service.cli.inspect_firmware.assert_not_called()
+
+
+def test_download_firmware_without_server(firmware_service, tmp_path):
+    """Test that downloads are disabled without a release server"""
+    assert firmware_service.downloader is None
+    assert (
+        firmware_service.download_firmware("2.1.0", "Behavior", str(tmp_path / "fw.uf2"))
+        is False
+    )
+
+
+def test_get_available_updates(mocker, tmp_path):
+    """Test comparing running firmware against the newest compatible build"""
+    firmware_dir = tmp_path / "firmware"
+    (firmware_dir / "EnvironmentSensor").mkdir(parents=True)
+    for version in ("0.2.0", "0.3.0-rc.1", "0.3.0"):
+        (firmware_dir / "EnvironmentSensor" / f"EnvironmentSensor-fw{version}.uf2").write_bytes(
+            make_uf2(version.encode())
+        )
+    firmware_service = FirmwareService(firmware_dir=firmware_dir)
+    mocker.patch.object(firmware_service.cli, "inspect_firmware", return_value=None)
+
+    def make_device(port, version):
+        return Device(
+            Confidence="High",
+            Kind="Pico",
+            State="Online",
+            PortName=port,
+            DeviceDescription="EnvironmentSensor",
+            FirmwareVersion=version,
+        )
+
+    devices = [
+        make_device("COM1", "0.2.0"),
+        make_device("COM2", "0.3.0"),
+        make_device("COM3", None),
+        make_device("COM4", "0.3.0-rc.1"),
+    ]
+
+    updates = firmware_service.get_available_updates(devices)
+
+    assert {key: entry.firmware_version for key, entry in updates.items()} == {
+        "port:COM1": "0.3.0",
+        "port:COM4": "0.3.0",
+    }
+
+
+def test_check_devices_compatibility_scans_repository_once(mocker, tmp_path):
+    """Test that a check scans the repository once, and not at all for outside files"""
+    firmware_dir = tmp_path / "firmware"
+    (firmware_dir / "Behavior").mkdir(parents=True)
+    inside = firmware_dir / "Behavior" / "Behavior-fw1.0.0.uf2"
+    inside.write_bytes(make_uf2(b"firmware"))
+    outside = tmp_path / "build.uf2"
+    outside.write_bytes(make_uf2(b"build"))
+    firmware_service = FirmwareService(firmware_dir=firmware_dir)
+    mocker.patch.object(firmware_service.cli, "inspect_firmware", return_value=None)
+    refresh = mocker.spy(firmware_service.repository, "refresh")
+    device = Device(Confidence="High", Kind="Pico", State="Online", PortName="COM1")
+
+    firmware_service.check_devices_compatibility([device], str(inside))
+    assert refresh.call_count == 1
+
+    firmware_service.check_devices_compatibility([device], str(outside))
+    assert refresh.call_count == 1
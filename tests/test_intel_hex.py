@@ -0,0 +1,140 @@
+import hashlib
+import pytest
+from harp_updater_gui.utils.intel_hex import (
+    IntelHexError,
+    parse_intel_hex,
+    parse_intel_hex_file,
+)
+
+
+def make_record(record_type: int, address: int, payload: bytes) -> bytes:
+    """Build one Intel HEX record line with a valid checksum"""
+    record = bytes([len(payload), address >> 8, address & 0xFF, record_type]) + payload
+    checksum = (-sum(record)) & 0xFF
+    return b":" + (record + bytes([checksum])).hex().upper().encode() + b"\n"
+
+
+EOF_RECORD = make_record(0x01, 0, b"")
+
+
+def test_parse_contiguous_image():
+    """Test layout and digest of a simple image"""
+    lines = [
+        make_record(0x00, 0x0000, b"\x01\x02\x03\x04"),
+        make_record(0x00, 0x0004, b"\x05\x06"),
+        EOF_RECORD,
+    ]
+
+    image = parse_intel_hex(lines)
+
+    assert image.record_count == 3
+    assert image.data_size == 6
+    assert image.address_ranges == [(0, 6)]
+    assert image.image_size == 6
+    assert image.sha256 == hashlib.sha256(bytes([1, 2, 3, 4, 5, 6])).hexdigest()
+
+
+def test_parse_extended_addresses_and_gaps():
+    """Test extended linear/segment records and erased-flash gap filling"""
+    lines = [
+        make_record(0x00, 0x0000, b"\xAA"),
+        make_record(0x04, 0, b"\x00\x01"),
+        make_record(0x00, 0x0000, b"\xBB"),
+        make_record(0x02, 0, b"\x20\x00"),
+        make_record(0x00, 0x0010, b"\xCC"),
+        make_record(0x05, 0, b"\x00\x00\x01\x00"),
+        EOF_RECORD,
+    ]
+
+    image = parse_intel_hex(lines)
+
+    assert image.address_ranges == [(0, 1), (0x10000, 0x10001), (0x20010, 0x20011)]
+    assert image.image_size == 0x20011
+    assert image.entry_point == 0x100
+    expected = bytearray(b"\xFF" * 0x20011)
+    expected[0], expected[0x10000], expected[0x20010] = 0xAA, 0xBB, 0xCC
+    assert image.sha256 == hashlib.sha256(expected).hexdigest()
+
+
+def test_parse_out_of_order_records():
+    """Test that record order does not change the digest"""
+    first = make_record(0x00, 0x0000, b"\x01\x02")
+    second = make_record(0x00, 0x0002, b"\x03\x04")
+
+    assert (
+        parse_intel_hex([second, first, EOF_RECORD]).sha256
+        == parse_intel_hex([first, second, EOF_RECORD]).sha256
+    )
+
+
+def test_parse_rejects_bad_checksum():
+    """Test checksum verification"""
+    line = bytearray(make_record(0x00, 0x0000, b"\x01\x02"))
+    line[-3:-1] = b"00"
+
+    with pytest.raises(IntelHexError, match="Line 1: checksum"):
+        parse_intel_hex([bytes(line), EOF_RECORD])
+
+
+@pytest.mark.parametrize(
+    "lines, message",
+    [
+        ([make_record(0x00, 0, b"\x01")], "end-of-file"),
+        ([b"01000000FF\n", EOF_RECORD], "start code"),
+        ([b":ZZ\n", EOF_RECORD], "hexadecimal"),
+        ([b":0500000001FA\n", EOF_RECORD], "length"),
+        ([make_record(0x07, 0, b""), EOF_RECORD], "unknown record type"),
+        ([make_record(0x04, 0, b"\x00"), EOF_RECORD], "bad length"),
+        ([EOF_RECORD, make_record(0x00, 0, b"\x01")], "after end-of-file"),
+        (
+            [
+                make_record(0x00, 0x0000, b"\x01\x02\x03\x04"),
+                make_record(0x00, 0x0002, b"\x05"),
+                EOF_RECORD,
+            ],
+            "overlapping",
+        ),
+    ],
+)
+def test_parse_rejects_malformed_files(lines, message):
+    """Test rejection of malformed or truncated files"""
+    with pytest.raises(IntelHexError, match=message):
+        parse_intel_hex(lines)
+
+
+def test_parse_rejects_out_of_range_address():
+    """Test the flash size bound"""
+    lines = [make_record(0x00, 0x00FF, b"\x01\x02"), EOF_RECORD]
+
+    assert parse_intel_hex(lines, max_address=0x101).end_address == 0x101
+    with pytest.raises(IntelHexError, match="beyond"):
+        parse_intel_hex(lines, max_address=0x100)
+
+
+def test_parse_memory_sections_beyond_flash():
+    """Test EEPROM and fuse data outside flash in allowed sections"""
+    flash = [make_record(0x00, 0, b"\x01\x02")]
+    eeprom = [make_record(0x04, 0, b"\x00\x81"), make_record(0x00, 0, b"\xAA")]
+    lines = flash + eeprom + [EOF_RECORD]
+    sections = [(0x810000, 0x820000)]
+
+    image = parse_intel_hex(lines, max_address=0x100, sections=sections)
+
+    assert image.address_ranges == [(0, 2)]
+    assert image.section_ranges == [(0x810000, 0x810001)]
+    assert image.data_size == 3
+    assert image.sha256 != parse_intel_hex(flash + [EOF_RECORD]).sha256
+    with pytest.raises(IntelHexError, match="beyond"):
+        parse_intel_hex(lines, max_address=0x100)
+    with pytest.raises(IntelHexError, match="beyond"):
+        parse_intel_hex(lines, max_address=0x100, sections=[(0x820000, 0x820010)])
+
+
+def test_parse_intel_hex_file(tmp_path):
+    """Test parsing a file with CRLF line endings"""
+    path = tmp_path / "firmware.hex"
+    path.write_bytes(
+        make_record(0x00, 0, b"\x01").replace(b"\n", b"\r\n") + EOF_RECORD
+    )
+
+    assert parse_intel_hex_file(str(path)).data_size == 1
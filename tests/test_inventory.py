@@ -0,0 +1,108 @@
+import threading
+import pytest
+from dataclasses import FrozenInstanceError
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.models.inventory import DeviceInventory
+from harp_updater_gui.services.device_manager import DeviceManager
+
+
+def make_record(port=None, state="Online", **extra):
+    return {
+        "Confidence": "High",
+        "Kind": "Pico",
+        "State": state,
+        "PortName": port,
+        "DeviceDescription": f"Device {port}" if port else None,
+        **extra,
+    }
+
+
+def test_build_indexes_and_disambiguates():
+    """Test building an inventory assigns unique keys and indexes"""
+    devices = [
+        Device(**make_record("COM5")),
+        Device(**make_record(state="Bootloader")),
+        Device(**make_record(state="Bootloader")),
+    ]
+
+    inventory = DeviceInventory.build(3, devices, {"port:COM5": "1.0.0"})
+
+    assert inventory.version == 3
+    assert [d.identity_key for d in inventory.devices] == [
+        "port:COM5",
+        "Pico:Bootloader",
+        "Pico:Bootloader#1",
+    ]
+    assert inventory.by_port["COM5"] is inventory.devices[0]
+    assert len(inventory.by_state["Bootloader"]) == 2
+    assert inventory.snapshot_by_key["Pico:Bootloader#1"].device is inventory.devices[2]
+    assert inventory.available_updates == {"port:COM5": "1.0.0"}
+
+
+def test_inventory_is_immutable():
+    """Test inventories and their indexes cannot be modified"""
+    inventory = DeviceInventory.build(1, [Device(**make_record("COM5"))])
+
+    with pytest.raises(FrozenInstanceError):
+        inventory.version = 2
+    with pytest.raises(TypeError):
+        inventory.by_port["COM6"] = inventory.devices[0]
+    with pytest.raises(TypeError):
+        inventory.available_updates["port:COM5"] = "1.0.0"
+
+
+def test_reordering_copies_instead_of_mutating():
+    """Test older inventories keep their keys when devices are reused"""
+    first = Device(**make_record(state="Bootloader"))
+    second = Device(**make_record(state="Bootloader"))
+    old = DeviceInventory.build(1, [first, second])
+
+    new = DeviceInventory.build(2, [old.devices[1]])
+
+    assert new.devices[0].identity_key == "Pico:Bootloader"
+    assert old.devices[1].identity_key == "Pico:Bootloader#1"
+    assert new.devices[0] is not old.devices[1]
+
+
+def test_manager_publishes_versions():
+    """Test each change publishes a new inventory and readers keep theirs"""
+    manager = DeviceManager()
+    start = manager.inventory
+
+    manager.apply_device_data([make_record("COM5")])
+    held = manager.inventory
+    manager.set_available_updates({"port:COM5": "2.0.0"})
+    manager.apply_device_data([make_record("COM5"), make_record("COM6")])
+
+    assert start.version < held.version < manager.inventory.version
+    assert [d.port_name for d in held.devices] == ["COM5"]
+    assert held.available_updates == {}
+    assert manager.available_updates == {"port:COM5": "2.0.0"}
+    assert [d.port_name for d in manager.get_devices()] == ["COM5", "COM6"]
+
+
+def test_hotplug_without_changes_keeps_version():
+    """Test that an unchanged hot-plug snapshot does not publish"""
+    manager = DeviceManager()
+    manager.apply_device_data([make_record("COM5")])
+    version = manager.inventory.version
+
+    assert manager.apply_hotplug_data([make_record("COM5")]) == ([], [], [])
+    assert manager.inventory.version == version
+
+
+def test_concurrent_publishes_are_not_lost():
+    """Test that versions are unique when several threads publish"""
+    manager = DeviceManager()
+
+    def publish():
+        for _ in range(50):
+            manager.set_available_updates({})
+
+    threads = [threading.Thread(target=publish) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert manager.inventory.version == 200
@@ -0,0 +1,151 @@
+import asyncio
+import pytest
+from harp_updater_gui.services.device_manager import DeviceManager
+from harp_updater_gui.services.firmware_service import FirmwareService
+from harp_updater_gui.services.inventory_service import InventoryService
+
+
+def make_record(port: str, state: str = "Online") -> dict:
+    return {"Confidence": "Low", "Kind": "Pico", "State": state, "PortName": port}
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Create an inventory service whose CLI calls are recorded"""
+    service = InventoryService(
+        DeviceManager(), FirmwareService(firmware_dir=str(tmp_path / "firmware"))
+    )
+    service.calls = []
+
+    async def fake_list_devices(all_devices=True, allow_connect=True):
+        service.calls.append(allow_connect)
+        await asyncio.sleep(0.01)
+        return [make_record("COM5")]
+
+    service.device_manager.cli.list_devices_async = fake_list_devices
+    return service
+
+
+def test_concurrent_refreshes_share_one_call(service):
+    """Test that refreshes requested together run the CLI once"""
+
+    async def scenario():
+        return await asyncio.gather(*(service.refresh() for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert service.calls == [False]
+    assert all(devices == results[0] for devices in results)
+    assert service.device_manager.inventory.version > 0
+
+
+def test_connecting_refresh_runs_after_cheap_one(service):
+    """Test that a connecting refresh does not join a no-connect one"""
+
+    async def scenario():
+        await asyncio.gather(service.refresh(), service.refresh(allow_connect=True))
+
+    asyncio.run(scenario())
+
+    assert service.calls == [False, True]
+
+
+def test_refresh_never_connects_while_held(service):
+    """Test that uploads downgrade refreshes to no-connect"""
+    with service.hold():
+        assert service.is_busy
+        asyncio.run(service.refresh(allow_connect=True))
+
+    assert service.calls == [False]
+    assert not service.is_busy
+
+
+def test_holding_client_refresh_may_connect(service):
+    """Test that only refreshes of other clients are downgraded during a hold"""
+    with service.hold(owner=1):
+        asyncio.run(service.refresh(allow_connect=True, owner=2))
+        asyncio.run(service.refresh(allow_connect=True, owner=1))
+
+    assert service.calls == [False, True]
+    assert not service.is_busy
+
+
+def test_refresh_waits_for_running_poll(service):
+    """Test that a refresh never runs the CLI next to a hot-plug poll"""
+    running = 0
+    peak = 0
+    list_devices = service.device_manager.cli.list_devices_async
+
+    async def tracked_list_devices(all_devices=True, allow_connect=True):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            return await list_devices(all_devices, allow_connect)
+        finally:
+            running -= 1
+
+    service.device_manager.cli.list_devices_async = tracked_list_devices
+
+    async def scenario():
+        service.watcher.interval = 0.001
+        service.start_watching()
+        while not service.watcher.polling:
+            await asyncio.sleep(0.001)
+        await service.refresh(allow_connect=True)
+        service.watcher.stop()
+
+    asyncio.run(scenario())
+
+    assert peak == 1
+    assert service.calls == [False, True]
+
+
+def test_listeners_are_notified(service):
+    """Test that every client receives refreshes, despite failing clients"""
+    received = []
+
+    def failing(event):
+        raise RuntimeError("client gone")
+
+    async def async_listener(event):
+        received.append(("async", event))
+
+    service.subscribe(failing)
+    service.subscribe(lambda event: received.append(("sync", event)))
+    token = service.subscribe(async_listener)
+
+    asyncio.run(service.refresh())
+    service.unsubscribe(token)
+    asyncio.run(service.refresh())
+
+    assert received == [("sync", None), ("async", None), ("sync", None)]
+
+
+def test_hotplug_updates_are_pushed(service):
+    """Test that watcher changes reach the listeners"""
+    events = []
+    service.subscribe(events.append)
+
+    event = asyncio.run(service.watcher.poll_once())
+    asyncio.run(service._on_hotplug(event))
+
+    assert [d.port_name for d in events[0].added] == ["COM5"]
+
+
+def test_polling_slows_only_when_all_clients_hidden(service):
+    """Test that watcher visibility follows every client"""
+    first = service.subscribe(lambda event: None)
+    second = service.subscribe(lambda event: None)
+
+    service.set_hidden(first, True)
+    assert not service.watcher.hidden
+
+    service.set_hidden(second, True)
+    assert service.watcher.hidden
+
+    service.unsubscribe(second)
+    assert service.watcher.hidden
+
+    service.set_hidden(first, False)
+    assert not service.watcher.hidden
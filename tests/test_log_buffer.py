@@ -0,0 +1,51 @@
+from harp_updater_gui.utils.log_buffer import LogBuffer, fold_text
+
+
+def test_drain_in_order_with_limit():
+    """Test that entries come out oldest first, in limited batches"""
+    buffer = LogBuffer(capacity=10)
+    for i in range(5):
+        buffer.append("info", f"line {i}", timestamp=float(i))
+
+    entries, dropped = buffer.drain(limit=3)
+    assert [e.text for e in entries] == ["line 0", "line 1", "line 2"]
+    assert dropped == 0
+    assert len(buffer) == 2
+
+    entries, _ = buffer.drain()
+    assert [e.timestamp for e in entries] == [3.0, 4.0]
+
+
+def test_overflow_drops_oldest_and_counts():
+    """Test that the ring buffer stays bounded"""
+    buffer = LogBuffer(capacity=3)
+    for i in range(7):
+        buffer.append("info", str(i))
+
+    entries, dropped = buffer.drain()
+    assert [e.text for e in entries] == ["4", "5", "6"]
+    assert dropped == 4
+    assert buffer.drain() == ([], 0)
+
+
+def test_lazy_message_is_evaluated_on_display():
+    """Test that callables are only called when the text is needed"""
+    calls = []
+    buffer = LogBuffer()
+    buffer.append("debug", lambda: calls.append(1) or "built")
+
+    (entry,), _ = buffer.drain()
+    assert calls == []
+    assert entry.text == "built"
+    assert calls == [1]
+
+
+def test_fold_text():
+    """Test folding of long output and truncation of long lines"""
+    assert fold_text("short") == "short"
+
+    text = "\n".join(f"line {i}" for i in range(100))
+    folded = fold_text(text, max_lines=4).splitlines()
+    assert folded == ["line 0", "line 1", "… 96 lines folded …", "line 98", "line 99"]
+
+    assert fold_text("x" * 50, max_line_length=10) == "x" * 10 + "…"
@@ -0,0 +1,107 @@
+import pytest
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.services.device_manager import DeviceManager
+from harp_updater_gui.services.metadata_cache import DeviceMetadataCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Metadata cache persisted to a temporary file"""
+    return DeviceMetadataCache(tmp_path / "metadata.json")
+
+
+@pytest.fixture
+def connected_record():
+    """Device record from a connecting (--allow-connect) enumeration"""
+    return {
+        "Confidence": "High",
+        "Kind": "Pico",
+        "State": "Online",
+        "PortName": "COM5",
+        "WhoAmI": 1405,
+        "DeviceDescription": "EnvironmentSensor",
+        "SerialNumber": "A1",
+        "FirmwareVersion": "0.2.0",
+        "HardwareVersion": "1.0",
+        "Source": "USB\\VID_2E8A&PID_000A\\A1",
+    }
+
+
+@pytest.fixture
+def cheap_record(connected_record):
+    """The same device from a no-connect enumeration"""
+    return {
+        "Confidence": "Low",
+        "Kind": "Pico",
+        "State": "Online",
+        "PortName": "COM5",
+        "SerialNumber": connected_record["SerialNumber"],
+        "Source": connected_record["Source"],
+    }
+
+
+def test_merge_restores_missing_fields(cache, connected_record, cheap_record):
+    """Test that cached metadata fills gaps and is marked with its age"""
+    cache.remember([connected_record])
+
+    merged = cache.merge([cheap_record])[0]
+    device = Device(**merged)
+
+    assert device.device_description == "EnvironmentSensor"
+    assert device.firmware_version == "0.2.0"
+    assert device.serial_number == "A1"
+    assert device.cached_age("FirmwareVersion") is not None
+    assert device.cached_age("PortName") is None
+    # Input records are not modified
+    assert "DeviceDescription" not in cheap_record
+
+
+def test_source_match_restores_only_descriptive_fields(cache, connected_record, cheap_record):
+    """Test that a board on the same USB port does not inherit another's identity"""
+    cache.remember([connected_record])
+    del cheap_record["SerialNumber"]
+
+    device = Device(**cache.merge([cheap_record])[0])
+
+    assert device.firmware_version == "0.2.0"
+    assert device.cached_age("HardwareVersion") is not None
+    assert device.serial_number is None
+    assert device.device_description is None
+    assert device.who_am_i is None
+
+
+def test_cache_persists(cache, tmp_path, connected_record, cheap_record):
+    """Test that the cache survives a restart"""
+    cache.remember([connected_record])
+
+    reloaded = DeviceMetadataCache(tmp_path / "metadata.json")
+
+    assert reloaded.merge([cheap_record])[0]["DeviceDescription"] == "EnvironmentSensor"
+
+
+def test_invalidate(cache, connected_record, cheap_record):
+    """Test that uploads invalidate the cached metadata of a device"""
+    cache.remember([connected_record])
+
+    cache.invalidate(Device(**connected_record))
+
+    assert cache.merge([cheap_record])[0] == cheap_record
+
+
+def test_ambiguous_sources_are_ignored(cache, connected_record, cheap_record):
+    """Test that a source shared by several devices is not used as a key"""
+    other = {**cheap_record, "PortName": "COM6"}
+    cache.remember([{**connected_record, "SerialNumber": None}, other])
+
+    assert cache.merge([cheap_record])[0] == cheap_record
+
+
+def test_device_manager_no_connect_refresh(cache, connected_record, cheap_record):
+    """Test that no-connect refreshes keep metadata from earlier refreshes"""
+    device_manager = DeviceManager(metadata_cache=cache)
+    device_manager.apply_device_data([connected_record])
+
+    devices = device_manager.apply_device_data([cheap_record])
+
+    assert devices[0].display_name == "EnvironmentSensor"
+    assert devices[0].hardware_version == "1.0"
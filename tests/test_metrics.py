@@ -0,0 +1,102 @@
+import asyncio
+import sys
+import pytest
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.services.cli_wrapper import CLIWrapper
+from harp_updater_gui.services.deploy_scheduler import DeployScheduler
+from harp_updater_gui.utils import metrics
+from harp_updater_gui.utils.metrics import MetricsRegistry, track_cli_command
+
+
+def test_counter_and_gauge_render():
+    """Test the Prometheus text output of counters and gauges"""
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs run", labels=("result",))
+    gauge = registry.gauge("queue_depth", "Queued jobs")
+
+    counter.inc(result="ok")
+    counter.inc(2, result="ok")
+    counter.inc(result='bad "quote"')
+    gauge.set(5)
+    gauge.dec(2)
+
+    assert registry.render().splitlines() == [
+        "# HELP jobs_total Jobs run",
+        "# TYPE jobs_total counter",
+        'jobs_total{result="bad \\"quote\\""} 1',
+        'jobs_total{result="ok"} 3',
+        "# HELP queue_depth Queued jobs",
+        "# TYPE queue_depth gauge",
+        "queue_depth 3",
+    ]
+
+    with pytest.raises(ValueError):
+        counter.inc(-1, result="ok")
+    with pytest.raises(ValueError):
+        counter.inc(status="ok")
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test that histogram buckets count every observation up to their bound"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 3):
+        histogram.observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "latency_seconds_sum 4.05" in lines
+    assert "latency_seconds_count 4" in lines
+
+
+def test_track_cli_command_outcomes():
+    """Test in-flight counts and outcomes of tracked commands"""
+    before = metrics.CLI_COMMAND_DURATION.count(command="test", outcome="failure")
+
+    with track_cli_command("test") as call:
+        assert metrics.CLI_COMMANDS_IN_FLIGHT.value(command="test") == 1
+        call.outcome = "failure"
+    assert metrics.CLI_COMMANDS_IN_FLIGHT.value(command="test") == 0
+    assert metrics.CLI_COMMAND_DURATION.count(command="test", outcome="failure") == before + 1
+
+    with pytest.raises(OSError):
+        with track_cli_command("test"):
+            raise OSError("missing executable")
+    assert metrics.CLI_COMMAND_DURATION.count(command="test", outcome="error") >= 1
+
+
+def test_async_commands_are_recorded():
+    """Test that CLI runs are timed by subcommand and exit status"""
+    cli = CLIWrapper(cli_path=sys.executable)
+    before = metrics.CLI_COMMAND_DURATION.count(command="-c", outcome="failure")
+
+    returncode, _, _ = asyncio.run(cli._run_async([sys.executable, "-c", "exit(3)"]))
+
+    assert returncode == 3
+    assert metrics.CLI_COMMAND_DURATION.count(command="-c", outcome="failure") == before + 1
+
+
+def test_upload_metrics_per_device():
+    """Test that the deploy scheduler records per-device upload results"""
+    devices = [
+        Device(Confidence="High", Kind="Pico", State="Online", PortName=port, SerialNumber=serial)
+        for port, serial in (("COM1", 101), ("COM2", 102))
+    ]
+    before = metrics.DEVICE_UPLOAD_DURATION.count(kind="Pico", outcome="failure")
+
+    async def upload(device):
+        return device.port_name == "COM1", ""
+
+    asyncio.run(DeployScheduler().run(devices, upload))
+
+    assert metrics.DEVICE_UPLOAD_DURATION.count(kind="Pico", outcome="failure") == before + 1
+    assert metrics.DEVICE_LAST_UPLOAD_SUCCESS.value(serial="102") == 0
+    assert 'harp_device_last_upload_duration_seconds{serial="101"}' in metrics.REGISTRY.render()
+
+
+def test_metric_requires_render_samples():
+    """Test that a metric type must implement its sample rendering"""
+    with pytest.raises(TypeError):
+        metrics._Metric("incomplete", "Missing _render_samples")
@@ -0,0 +1,144 @@
+import pytest
+from harp_updater_gui.models.device import Device
+from harp_updater_gui.services.cli_wrapper import CLIWrapper
+from harp_updater_gui.services import readiness as readiness_module
+from harp_updater_gui.services.readiness import (
+    PHASE_PORT_RELEASE,
+    PHASE_REBOOT,
+    DeviceReadiness,
+    ReadinessTimings,
+    is_port_available,
+)
+
+
+@pytest.fixture
+def timings(tmp_path):
+    """Readiness timings persisted to a temporary file"""
+    return ReadinessTimings(tmp_path / "timings.json")
+
+
+@pytest.fixture
+def readiness(timings):
+    """Device readiness with fast polling"""
+    return DeviceReadiness(
+        CLIWrapper(),
+        timings=timings,
+        port_poll_interval=0.001,
+        enumeration_poll_interval=0.001,
+    )
+
+
+def test_default_and_learned_timeouts(timings, tmp_path):
+    """Test that timeouts start at per-kind defaults and adapt to history"""
+    assert timings.timeout("Pico", PHASE_REBOOT) == 10.0
+    assert timings.timeout("ATxmega", PHASE_REBOOT) == 6.0
+    assert timings.timeout("Unknown", PHASE_REBOOT) == timings.FALLBACK_TIMEOUT
+
+    timings.record("Pico", PHASE_REBOOT, 2.0)
+    assert timings.timeout("Pico", PHASE_REBOOT) == pytest.approx(4.0)
+    # Other kinds are unaffected
+    assert timings.timeout("ATxmega", PHASE_REBOOT) == 6.0
+
+    # Samples persist across instances
+    reloaded = ReadinessTimings(tmp_path / "timings.json")
+    assert reloaded.timeout("Pico", PHASE_REBOOT) == pytest.approx(4.0)
+
+
+def test_timeout_is_clamped(timings):
+    """Test learned timeouts stay within bounds"""
+    timings.record("Pico", PHASE_PORT_RELEASE, 0.0)
+    assert timings.timeout("Pico", PHASE_PORT_RELEASE) == timings.MIN_TIMEOUT
+
+    timings.record("Pico", PHASE_PORT_RELEASE, 1000.0)
+    assert timings.timeout("Pico", PHASE_PORT_RELEASE) == timings.MAX_TIMEOUT
+
+
+def test_timeout_ignores_outliers(timings):
+    """Test that one slow wait does not set the timeout for the next deploys"""
+    for _ in range(19):
+        timings.record("Pico", PHASE_REBOOT, 2.0)
+    timings.record("Pico", PHASE_REBOOT, 30.0)
+
+    assert timings.timeout("Pico", PHASE_REBOOT) == pytest.approx(4.0)
+
+
+def test_is_port_available(tmp_path):
+    """Test port availability check against existing and missing paths"""
+    port = tmp_path / "ttyFAKE0"
+    port.write_text("")
+    assert is_port_available(str(port)) is True
+    assert is_port_available(str(tmp_path / "missing")) is False
+
+
+def test_wait_for_port_release(readiness, mocker):
+    """Test polling until a busy port can be opened"""
+    mocker.patch.object(
+        readiness_module, "is_port_available", side_effect=[False, False, True]
+    )
+
+    released, elapsed = readiness.wait_for_port_release("COM5", "Pico")
+
+    assert released is True
+    assert elapsed >= 0
+    assert readiness_module.is_port_available.call_count == 3
+
+
+def test_wait_for_devices(readiness, mocker):
+    """Test waiting for flashed devices to re-appear after reboot"""
+    online = Device(Confidence="High", Kind="ATxmega", State="Online", PortName="COM6")
+    bootloader = Device(Confidence="High", Kind="Pico", State="Bootloader")
+
+    mocker.patch.object(readiness_module, "is_port_available", return_value=True)
+    mocker.patch.object(
+        readiness.cli,
+        "list_devices",
+        side_effect=[
+            # Both devices still rebooting
+            [{"Kind": "ATxmega", "State": "Online", "PortName": "COM3"}],
+            # ATxmega back on its port, Pico enumerated on a new port
+            [
+                {"Kind": "ATxmega", "State": "Online", "PortName": "COM3"},
+                {"Kind": "ATxmega", "State": "Online", "PortName": "COM6"},
+                {"Kind": "Pico", "State": "Online", "PortName": "COM9"},
+            ],
+        ],
+    )
+
+    results = readiness.wait_for_devices([online, bootloader], known_ports={"COM3"})
+
+    assert [r.ready for r in results] == [True, True]
+    assert readiness.cli.list_devices.call_count == 2
+
+
+def test_wait_for_devices_timeout(readiness, timings, mocker):
+    """Test that a device which never re-appears times out"""
+    device = Device(Confidence="High", Kind="ATxmega", State="Online", PortName="COM6")
+    mocker.patch.object(readiness.cli, "list_devices", return_value=[])
+    mocker.patch.object(timings, "timeout", return_value=0.01)
+
+    results = readiness.wait_for_devices([device])
+
+    assert results[0].ready is False
+    # Timed-out waits do not lengthen later timeouts
+    assert timings._samples == {}
+
+
+def test_wait_for_devices_ignores_device_before_reboot(timings, mocker):
+    """Test that a device still listed on its old port is not ready at once"""
+    readiness = DeviceReadiness(
+        CLIWrapper(), timings=timings, enumeration_poll_interval=0.001, min_reboot_delay=0.05
+    )
+    device = Device(Confidence="High", Kind="ATxmega", State="Online", PortName="COM6")
+    mocker.patch.object(readiness_module, "is_port_available", return_value=True)
+    mocker.patch.object(
+        readiness.cli,
+        "list_devices",
+        return_value=[{"Kind": "ATxmega", "State": "Online", "PortName": "COM6"}],
+    )
+
+    results = readiness.wait_for_devices([device])
+
+    assert results[0].ready is True
+    assert results[0].elapsed >= 0.05
+    # The reboot was never observed, so the wait teaches nothing
+    assert timings._samples == {}
@@ -0,0 +1,41 @@
+from harp_updater_gui.utils.row_diff import diff_rows, rows_fingerprint
+
+
+def make_row(key: str, firmware: str = "v1.0.0") -> dict:
+    """Create a table row for testing"""
+    return {"id": key, "name": "EnvironmentSensor", "firmware": firmware}
+
+
+def test_diff_rows():
+    """Test detection of added, removed and changed rows"""
+    old_rows = {
+        "port:COM5": make_row("port:COM5"),
+        "port:COM6": make_row("port:COM6"),
+    }
+    new_rows = [make_row("port:COM5", "v1.1.0"), make_row("port:COM7")]
+
+    diff = diff_rows(old_rows, new_rows, "id")
+
+    assert [r["id"] for r in diff.added] == ["port:COM7"]
+    assert [r["id"] for r in diff.removed] == ["port:COM6"]
+    assert [r["id"] for r in diff.changed] == ["port:COM5"]
+    assert diff.changed[0]["firmware"] == "v1.1.0"
+
+
+def test_diff_rows_unchanged():
+    """Test that identical row sets produce an empty diff"""
+    rows = [make_row("port:COM5"), make_row("port:COM6")]
+    old_rows = {row["id"]: dict(row) for row in rows}
+
+    assert diff_rows(old_rows, rows, "id").is_empty
+
+
+def test_rows_fingerprint():
+    """Test that the fingerprint tracks content and order"""
+    rows = [make_row("port:COM5"), make_row("port:COM6")]
+
+    assert rows_fingerprint(rows) == rows_fingerprint([dict(r) for r in rows])
+    assert rows_fingerprint(rows) != rows_fingerprint(rows[::-1])
+    assert rows_fingerprint(rows) != rows_fingerprint(
+        [make_row("port:COM5", "v2.0.0"), rows[1]]
+    )
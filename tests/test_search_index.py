@@ -0,0 +1,34 @@
+import random
+from harp_updater_gui.utils.search_index import SubstringIndex
+
+
+def test_search_matches_substrings():
+    """Test short and long queries, case-insensitively"""
+    index = SubstringIndex(["Behavior COM5", "EnvironmentSensor COM12", "Olfactometer"])
+
+    assert index.search("com") == [0, 1]
+    assert index.search("C") == [0, 1, 2]
+    assert index.search("sensor") == [1]
+    assert index.search("com12") == [1]
+    assert index.search("com5x") == []
+    assert index.search("missing") == []
+    assert index.search("") == [0, 1, 2]
+    assert len(index) == 3
+
+
+def test_long_query_requires_contiguous_match():
+    """Test that all grams present is not enough without the substring"""
+    index = SubstringIndex(["abcd xbcde", "abcde"])
+
+    assert index.search("abcde") == [1]
+
+
+def test_search_agrees_with_plain_scan():
+    """Test the index against a linear substring scan"""
+    rng = random.Random(1)
+    texts = ["".join(rng.choice("abc01 ") for _ in range(rng.randint(0, 20))) for _ in range(200)]
+    index = SubstringIndex(texts)
+
+    for _ in range(300):
+        query = "".join(rng.choice("abc01") for _ in range(rng.randint(1, 6)))
+        assert index.search(query) == [i for i, t in enumerate(texts) if query in t]
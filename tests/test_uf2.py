@@ -0,0 +1,173 @@
+import struct
+import pytest
+from harp_updater_gui.utils.uf2 import (
+    BINARY_INFO_MARKER_END,
+    BINARY_INFO_MARKER_START,
+    UF2_FLAG_EXTENSION_TAGS,
+    UF2_FLAG_FAMILY_ID_PRESENT,
+    UF2_MAGIC_END,
+    UF2_MAGIC_START0,
+    UF2_MAGIC_START1,
+    UF2Error,
+    parse_uf2,
+    parse_uf2_file,
+)
+
+RP2040 = 0xE48BFF56
+FLASH_BASE = 0x10000000
+
+
+def make_block(target_addr, payload, block_no, num_blocks, family=RP2040, flags=None, tags=b""):
+    """Build one 512-byte UF2 block"""
+    if flags is None:
+        flags = UF2_FLAG_FAMILY_ID_PRESENT | (UF2_FLAG_EXTENSION_TAGS if tags else 0)
+    header = struct.pack(
+        "<8I",
+        UF2_MAGIC_START0,
+        UF2_MAGIC_START1,
+        flags,
+        target_addr,
+        len(payload),
+        block_no,
+        num_blocks,
+        family,
+    )
+    data = (payload + tags).ljust(476, b"\0")
+    return header + data + struct.pack("<I", UF2_MAGIC_END)
+
+
+def make_uf2(image: bytes, base=FLASH_BASE, **kwargs) -> bytes:
+    """Split a flat image into 256-byte UF2 blocks"""
+    chunks = [image[i : i + 256].ljust(256, b"\0") for i in range(0, len(image), 256)]
+    return b"".join(
+        make_block(base + 256 * n, chunk, n, len(chunks), **kwargs)
+        for n, chunk in enumerate(chunks)
+    )
+
+
+def make_image_with_binary_info() -> bytes:
+    """Build a flash image carrying Pico SDK binary info"""
+    image = bytearray(1024)
+    header_at, entries_at, mapping_at = 0x100, 0x200, 0x220
+    name_entry, version_entry, custom_entry = 0x240, 0x250, 0x260
+    name_str, version_str = 0x300, 0x320
+
+    struct.pack_into(
+        "<5I",
+        image,
+        header_at,
+        BINARY_INFO_MARKER_START,
+        FLASH_BASE + entries_at,
+        FLASH_BASE + entries_at + 12,
+        FLASH_BASE + mapping_at,
+        BINARY_INFO_MARKER_END,
+    )
+    struct.pack_into(
+        "<3I",
+        image,
+        entries_at,
+        FLASH_BASE + name_entry,
+        FLASH_BASE + version_entry,
+        FLASH_BASE + custom_entry,
+    )
+    rp_tag = ord("R") | (ord("P") << 8)
+    struct.pack_into("<HHII", image, name_entry, 6, rp_tag, 0x02031C86, FLASH_BASE + name_str)
+    struct.pack_into("<HHII", image, version_entry, 6, rp_tag, 0x11A9BC3A, FLASH_BASE + version_str)
+    struct.pack_into("<HHII", image, custom_entry, 5, 0x4148, 0x1, 1405)
+    image[name_str : name_str + 10] = b"Behavior\0\0"
+    image[version_str : version_str + 6] = b"2.1.0\0"
+    return bytes(image)
+
+
+def test_parse_valid_image():
+    """Test summary of a well-formed file"""
+    image = parse_uf2(make_uf2(bytes(1000)))
+
+    assert image.block_count == 4
+    assert image.payload_size == 1024
+    assert image.family_names == ["RP2040"]
+    assert image.address_ranges == [(FLASH_BASE, FLASH_BASE + 1024)]
+
+
+def test_parse_binary_info():
+    """Test extraction of embedded program metadata"""
+    image = parse_uf2(make_uf2(make_image_with_binary_info()))
+
+    assert image.metadata["program_name"] == "Behavior"
+    assert image.metadata["program_version"] == "2.1.0"
+    assert image.metadata["4148:00000001"] == 1405
+
+
+def test_parse_extension_tags():
+    """Test extraction of UF2 extension tags"""
+    tag = struct.pack("<I", 4 + 6 | (0x9FC7BC << 8)) + b"v1.2.3"
+    data = make_uf2(bytes(256), tags=tag.ljust(12, b"\0"))
+
+    assert parse_uf2(data).metadata["uf2_version"] == "v1.2.3"
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"", "empty"),
+        (bytes(100), "multiple"),
+        (bytes(512), "magic"),
+    ],
+)
+def test_parse_rejects_garbage(data, message):
+    """Test rejection of files that are not UF2"""
+    with pytest.raises(UF2Error, match=message):
+        parse_uf2(data)
+
+
+def test_parse_rejects_missing_block():
+    """Test detection of truncated files"""
+    data = make_uf2(bytes(1024))
+
+    with pytest.raises(UF2Error, match="missing"):
+        parse_uf2(data[:-512])
+
+
+def test_parse_rejects_duplicate_block():
+    """Test detection of repeated block numbers"""
+    block = make_block(FLASH_BASE, bytes(256), 0, 2)
+
+    with pytest.raises(UF2Error, match="duplicate"):
+        parse_uf2(block + block)
+
+
+def test_parse_rejects_overlap():
+    """Test detection of overlapping writes"""
+    data = make_block(FLASH_BASE, bytes(256), 0, 2) + make_block(
+        FLASH_BASE + 128, bytes(256), 1, 2
+    )
+
+    with pytest.raises(UF2Error, match="Overlapping"):
+        parse_uf2(data)
+
+
+def test_parse_rejects_out_of_range_address():
+    """Test detection of writes outside the family's memory"""
+    with pytest.raises(UF2Error, match="outside RP2040"):
+        parse_uf2(make_block(0x00000000, bytes(256), 0, 1))
+
+
+def test_parse_rejects_unexpected_family():
+    """Test family ID filtering"""
+    data = make_uf2(bytes(256), family=0x12345678)
+
+    assert parse_uf2(data).family_ids == [0x12345678]
+    with pytest.raises(UF2Error, match="family"):
+        parse_uf2(data, allowed_families=[RP2040])
+
+
+def test_parse_uf2_file(tmp_path):
+    """Test parsing through a memory-mapped file"""
+    path = tmp_path / "firmware.uf2"
+    path.write_bytes(make_uf2(make_image_with_binary_info()))
+
+    assert parse_uf2_file(str(path)).metadata["program_name"] == "Behavior"
+
+    path.write_bytes(b"")
+    with pytest.raises(UF2Error):
+        parse_uf2_file(str(path))
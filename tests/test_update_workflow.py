@@ -0,0 +1,25 @@
+from harp_updater_gui.components.update_workflow import LogLevel, UpdateWorkflow
+
+
+def test_debug_messages_filtered_before_formatting():
+    """Test that disabled DEBUG messages are neither built nor buffered"""
+    workflow = UpdateWorkflow(show_debug=False)
+
+    def expensive():
+        raise AssertionError("message should not be built")
+
+    workflow.push_log(expensive, LogLevel.DEBUG)
+    workflow.push_log("Starting upload", LogLevel.INFO)
+
+    entries, _ = workflow._buffer.drain()
+    assert [(e.level, e.text) for e in entries] == [(LogLevel.INFO, "Starting upload")]
+
+
+def test_entries_are_buffered_until_flushed():
+    """Test that push_log does not touch the UI before the widget exists"""
+    workflow = UpdateWorkflow(show_debug=True)
+    workflow.push_log(lambda: "details", LogLevel.DEBUG)
+    workflow.flush_log()
+
+    (entry,), _ = workflow._buffer.drain()
+    assert "🔍 details" in workflow._format_entry(entry)
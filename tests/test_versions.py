@@ -0,0 +1,30 @@
+import pytest
+from harp_updater_gui.utils.versions import parse_version
+
+
+@pytest.mark.parametrize(
+    "older, newer",
+    [
+        ("0.9.0", "0.9.1"),
+        ("0.9.1", "0.10.0"),
+        ("1.0.0-rc.1", "1.0.0"),
+        ("1.0.0-alpha", "1.0.0-alpha.1"),
+        ("1.0.0-alpha.2", "1.0.0-alpha.10"),
+        ("1.0.0-2", "1.0.0-beta"),
+        ("v1.2", "fw1.2.1"),
+    ],
+)
+def test_version_ordering(older, newer):
+    """Test Semantic Versioning precedence"""
+    assert parse_version(older) < parse_version(newer)
+
+
+def test_version_equivalence():
+    """Test prefixes, missing patch numbers and build metadata"""
+    assert parse_version("v1.2") == parse_version("1.2.0") == parse_version("1.2.0+abc")
+
+
+@pytest.mark.parametrize("text", [None, "", "latest", "1", "1.x"])
+def test_invalid_versions(text):
+    """Test rejection of non-version strings"""
+    assert parse_version(text) is None